@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.garages.models import Vehicle
+from apps.tenants.sharding import get_control_database, get_default_shard, get_shards
+from shared.validators import normalize_vrn
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the canonical registration number (`vrn_key`) of vehicles saved before it "
+        "existed or changed format, or written without `save()`, in small batches. Vehicles "
+        "whose number is a duplicate of another vehicle of the garage are reported and left "
+        "unset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Vehicles updated per transaction."
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches, leaving room for concurrent writes.",
+        )
+
+    def handle(self, *args, **options):
+        databases = [get_control_database(), get_default_shard(), *get_shards()]
+        for database in dict.fromkeys(databases):
+            updated = self.backfill(database, options["batch_size"], options["pause"])
+            self.stdout.write(f"  {database}: {updated} vehicles updated")
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def backfill(self, database: str, batch_size: int, pause: float) -> int:
+        vehicles = Vehicle.objects_all_garages.using(database)
+        updated = 0
+        last_pk = 0
+        while True:
+            # walk the primary key, so each batch is a short range scan
+            batch = list(
+                vehicles.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "garage_id", "registration_number", "vrn_key")[:batch_size]
+            )
+            if not batch:
+                return updated
+            last_pk = batch[-1].pk
+
+            changed = []
+            for vehicle in batch:
+                vrn_key = normalize_vrn(vehicle.registration_number)
+                if vehicle.vrn_key != vrn_key:
+                    vehicle.vrn_key = vrn_key
+                    changed.append(vehicle)
+            if not changed:
+                continue
+
+            with transaction.atomic(using=database):
+                changed = self.drop_duplicates(vehicles, changed)
+                vehicles.bulk_update(changed, ["vrn_key"])
+            updated += len(changed)
+            time.sleep(pause)
+
+    def drop_duplicates(self, vehicles, changed: list) -> list:
+        """Return the vehicles whose key is not used by another vehicle of their garage."""
+        taken = set(
+            vehicles.filter(vrn_key__in={vehicle.vrn_key for vehicle in changed})
+            .exclude(pk__in=[vehicle.pk for vehicle in changed])
+            .values_list("garage_id", "vrn_key")
+        )
+        unique = []
+        for vehicle in changed:
+            key = (vehicle.garage_id, vehicle.vrn_key)
+            if key in taken:
+                self.stderr.write(
+                    f"  Vehicle {vehicle.pk} ({vehicle.registration_number!r}) duplicates "
+                    f"another vehicle of garage {vehicle.garage_id}, skipped."
+                )
+                continue
+            taken.add(key)
+            unique.append(vehicle)
+        return unique
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+import django.core.validators
+import django.db.models.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('appointment_date', models.DateTimeField()),
+                ('notes', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('in_progress', 'In Progress'), ('confirmed', 'Confirmed'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], db_index=True, default='scheduled', max_length=20)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Service',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('labor_rate', models.DecimalField(decimal_places=2, max_digits=8)),
+            ],
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Vehicle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('registration_number', models.CharField(help_text="Vehicle Registration Number (VRN) issued by Nepal's Department of Transport Management. Example: Ba 1 Pa 1234.", max_length=20, unique=True)),
+                ('make', models.CharField(help_text='Manufacturer or brand of the vehicle.', max_length=50)),
+                ('model', models.CharField(help_text='Model name of the vehicle.', max_length=50)),
+                ('year', models.PositiveSmallIntegerField(blank=True, help_text='Year of manufacture.', null=True, validators=[django.core.validators.MinValueValidator(1886), django.core.validators.MaxValueValidator(2026)])),
+                ('odometer_reading', models.PositiveIntegerField(default=0, help_text='Odometer reading in km.')),
+                ('fuel_type', models.CharField(choices=[('PETROL', 'Petrol'), ('DIESEL', 'Diesel'), ('ELECTRIC', 'Electric')], max_length=20)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='vehicles/')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed'), ('in_progress', 'In Progress'), ('ready', 'Ready for Pickup')], default='open', max_length=20)),
+                ('remarks', models.TextField(blank=True, default='', max_length=1000)),
+                ('open_date', models.DateTimeField(auto_now_add=True)),
+                ('close_date', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
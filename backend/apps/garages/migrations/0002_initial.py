@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('garages', '0001_initial'),
+        ('tenants', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='users.customer'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='garage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='mechanic',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='users.employee'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='garage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='service',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='garages.service'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='garage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vehicles', to='users.customer'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='vehicle',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='garages.vehicle'),
+        ),
+        migrations.AddField(
+            model_name='workorder',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.customer'),
+        ),
+        migrations.AddField(
+            model_name='workorder',
+            name='garage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage'),
+        ),
+        migrations.AddField(
+            model_name='workorder',
+            name='vehicle',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='garages.vehicle'),
+        ),
+        migrations.AddConstraint(
+            model_name='service',
+            constraint=models.UniqueConstraint(fields=('garage', 'name'), name='unique_service_name_per_garage'),
+        ),
+    ]
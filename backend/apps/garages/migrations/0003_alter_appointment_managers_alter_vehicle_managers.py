@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:29
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garages', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='appointment',
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name='vehicle',
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
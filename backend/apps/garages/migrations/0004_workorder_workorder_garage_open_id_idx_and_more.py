@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garages', '0003_alter_appointment_managers_alter_vehicle_managers'),
+        ('tenants', '0002_garageshard'),
+        ('users', '0002_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workorder',
+            index=models.Index(fields=['garage', 'open_date', 'id'], name='workorder_garage_open_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workorder',
+            index=models.Index(fields=['garage', 'close_date', 'id'], name='workorder_garage_close_id_idx'),
+        ),
+    ]
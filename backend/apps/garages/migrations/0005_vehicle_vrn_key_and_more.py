@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garages', '0004_workorder_workorder_garage_open_id_idx_and_more'),
+        ('tenants', '0002_garageshard'),
+        ('users', '0002_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='vrn_key',
+            field=models.CharField(editable=False, help_text='Canonical registration number (see `normalize_vrn`), set on save.', max_length=20, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='vehicle',
+            constraint=models.UniqueConstraint(fields=('garage', 'vrn_key'), name='unique_vehicle_vrn_key_per_garage'),
+        ),
+    ]
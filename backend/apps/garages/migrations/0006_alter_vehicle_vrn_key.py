@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garages', '0005_vehicle_vrn_key_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vehicle',
+            name='vrn_key',
+            field=models.CharField(editable=False, help_text='Canonical registration number (see `normalize_vrn`), set on save.', max_length=40, null=True),
+        ),
+    ]
@@ -1,12 +1,13 @@
 import uuid
-from decimal import Decimal
 from datetime import datetime
+from decimal import Decimal
 
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 from django.db import models
 
 from apps.users.models import Customer, Employee
-from shared.models import GarageMixin, TimeStampMixin, UserAuditMixin, GarageAwareModel
+from shared.models import GarageAwareModel, GarageMixin, TimeStampMixin, UserAuditMixin
+from shared.validators import normalize_vrn
 
 
 class Service(GarageMixin, TimeStampMixin, GarageAwareModel):
@@ -27,7 +28,7 @@ class Service(GarageMixin, TimeStampMixin, GarageAwareModel):
         return self.name
 
 
-class Vehicle(GarageMixin, TimeStampMixin, models.Model):
+class Vehicle(GarageMixin, TimeStampMixin, GarageAwareModel):
     """Model representing vehicles of a garage."""
 
     class FuelType(models.TextChoices):
@@ -58,10 +59,32 @@ class Vehicle(GarageMixin, TimeStampMixin, models.Model):
     odometer_reading = models.PositiveIntegerField(default=0, help_text="Odometer reading in km.")
     fuel_type = models.CharField(max_length=20, choices=FuelType.choices)
     image = models.ImageField(upload_to="vehicles/", null=True, blank=True)
+    vrn_key = models.CharField(
+        # a separator between each character of the longest registration number
+        max_length=40,
+        null=True,
+        editable=False,
+        help_text="Canonical registration number (see `normalize_vrn`), set on save.",
+    )
+
+    class Meta:
+        constraints = [
+            # also the index of exact and prefix lookups by registration number
+            models.UniqueConstraint(
+                fields=["garage", "vrn_key"], name="unique_vehicle_vrn_key_per_garage"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_display_name()} ({self.registration_number})"
 
+    def save(self, *args, **kwargs):
+        self.vrn_key = normalize_vrn(self.registration_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "registration_number" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "vrn_key"}
+        super().save(*args, **kwargs)
+
     def get_display_name(self):
         """Return the full name of the vehicle including year, make, and model."""
         if self.year:
@@ -69,7 +92,7 @@ class Vehicle(GarageMixin, TimeStampMixin, models.Model):
         return f"{self.make} {self.model}"
 
 
-class Appointment(GarageMixin, TimeStampMixin, models.Model):
+class Appointment(GarageMixin, TimeStampMixin, GarageAwareModel):
     """Model representing appointments of a garage."""
 
     class AppointmentStatus(models.TextChoices):
@@ -112,6 +135,15 @@ class WorkOrder(GarageMixin, TimeStampMixin, GarageAwareModel):
     open_date = models.DateTimeField(auto_now_add=True)
     close_date = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination (see KeysetPagination)
+            models.Index(fields=["garage", "open_date", "id"], name="workorder_garage_open_id_idx"),
+            models.Index(
+                fields=["garage", "close_date", "id"], name="workorder_garage_close_id_idx"
+            ),
+        ]
+
 
 # class Job(TimeStampMixin, models.Model):
 #     """Model representing an individual task within a work order."""
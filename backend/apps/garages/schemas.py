@@ -1,4 +1,4 @@
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 
 garage_schema = extend_schema_view(
     list=extend_schema(description="List all garages in the system."),
@@ -22,6 +22,16 @@ vehicle_schema = extend_schema_view(
     retrieve=extend_schema(description="Retrieve a vehicle of a garage."),
     update=extend_schema(description="Update a vehicle of a garage."),
     destroy=extend_schema(description="Delete a vehicle of a garage."),
+    by_vrn=extend_schema(
+        description=(
+            "Retrieve a vehicle of a garage by registration number, in any spelling, "
+            "or list the vehicles whose number starts with it (`match=prefix`)."
+        ),
+        parameters=[
+            OpenApiParameter("vrn", str, required=True, description="Registration number."),
+            OpenApiParameter("match", str, enum=["exact", "prefix"], default="exact"),
+        ],
+    ),
 )
 
 appointments_schema = extend_schema_view(
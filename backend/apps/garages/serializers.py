@@ -1,30 +1,24 @@
-from rest_framework import serializers
 from django.utils import timezone
+from rest_framework import serializers
 
+from apps.tenants.models import Garage
 from apps.users.models import Customer, Employee
 from apps.users.serializers import EmployeeReadSerializer, MinimalCustomerSerializer
-from apps.tenants.models import Garage
-from .models import Service, Vehicle, Appointment, WorkOrder
+from shared.serializers import (
+    CompiledSerializerMixin,
+    GarageUniqueFieldsMixin,
+    SparseFieldsMixin,
+)
+from shared.validators import normalize_vrn
 
+from .models import Appointment, Service, Vehicle, WorkOrder
 
-class ServiceSerializer(serializers.ModelSerializer):
+
+class ServiceSerializer(GarageUniqueFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Service
         fields = ["id", "name", "description", "labor_rate", "created_at", "updated_at"]
-
-    def validate_name(self, value):
-        """Check name is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        queryset = Service.objects.filter(garage=garage, name=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
-
-        if queryset.exists():
-            raise serializers.ValidationError("Service with this name already exists.")
-
-        return value
+        garage_unique_fields = {"name": "Service with this name already exists."}
 
 
 class GarageSerializer(serializers.ModelSerializer):
@@ -55,7 +49,9 @@ class GarageSerializer(serializers.ModelSerializer):
         return data
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(
+    GarageUniqueFieldsMixin, CompiledSerializerMixin, serializers.ModelSerializer
+):
     owner = MinimalCustomerSerializer(read_only=True)
     owner_id = serializers.PrimaryKeyRelatedField(
         queryset=Customer.objects.none(),
@@ -79,6 +75,12 @@ class VehicleSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        display_fields = ["fuel_type"]
+        garage_unique_fields = {
+            "registration_number": "A vehicle with this registration number already exists."
+        }
+        # registration numbers are unique in any spelling
+        garage_unique_keys = {"registration_number": ("vrn_key", normalize_vrn)}
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -86,21 +88,16 @@ class VehicleSerializer(serializers.ModelSerializer):
 
         self.fields["owner_id"].queryset = Customer.objects.filter(garage=garage)
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["fuel_type"] = instance.get_fuel_type_display()
-        return data
-
 
 class MinimalVehicleSerializer(serializers.ModelSerializer):
-    customer = MinimalCustomerSerializer(read_only=True)
+    customer = MinimalCustomerSerializer(source="owner", read_only=True)
 
     class Meta:
         model = Vehicle
         fields = ["id", "registration_number", "make", "customer"]
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(CompiledSerializerMixin, serializers.ModelSerializer):
     customer = MinimalCustomerSerializer(read_only=True)
     customer_id = serializers.PrimaryKeyRelatedField(
         queryset=Customer.objects.none(),
@@ -146,6 +143,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        display_fields = ["status"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -215,13 +213,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
     #         )
     #     return attrs
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["status"] = instance.get_status_display()
-        return data
-
 
-class WorkOrderSerializer(serializers.ModelSerializer):
+class WorkOrderSerializer(CompiledSerializerMixin, serializers.ModelSerializer):
     customer = MinimalCustomerSerializer(read_only=True)
     customer_id = serializers.PrimaryKeyRelatedField(
         queryset=Customer.objects.none(),
@@ -248,6 +241,7 @@ class WorkOrderSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        display_fields = ["status"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -255,8 +249,3 @@ class WorkOrderSerializer(serializers.ModelSerializer):
 
         self.fields["customer_id"].queryset = Customer.objects.filter(garage=garage)
         self.fields["vehicle_id"].queryset = Vehicle.objects.filter(garage=garage)
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["status"] = instance.get_status_display()
-        return data
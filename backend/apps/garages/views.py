@@ -1,21 +1,29 @@
 import logging
 
+from django.http import Http404
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import extend_schema
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
-from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
 
+from apps.search.filters import IndexedSearchFilter
+from apps.tenants.cache import garage_cache
 from apps.tenants.models import Garage
-from apps.tenants.viewsets import GarageGenericViewSet
+from apps.tenants.viewsets import GarageGenericViewSet, StreamingListModelMixin
+from apps.users.pagination import KeysetPagination
 from apps.users.permissions import IsASuperUser
-from .models import Service, Vehicle, Appointment, WorkOrder
+from shared.validators import normalize_vrn
+
+from .models import Appointment, Service, Vehicle, WorkOrder
 from .schemas import appointments_schema, garage_schema, service_schema, vehicle_schema
 from .serializers import (
+    AppointmentSerializer,
     GarageSerializer,
     ServiceSerializer,
     VehicleSerializer,
-    AppointmentSerializer,
     WorkOrderSerializer,
 )
 
@@ -36,16 +44,22 @@ class GarageViewSet(viewsets.ModelViewSet):
         instance.save(update_fields=["is_active"])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["get"], url_path="cache-stats")
+    def cache_stats(self, request, *args, **kwargs):
+        """Return hit/miss counters of the tenant cache of the serving process."""
+        return Response(garage_cache.stats())
+
 
 @service_schema
-class ServiceViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class ServiceViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = ServiceSerializer
     filter_backends = [OrderingFilter, SearchFilter]
     search_fields = ["name"]
     ordering_ffields = ["id", "name", "labor_rate"]
+    response_cache_actions = ("list", "retrieve")
 
     def get_queryset(self):
-        return Service.objects.filter(garage=self.garage).select_related("garage")
+        return Service.objects.all()
 
     def perform_create(self, serializer):
         serializer.save(garage=self.garage)
@@ -58,15 +72,50 @@ from rest_framework.permissions import AllowAny
 
 
 @vehicle_schema
-class VehicleViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class VehicleViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = VehicleSerializer
+    compiled_list = True
     lookup_url_kwarg = "vehicle_id"
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     filterset_fields = ["fuel_type"]
-    search_fields = ["vrn_validator", "registration_number"]
+    search_fields = ["registration_number"]
+    # vehicles returned by prefix lookups of `by_vrn`
+    vrn_prefix_limit = 20
 
     def get_queryset(self):
-        return Vehicle.objects.filter(garage=self.garage).select_related("garage", "owner")
+        return Vehicle.objects.all().select_related("owner")
+
+    @action(detail=False, methods=["get"], url_path="by-vrn")
+    def by_vrn(self, request, *args, **kwargs):
+        """
+        Look up vehicles by registration number, in any spelling ("ba1pa1234",
+        "BA 01 PA 1234"), on the canonical `vrn_key` index.
+
+        - `?vrn=`: the vehicle with this number, 404 if there is none.
+        - `?vrn=&match=prefix`: the vehicles whose number starts with it (autocomplete).
+        """
+        vrn_key = normalize_vrn(request.query_params.get("vrn", ""))
+        match = request.query_params.get("match", "exact")
+        if not vrn_key:
+            raise ValidationError({"vrn": ["Enter a registration number."]})
+        if match not in ("exact", "prefix"):
+            raise ValidationError({"match": ["Must be 'exact' or 'prefix'."]})
+
+        queryset = self.get_queryset()
+        if match == "exact":
+            try:
+                vehicle = queryset.get(vrn_key=vrn_key)
+            except Vehicle.DoesNotExist:
+                raise Http404
+            return Response(self.get_serializer(vehicle).data)
+
+        # keys are uppercase, so the case insensitive LIKE 'KEY%' is exact and can use the
+        # index with the column collation (MySQL's LIKE BINARY can not). The group separator
+        # sorts before letters and digits: numbers whose group ends with the input come first
+        vehicles = queryset.filter(vrn_key__istartswith=vrn_key).order_by("vrn_key")
+        serializer = self.get_serializer(vehicles[: self.vrn_prefix_limit], many=True)
+        return Response(serializer.data)
 
     def perform_create(self, serializer):
         serializer.save(garage=self.garage)
@@ -76,8 +125,9 @@ class VehicleViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
 
 
 @appointments_schema
-class AppointmentViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class AppointmentViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = AppointmentSerializer
+    compiled_list = True
     lookup_url_kwarg = "appointment_id"
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ["status"]
@@ -85,8 +135,8 @@ class AppointmentViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
     ordering_fields = ["scheduled_for"]
 
     def get_queryset(self):
-        return Appointment.objects.filter(garage=self.garage).select_related(
-            "garage", "vehicle", "customer", "mechanic", "service"
+        return Appointment.objects.all().select_related(
+            "vehicle__owner", "customer", "mechanic__user", "service"
         )
 
     def perform_create(self, serializer):
@@ -96,18 +146,18 @@ class AppointmentViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
         serializer.save(garage=self.garage)
 
 
-class WorkOrderViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class WorkOrderViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = WorkOrderSerializer
+    compiled_list = True
     lookup_url_kwarg = "work_order_id"
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     filterset_fields = ["status"]
-    search_fields = ["customer__first_name"]
+    search_fields = ["customer__first_name", "customer__last_name", "vehicle__registration_number"]
     ordering_fields = ["id", "open_date", "close_date"]
 
     def get_queryset(self):
-        return WorkOrder.objects.filter(garage=self.garage).select_related(
-            "garage", "customer", "vehicle"
-        )
+        return WorkOrder.objects.all().select_related("customer", "vehicle__owner")
 
     def perform_create(self, serializer):
         serializer.save(garage=self.garage)
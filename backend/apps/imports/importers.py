@@ -0,0 +1,306 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.garages.models import Vehicle
+from apps.garages.serializers import VehicleSerializer
+from apps.tenants.context import garage_context
+from apps.users.models import Customer
+from apps.users.serializers import CustomerSerializer
+from shared.serializers import get_violated_constraint
+from shared.signals import bulk_changed
+from shared.validators import get_phone_key, normalize_vrn
+
+from .models import ImportJob, ImportRowError
+from .readers import ImportFileError, read_file
+from .serializers import CustomerRowSerializer, VehicleRowSerializer
+
+logger = logging.getLogger(__name__)
+
+# errors of rows failing a constraint not checked before the insert
+CONFLICT_ERROR = "The row conflicts with an existing record."
+
+
+class Importer:
+    """
+    Imports the rows of a file into a garage, in chunks of `chunk_size` rows. Each chunk
+    is validated with a query per check for all of its rows, inserted with one
+    `bulk_create`, and committed along with its errors and the progress of the job.
+
+    Memory stays bounded by the chunk, whatever the size of the file: rows are streamed
+    (see `apps.imports.readers`), and the rows they relate to (owners, existing keys)
+    are read into maps for the rows of the chunk only.
+
+    Subclasses define the model, the row serializer, and:
+
+    - `unique_keys`: key field -> (serializer field, message) of the values unique in a
+      garage, checked against the garage and the other rows of the chunk.
+    - `get_key_values(data)`: the key values of a valid row.
+    - `build(data, maps)`: the instance of a valid row, `maps` being the result of
+      `get_maps(rows)`.
+    """
+
+    model = None
+    serializer_class = None
+    unique_keys = {}
+
+    def __init__(self, job: ImportJob, using: str):
+        self.job = job
+        self.using = using
+        self.serializer = self.serializer_class()
+
+    def get_queryset(self, model=None):
+        return (model or self.model).objects.using(self.using)
+
+    def get_key_values(self, data: dict) -> dict:
+        raise NotImplementedError
+
+    def get_maps(self, rows: dict[int, dict]) -> dict:
+        return {}
+
+    def check(self, rows: dict[int, dict], maps: dict) -> dict[int, dict]:
+        """Return the errors of valid rows that depend on other rows, by row number."""
+        keys = {row: self.get_key_values(data) for row, data in rows.items()}
+        query = Q()
+        for field in self.unique_keys:
+            values = {values[field] for values in keys.values()} - {None}
+            if values:
+                query |= Q(**{f"{field}__in": values})
+        existing = {field: set() for field in self.unique_keys}
+        if query:
+            for values in self.get_queryset().filter(query).values(*self.unique_keys):
+                for field, value in values.items():
+                    existing[field].add(value)
+
+        errors = {}
+        for row, values in keys.items():
+            row_errors = {}
+            for field, (name, message) in self.unique_keys.items():
+                value = values[field]
+                if value is None:
+                    continue
+                if value in existing[field]:
+                    row_errors[name] = [message]
+                # later rows of the chunk repeating the value fail like rows of later chunks
+                existing[field].add(value)
+            if row_errors:
+                errors[row] = row_errors
+        return errors
+
+    def build(self, data: dict, maps: dict):
+        raise NotImplementedError
+
+    def get_conflict_errors(self, exc: IntegrityError) -> dict:
+        constraint = get_violated_constraint(self.model, exc)
+        for field, (name, message) in self.unique_keys.items():
+            if constraint is not None and field in constraint.fields:
+                return {name: [message]}
+        return {"non_field_errors": [CONFLICT_ERROR]}
+
+    def insert(self, objs: dict[int, object], errors: dict[int, dict]) -> list:
+        """
+        Insert the instances of a chunk, return the inserted ones. When the batch fails a
+        constraint (a row written concurrently, a constraint not checked), rows are
+        inserted one by one and the failing ones are reported.
+        """
+        queryset = self.get_queryset()
+        try:
+            with transaction.atomic(using=self.using):
+                queryset.bulk_create(list(objs.values()))
+            return list(objs.values())
+        except IntegrityError:
+            pass
+
+        inserted = []
+        for row, obj in objs.items():
+            try:
+                with transaction.atomic(using=self.using):
+                    queryset.bulk_create([obj])
+                inserted.append(obj)
+            except IntegrityError as exc:
+                errors[row] = self.get_conflict_errors(exc)
+        return inserted
+
+    def get_pks(self, objs: list) -> list[int]:
+        """Return the ids of inserted instances, read back if the backend does not return them."""
+        if all(obj.pk is not None for obj in objs):
+            return [obj.pk for obj in objs]
+        field = next(iter(self.unique_keys))
+        values = [getattr(obj, field) for obj in objs]
+        return list(
+            self.get_queryset().filter(**{f"{field}__in": values}).values_list("pk", flat=True)
+        )
+
+    def import_chunk(self, chunk: list[tuple[int, dict]]) -> None:
+        rows, errors = {}, {}
+        for row, values in chunk:
+            if not values:
+                # blank line
+                continue
+            try:
+                rows[row] = self.serializer.run_validation(values)
+            except serializers.ValidationError as exc:
+                errors[row] = exc.detail
+
+        maps = self.get_maps(rows)
+        errors.update(self.check(rows, maps))
+        objs = {row: self.build(data, maps) for row, data in rows.items() if row not in errors}
+
+        with transaction.atomic(using=self.using):
+            inserted = self.insert(objs, errors) if objs else []
+            if inserted:
+                bulk_changed.send(
+                    sender=self.model,
+                    garage_id=self.job.garage_id,
+                    pks=self.get_pks(inserted),
+                    using=self.using,
+                )
+            ImportRowError.objects.using(self.using).bulk_create(
+                ImportRowError(garage_id=self.job.garage_id, job=self.job, row=row, errors=detail)
+                for row, detail in sorted(errors.items())
+            )
+            # committed with the rows, so an interrupted import resumes after them
+            self.get_queryset(ImportJob).filter(pk=self.job.pk).update(
+                processed_rows=F("processed_rows") + len(chunk),
+                created_rows=F("created_rows") + len(inserted),
+                error_rows=F("error_rows") + len(errors),
+            )
+        self.job.processed_rows += len(chunk)
+        self.job.created_rows += len(inserted)
+        self.job.error_rows += len(errors)
+
+    def run(self, chunk_size: int) -> None:
+        """Import the rows of the file not imported yet."""
+        with self.job.file.open("rb") as file:
+            _, rows = read_file(file, self.job.file.name)
+            # rows are numbered as in the file, the header being the first one
+            rows = islice(enumerate(rows, start=2), self.job.processed_rows, None)
+            while chunk := list(islice(rows, chunk_size)):
+                self.import_chunk(chunk)
+
+
+class CustomerImporter(Importer):
+    model = Customer
+    serializer_class = CustomerRowSerializer
+    unique_keys = {
+        "phone_key": (
+            "phone_number",
+            CustomerSerializer.Meta.garage_unique_fields["phone_number"],
+        ),
+        "email": ("email", CustomerSerializer.Meta.garage_unique_fields["email"]),
+    }
+
+    def get_key_values(self, data):
+        return {"phone_key": get_phone_key(data["phone_number"]), "email": data.get("email")}
+
+    def build(self, data, maps):
+        # bulk_create does not call save(), which sets the phone key
+        phone_key = get_phone_key(data["phone_number"])
+        return Customer(garage_id=self.job.garage_id, phone_key=phone_key, **data)
+
+
+class VehicleImporter(Importer):
+    model = Vehicle
+    serializer_class = VehicleRowSerializer
+    unique_keys = {
+        "vrn_key": (
+            "registration_number",
+            VehicleSerializer.Meta.garage_unique_fields["registration_number"],
+        ),
+    }
+
+    def get_key_values(self, data):
+        return {"vrn_key": normalize_vrn(data["registration_number"]) or None}
+
+    def get_maps(self, rows):
+        """Map the phone keys of the owners of the rows to the ids of their customers."""
+        phone_keys = {get_phone_key(data["owner_phone_number"]) for data in rows.values()}
+        owners = self.get_queryset(Customer).filter(phone_key__in=phone_keys - {None})
+        return {"owners": dict(owners.values_list("phone_key", "pk"))}
+
+    def check(self, rows, maps):
+        errors = super().check(rows, maps)
+        for row, data in rows.items():
+            if get_phone_key(data["owner_phone_number"]) not in maps["owners"]:
+                errors.setdefault(row, {})["owner_phone_number"] = [
+                    "No customer with this phone number."
+                ]
+            if not normalize_vrn(data["registration_number"]):
+                errors.setdefault(row, {})["registration_number"] = [
+                    "Enter a valid registration number."
+                ]
+        return errors
+
+    def build(self, data, maps):
+        data = dict(data)
+        owner_id = maps["owners"][get_phone_key(data.pop("owner_phone_number"))]
+        # bulk_create does not call save(), which sets the registration key
+        return Vehicle(
+            garage_id=self.job.garage_id,
+            owner_id=owner_id,
+            vrn_key=normalize_vrn(data["registration_number"]),
+            **data,
+        )
+
+
+IMPORTERS = {
+    ImportJob.Kind.CUSTOMERS: CustomerImporter,
+    ImportJob.Kind.VEHICLES: VehicleImporter,
+}
+
+
+def run_import(job: ImportJob) -> None:
+    """Run (or resume) an import job, recording its outcome on the job."""
+    with garage_context(job.garage):
+        using = router.db_for_write(ImportJob)
+        jobs = ImportJob.objects.using(using).filter(pk=job.pk)
+        job.status, job.started_at, job.error = ImportJob.Status.RUNNING, timezone.now(), ""
+        jobs.update(status=job.status, started_at=job.started_at, error="")
+        try:
+            IMPORTERS[job.kind](job, using).run(settings.IMPORT_CHUNK_SIZE)
+        except ImportFileError as exc:
+            job.status, job.error = ImportJob.Status.FAILED, str(exc)
+        except Exception:
+            logger.exception("Import %s failed", job.pk)
+            job.status, job.error = ImportJob.Status.FAILED, "Unexpected error, the import stopped."
+        else:
+            job.status = ImportJob.Status.COMPLETED
+        job.finished_at = timezone.now()
+        jobs.update(status=job.status, error=job.error, finished_at=job.finished_at)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool running imports, of IMPORT_WORKERS threads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import"
+            )
+    return _executor
+
+
+def _run_in_pool(job: ImportJob) -> None:
+    # pool threads outlive requests, their connections are recycled like theirs
+    close_old_connections()
+    try:
+        run_import(job)
+    finally:
+        close_old_connections()
+
+
+def start_import(job: ImportJob) -> None:
+    """Run an import job in the background, once the transaction creating it commits."""
+    using = router.db_for_write(ImportJob)
+    transaction.on_commit(lambda: get_executor().submit(_run_in_pool, job), using=using)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.imports.importers import run_import
+from apps.imports.models import ImportJob
+from apps.tenants.sharding import get_shard_for_garage
+
+
+class Command(BaseCommand):
+    help = (
+        "Run an import job in the foreground, resuming after the rows already imported, "
+        "e.g. after the process running it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("garage", type=int, help="Id of the garage of the import.")
+        parser.add_argument("job", type=int, help="Id of the import job.")
+        parser.add_argument(
+            "--force", action="store_true", help="Run the job even if it is marked as running."
+        )
+
+    def handle(self, *args, **options):
+        database = get_shard_for_garage(options["garage"])
+        try:
+            job = (
+                ImportJob.objects_all_garages.using(database)
+                .select_related("garage")
+                .get(pk=options["job"], garage_id=options["garage"])
+            )
+        except ImportJob.DoesNotExist:
+            raise CommandError(f"Import {options['job']} of garage {options['garage']} not found.")
+        if job.status == ImportJob.Status.RUNNING and not options["force"]:
+            raise CommandError(
+                f"Import {job.pk} is running, use --force if the process running it stopped."
+            )
+
+        run_import(job)
+        self.stdout.write(
+            f"  {job.processed_rows} rows: {job.created_rows} imported, {job.error_rows} errors"
+        )
+        if job.status == ImportJob.Status.FAILED:
+            raise CommandError(f"Import {job.pk} failed: {job.error}")
+        self.stdout.write(self.style.SUCCESS("Done."))
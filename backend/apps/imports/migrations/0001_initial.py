@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:49
+
+import django.db.models.deletion
+import django.db.models.manager
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tenants', '0002_garageshard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('CUSTOMERS', 'Customers'), ('VEHICLES', 'Vehicles')], max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('file', models.FileField(upload_to='imports/')),
+                ('processed_rows', models.PositiveIntegerField(default=0, help_text='Rows read and committed so far, valid or not.')),
+                ('created_rows', models.PositiveIntegerField(default=0)),
+                ('error_rows', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='', help_text='Why the import failed.')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage')),
+            ],
+            options={
+                'abstract': False,
+            },
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportRowError',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.PositiveIntegerField(help_text='Line of the row in the file (header is 1).')),
+                ('errors', models.JSONField()),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='row_errors', to='imports.importjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'row'], name='importrowerror_job_row_idx')],
+            },
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
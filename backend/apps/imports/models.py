@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import models
+
+from shared.models import GarageAwareModel, GarageMixin, TimeStampMixin
+
+
+class ImportJob(GarageMixin, TimeStampMixin, GarageAwareModel):
+    """
+    Import of a spreadsheet (CSV or XLSX) of customers or vehicles into a garage (see
+    `apps.imports.importers`). Counters are committed with each chunk of rows, so they
+    show the progress of a running import and where to resume an interrupted one.
+    """
+
+    # progress changes on every chunk, responses are never cached by version
+    track_versions = False
+
+    class Kind(models.TextChoices):
+        CUSTOMERS = "CUSTOMERS", "Customers"
+        VEHICLES = "VEHICLES", "Vehicles"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        COMPLETED = "COMPLETED", "Completed"
+        FAILED = "FAILED", "Failed"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to="imports/")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="import_jobs",
+    )
+    processed_rows = models.PositiveIntegerField(
+        default=0, help_text="Rows read and committed so far, valid or not."
+    )
+    created_rows = models.PositiveIntegerField(default=0)
+    error_rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="", help_text="Why the import failed.")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import #{self.pk} ({self.status})"
+
+
+class ImportRowError(GarageMixin, GarageAwareModel):
+    """Errors of a row of an import that was not imported, by field."""
+
+    track_versions = False
+
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name="row_errors")
+    row = models.PositiveIntegerField(help_text="Line of the row in the file (header is 1).")
+    errors = models.JSONField()
+
+    class Meta:
+        indexes = [models.Index(fields=["job", "row"], name="importrowerror_job_row_idx")]
+
+    def __str__(self):
+        return f"Import #{self.job_id} row {self.row}"
@@ -0,0 +1,91 @@
+import csv
+import io
+import zipfile
+from collections.abc import Iterator
+from datetime import date
+from pathlib import PurePath
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+
+class ImportFileError(Exception):
+    """The file of an import can not be read (format, encoding, header)."""
+
+
+def format_cell(value) -> str:
+    """Return a cell as text: spreadsheets store numbers (phones, years) as floats."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def normalize_column(name) -> str:
+    """Return the field a column is read into: "Phone Number" -> "phone_number"."""
+    return "_".join(format_cell(name).lower().replace("-", " ").split())
+
+
+def read_csv(file) -> Iterator[list]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f"Invalid CSV file: {exc}.")
+    finally:
+        # the wrapper would close the file it reads
+        text.detach()
+
+
+def read_xlsx(file) -> Iterator[tuple]:
+    try:
+        # read only: rows are parsed from the XML as they are iterated, not all loaded
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as exc:
+        raise ImportFileError(f"Invalid XLSX file: {exc}.")
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+READERS = {".csv": read_csv, ".xlsx": read_xlsx}
+
+
+def get_extension(name: str) -> str:
+    return PurePath(name).suffix.lower()
+
+
+def read_file(file, name: str) -> tuple[list[str], Iterator[dict[str, str]]]:
+    """
+    Read the header of a CSV or XLSX file (by the extension of `name`), return its
+    columns and an iterator streaming the following rows as dicts of text by column,
+    without empty cells. Blank rows are yielded empty, so rows keep their position.
+    """
+    reader = READERS.get(get_extension(name))
+    if reader is None:
+        raise ImportFileError(f"Unsupported file type, use one of: {', '.join(READERS)}.")
+
+    rows = reader(file)
+    header = next(rows, None)
+    if header is None:
+        rows.close()
+        raise ImportFileError("The file is empty.")
+    columns = [(position, normalize_column(name)) for position, name in enumerate(header)]
+    columns = [(position, column) for position, column in columns if column]
+    return [column for _, column in columns], _read_rows(rows, columns)
+
+
+def _read_rows(rows: Iterator, columns: list[tuple[int, str]]) -> Iterator[dict[str, str]]:
+    try:
+        for row in rows:
+            values = {
+                column: format_cell(row[position]) if position < len(row) else ""
+                for position, column in columns
+            }
+            yield {column: value for column, value in values.items() if value}
+    finally:
+        rows.close()
@@ -0,0 +1,19 @@
+from drf_spectacular.utils import extend_schema, extend_schema_view
+
+from .serializers import ImportRowErrorSerializer
+
+import_schema = extend_schema_view(
+    list=extend_schema(description="List the imports of a garage, latest first."),
+    create=extend_schema(
+        description=(
+            "Upload a CSV or XLSX file of customers or vehicles (owners given by "
+            "`owner_phone_number`) to import into a garage. The file is imported in the "
+            "background, its progress is read from the import."
+        ),
+    ),
+    retrieve=extend_schema(description="Retrieve an import of a garage and its progress."),
+    errors=extend_schema(
+        description="List the rows of an import that were not imported, with their errors.",
+        responses=ImportRowErrorSerializer(many=True),
+    ),
+)
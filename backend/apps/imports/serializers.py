@@ -0,0 +1,111 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.garages.models import Vehicle
+from apps.users.models import Customer
+from shared.validators import normalize_nepali_phone
+
+from .models import ImportJob, ImportRowError
+from .readers import ImportFileError, read_file
+
+
+class CustomerRowSerializer(serializers.ModelSerializer):
+    """A customer row of an import."""
+
+    class Meta:
+        model = Customer
+        fields = ["first_name", "last_name", "phone_number", "email", "address"]
+
+    def to_internal_value(self, data):
+        # spreadsheets keep phone numbers formatted, the canonical form is validated
+        if "phone_number" in data:
+            data = {**data, "phone_number": normalize_nepali_phone(data["phone_number"])}
+        return super().to_internal_value(data)
+
+
+class VehicleRowSerializer(serializers.ModelSerializer):
+    """A vehicle row of an import, its owner given by phone number."""
+
+    owner_phone_number = serializers.CharField(max_length=20)
+
+    class Meta:
+        model = Vehicle
+        fields = [
+            "owner_phone_number",
+            "registration_number",
+            "make",
+            "model",
+            "year",
+            "odometer_reading",
+            "fuel_type",
+        ]
+        # registration numbers are checked for all the rows of a chunk at once
+        extra_kwargs = {"registration_number": {"validators": []}}
+
+    def to_internal_value(self, data):
+        if "fuel_type" in data:
+            data = {**data, "fuel_type": data["fuel_type"].upper()}
+        return super().to_internal_value(data)
+
+
+ROW_SERIALIZERS = {
+    ImportJob.Kind.CUSTOMERS: CustomerRowSerializer,
+    ImportJob.Kind.VEHICLES: VehicleRowSerializer,
+}
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "kind",
+            "file",
+            "status",
+            "processed_rows",
+            "created_rows",
+            "error_rows",
+            "error",
+            "started_at",
+            "finished_at",
+            "created_at",
+        ]
+        read_only_fields = [
+            "status",
+            "processed_rows",
+            "created_rows",
+            "error_rows",
+            "error",
+            "started_at",
+            "finished_at",
+        ]
+        extra_kwargs = {"file": {"write_only": True}}
+
+    def validate_file(self, value):
+        if value.size > settings.IMPORT_MAX_FILE_SIZE:
+            limit = settings.IMPORT_MAX_FILE_SIZE // (1024 * 1024)
+            raise serializers.ValidationError(f"Files can not be larger than {limit} MB.")
+        return value
+
+    def validate(self, attrs):
+        """Check the header of the file, so a wrong file is rejected before it is imported."""
+        file = attrs["file"]
+        try:
+            columns, rows = read_file(file, file.name)
+            rows.close()
+        except ImportFileError as exc:
+            raise serializers.ValidationError({"file": [str(exc)]})
+        finally:
+            file.seek(0)
+
+        fields = ROW_SERIALIZERS[attrs["kind"]]().fields
+        missing = [name for name, field in fields.items() if field.required and name not in columns]
+        if missing:
+            raise serializers.ValidationError({"file": [f"Missing columns: {', '.join(missing)}."]})
+        return attrs
+
+
+class ImportRowErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportRowError
+        fields = ["row", "errors"]
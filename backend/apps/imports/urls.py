@@ -0,0 +1,8 @@
+from rest_framework import routers
+
+from . import views
+
+router = routers.SimpleRouter()
+router.register(r"imports", views.ImportJobViewSet, basename="imports")
+
+urlpatterns = router.urls
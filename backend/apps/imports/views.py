@@ -0,0 +1,43 @@
+from rest_framework import mixins
+from rest_framework.decorators import action
+
+from apps.tenants.viewsets import GarageGenericViewSet
+from apps.users.permissions import IsGarageAdminClaim
+
+from .importers import start_import
+from .models import ImportJob, ImportRowError
+from .schemas import import_schema
+from .serializers import ImportJobSerializer, ImportRowErrorSerializer
+
+
+@import_schema
+class ImportJobViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    GarageGenericViewSet,
+):
+    """
+    Imports of spreadsheets of customers and vehicles. Files are imported in the
+    background (see `apps.imports.importers`); clients poll the import for its progress
+    and read the rows that failed from `errors`.
+    """
+
+    serializer_class = ImportJobSerializer
+    lookup_url_kwarg = "import_id"
+    permission_classes = [IsGarageAdminClaim]
+
+    def get_queryset(self):
+        return ImportJob.objects.order_by("-id")
+
+    def perform_create(self, serializer):
+        job = serializer.save(garage=self.garage, created_by_id=self.request.user.pk)
+        start_import(job)
+
+    @action(detail=True, methods=["get"], serializer_class=ImportRowErrorSerializer)
+    def errors(self, request, *args, **kwargs):
+        job = self.get_object()
+        queryset = ImportRowError.objects.filter(job=job).order_by("row")
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,332 @@
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections, router
+
+from apps.search.index import get_words
+from apps.tenants.context import garage_context
+from apps.tenants.versions import are_versions_shared, get_model_version
+
+from .models import Part
+
+# fields of the parts kept in the indexes, returned by `match`
+FIELDS = ("id", "name", "sku", "brand", "selling_price", "quantity")
+# approximate size (bytes) of a key of a part besides its string (its slots in the
+# sorted arrays and in the keys of the part), and of a part besides its strings
+ENTRY_SIZE = 24
+RECORD_SIZE = 300
+# greater than any character, so word + LAST_CHAR bounds the keys starting with word
+LAST_CHAR = "\U0010ffff"
+# parts are checked one by one against a word when it matches this many times more
+# parts, instead of reading all of its matches
+CHECK_RATIO = 8
+# gap between the ranks of consecutive parts, so saved parts get a rank in between
+RANK_STEP = 1 << 16
+
+
+def format_price(value) -> str:
+    """Format a price the way its DecimalField renders it ("2" -> "2.00")."""
+    places = Part._meta.get_field("selling_price").decimal_places
+    return f"{Decimal(str(value)):.{places}f}"
+
+
+def get_part_keys(part: dict) -> set[str]:
+    """
+    Return the keys of a part: the words of its name, SKU and brand, and the words of
+    its SKU joined ("SKU-0012" -> "sku", "0012", "sku0012").
+    """
+    keys = set(get_words(part["name"])) | set(get_words(part["brand"]))
+    sku = get_words(part["sku"])
+    keys.update(sku)
+    if len(sku) > 1:
+        keys.add("".join(sku))
+    return {sys.intern(key) for key in keys}
+
+
+def rank_parts(parts, words: list[str], limit: int) -> list[dict]:
+    """
+    Return the first `limit` of parts (dicts of `FIELDS`, by name), parts where the last
+    word is a whole key first, like `PartIndex.match`. Parts are read until `limit` whole
+    matches are found.
+    """
+    last = words[-1]
+    whole, others = [], []
+    for part in parts:
+        if last in get_part_keys(part):
+            whole.append(part)
+            if len(whole) == limit:
+                break
+        elif len(others) < limit:
+            others.append(part)
+    return (whole + others)[:limit]
+
+
+class PartIndex:
+    """
+    Prefix index of the parts of a garage: sorted keys, with the id of the part of each
+    key in a parallel array, so the parts matching a prefix are one bisect away.
+
+    Parts are ranked by name: `ranks` maps ids to integers in name order, spaced by
+    RANK_STEP so a saved part can be ranked without renumbering the others.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.keys: list[str] = []
+        self.ids: list[int] = []
+        # part rows as tuples (FIELDS) and their keys, the ranks of the parts, and
+        # (name, id) sorted
+        self.parts: dict[int, tuple] = {}
+        self.part_keys: dict[int, tuple[str, ...]] = {}
+        self.ranks: dict[int, int] = {}
+        self.names: list[tuple[str, int]] = []
+        self.size = 0
+
+    @classmethod
+    def build(cls, parts: list[dict], version: int) -> "PartIndex":
+        index = cls(version)
+        entries = []
+        for part in parts:
+            keys = get_part_keys(part)
+            index.parts[part["id"]] = tuple(part[field] for field in FIELDS)
+            index.part_keys[part["id"]] = tuple(keys)
+            index.size += index.get_part_size(part, keys)
+            entries.extend((key, part["id"]) for key in keys)
+        entries.sort()
+        index.keys = [key for key, _ in entries]
+        index.ids = [part_id for _, part_id in entries]
+        index.names = sorted((part["name"].casefold(), part["id"]) for part in parts)
+        index.renumber()
+        return index
+
+    def get_part_size(self, part: dict, keys) -> int:
+        strings = sum(sys.getsizeof(part[field]) for field in ("name", "sku", "brand"))
+        return RECORD_SIZE + strings + sum(sys.getsizeof(key) + ENTRY_SIZE for key in keys)
+
+    def renumber(self) -> None:
+        self.ranks = {part_id: i * RANK_STEP for i, (_, part_id) in enumerate(self.names)}
+
+    def get_part(self, part_id: int) -> dict:
+        return dict(zip(FIELDS, self.parts[part_id]))
+
+    def add(self, part: dict) -> None:
+        self.remove(part["id"])
+        keys = get_part_keys(part)
+        self.parts[part["id"]] = tuple(part[field] for field in FIELDS)
+        self.part_keys[part["id"]] = tuple(keys)
+        self.size += self.get_part_size(part, keys)
+        for key in keys:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, part["id"])
+
+        name = (part["name"].casefold(), part["id"])
+        position = bisect_left(self.names, name)
+        self.names.insert(position, name)
+        before = self.ranks[self.names[position - 1][1]] if position > 0 else -RANK_STEP
+        after = (
+            self.ranks[self.names[position + 1][1]]
+            if position + 1 < len(self.names)
+            else before + 2 * RANK_STEP
+        )
+        if after - before < 2:
+            self.renumber()
+        else:
+            self.ranks[part["id"]] = (before + after) // 2
+
+    def remove(self, part_id: int) -> None:
+        row = self.parts.pop(part_id, None)
+        if row is None:
+            return
+        part = dict(zip(FIELDS, row))
+        keys = self.part_keys.pop(part_id)
+        self.size -= self.get_part_size(part, keys)
+        for key in keys:
+            position = bisect_left(self.keys, key)
+            while self.ids[position] != part_id:
+                position += 1
+            del self.keys[position]
+            del self.ids[position]
+        self.names.remove((part["name"].casefold(), part_id))
+        del self.ranks[part_id]
+
+    def match(self, words: list[str], limit: int) -> list[dict]:
+        """
+        Return the `limit` parts with a key starting with each word, by name, parts
+        where the last word (the one being typed) is a whole word first.
+        """
+        if not words:
+            return []
+        ranges = []
+        for word in words:
+            start = bisect_left(self.keys, word)
+            end = bisect_left(self.keys, word + LAST_CHAR, start)
+            ranges.append((end - start, start, end, word))
+        # from the word matching the fewest keys
+        ranges.sort()
+        _, start, end, _ = ranges[0]
+        matches = set(self.ids[start:end])
+        for size, start, end, word in ranges[1:]:
+            if not matches:
+                return []
+            if size > len(matches) * CHECK_RATIO:
+                matches = {
+                    part_id
+                    for part_id in matches
+                    if any(key.startswith(word) for key in self.part_keys[part_id])
+                }
+            else:
+                matches.intersection_update(self.ids[start:end])
+
+        last = words[-1]
+        if len(matches) * CHECK_RATIO < len(self.parts):
+            whole = {part_id for part_id in matches if last in self.part_keys[part_id]}
+        else:
+            start = bisect_left(self.keys, last)
+            whole = matches.intersection(self.ids[start : bisect_right(self.keys, last, start)])
+        results = []
+        for ids in (whole, matches - whole):
+            if len(results) >= limit:
+                break
+            # sorting integers in C is faster than picking the first ones in Python
+            results.extend(sorted(ids, key=self.ranks.__getitem__)[: limit - len(results)])
+        return [self.get_part(part_id) for part_id in results]
+
+
+class PartAutocomplete:
+    """
+    Per-process prefix indexes of the parts of the most recently used garages, for
+    autocompletion without a query per keystroke.
+
+    - Indexes are built on first use, in a background thread; until then (and while
+      one is stale) `match` returns None and the caller falls back to the database.
+    - An index is valid for one version of the parts of its garage (see
+      `apps.tenants.versions`). Saves and deletes in this process are applied to it
+      (`add`, `remove`), changes from other processes make it stale and it is rebuilt.
+      Indexes are only used when the versions are shared by all processes, otherwise
+      changes from the other processes would go unnoticed.
+    - Least recently used indexes are evicted once the indexes take more than
+      `memory_budget` bytes (approximately).
+    """
+
+    def __init__(self, memory_budget: int):
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+        self._indexes: OrderedDict[int, PartIndex] = OrderedDict()
+        # garages whose index is being built, or too large for the budget (by version)
+        self._building: set[int] = set()
+        self._oversized: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autocomplete")
+
+    def match(self, garage, query: str, limit: int) -> list[dict] | None:
+        """Return the parts of a garage matching the words of query, or None without an index."""
+        if not are_versions_shared():
+            return None
+        words = get_words(query)
+        version = get_model_version(Part, garage.pk)
+        with self._lock:
+            index = self._indexes.get(garage.pk)
+            if index is not None and index.version == version:
+                self._indexes.move_to_end(garage.pk)
+                self.hits += 1
+                return index.match(words, limit)
+
+            self._indexes.pop(garage.pk, None)
+            self.misses += 1
+            if garage.pk in self._building or self._oversized.get(garage.pk) == version:
+                return None
+            self._building.add(garage.pk)
+        self._executor.submit(self._build, garage)
+        return None
+
+    def add(self, garage_id: int, part: dict) -> None:
+        """Apply a committed save of a part (its `FIELDS`) to the index of its garage."""
+        self._apply(garage_id, lambda index: index.add(part))
+
+    def remove(self, garage_id: int, part_id: int) -> None:
+        """Apply a committed delete of a part to the index of its garage."""
+        self._apply(garage_id, lambda index: index.remove(part_id))
+
+    def _apply(self, garage_id: int, change) -> None:
+        """
+        Apply a committed change to the index of a garage, and move the index to the
+        version of the parts read after the change bumped it (see apps.tenants.signals).
+        The index is dropped, to be rebuilt, when the version moved by more than that
+        bump: it missed changes from other processes.
+        """
+        if garage_id not in self._indexes:
+            return
+        version = get_model_version(Part, garage_id)
+        with self._lock:
+            index = self._indexes.get(garage_id)
+            if index is None:
+                return
+            if version != index.version + 1:
+                del self._indexes[garage_id]
+                return
+            change(index)
+            index.version = version
+            self._evict()
+
+    def discard(self, garage_id: int) -> None:
+        """Drop the index of a garage, e.g. after a change that can not be applied to it."""
+        with self._lock:
+            self._indexes.pop(garage_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._oversized.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "garages": len(self._indexes),
+                "size": sum(index.size for index in self._indexes.values()),
+                "memory_budget": self.memory_budget,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _build(self, garage) -> None:
+        # the pool thread outlives requests, its connections are recycled like theirs
+        close_old_connections()
+        try:
+            with garage_context(garage):
+                # the version is read first, so rows changed during the build make the
+                # index stale instead of missing from it; rows are read from the primary
+                version = get_model_version(Part, garage.pk)
+                parts = list(Part.objects.using(router.db_for_write(Part)).values(*FIELDS))
+                for part in parts:
+                    part["selling_price"] = format_price(part["selling_price"])
+                index = PartIndex.build(parts, version)
+            with self._lock:
+                if index.size > self.memory_budget:
+                    self._oversized[garage.pk] = version
+                else:
+                    self._indexes[garage.pk] = index
+                    self._evict()
+        finally:
+            with self._lock:
+                self._building.discard(garage.pk)
+            close_old_connections()
+
+    def _evict(self) -> None:
+        size = sum(index.size for index in self._indexes.values())
+        while size > self.memory_budget and self._indexes:
+            _, index = self._indexes.popitem(last=False)
+            size -= index.size
+
+
+part_autocomplete = PartAutocomplete(
+    memory_budget=getattr(settings, "PART_AUTOCOMPLETE_MEMORY_BUDGET", 64 * 1024 * 1024)
+)
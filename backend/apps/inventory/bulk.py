@@ -0,0 +1,138 @@
+from django.db import connections, router, transaction
+from rest_framework import serializers
+
+from apps.tenants.context import garage_context
+from shared.signals import bulk_changed
+
+from .models import Category, Part, Supplier
+from .serializers import PartRowSerializer
+
+# fields of existing parts (matched by SKU) overwritten by upserts
+UPSERT_FIELDS = [
+    "name",
+    "brand",
+    "category_id",
+    "supplier_id",
+    "purchase_price",
+    "selling_price",
+    "quantity",
+    "updated_at",
+]
+BATCH_SIZE = 500
+
+
+def validate_part_rows(garage, rows: list) -> tuple[dict[int, dict], dict[int, dict]]:
+    """
+    Validate parts to write in bulk, return the valid rows and the errors of the others,
+    by position. Categories and suppliers are checked with one query each, and SKUs
+    must be unique within the rows, ignoring case like the default collation of the
+    unique constraint.
+    """
+    serializer = PartRowSerializer()
+    valid, errors = {}, {}
+    for index, row in enumerate(rows):
+        try:
+            valid[index] = serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            errors[index] = exc.detail
+
+    relations = {
+        "category_id": Category.objects.filter(garage=garage, is_active=True),
+        "supplier_id": Supplier.objects.filter(garage=garage, is_active=True),
+    }
+    existing = {}
+    for field, queryset in relations.items():
+        ids = {row[field] for row in valid.values()}
+        existing[field] = set(queryset.filter(pk__in=ids).values_list("pk", flat=True))
+    does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages["does_not_exist"]
+
+    skus = set()
+    for index, row in list(valid.items()):
+        row_errors = {
+            field: [does_not_exist.format(pk_value=row[field])]
+            for field in relations
+            if row[field] not in existing[field]
+        }
+        if row["sku"].casefold() in skus:
+            row_errors["sku"] = ["Part with this SKU is already in the request."]
+        if row_errors:
+            errors[index] = row_errors
+            del valid[index]
+        else:
+            skus.add(row["sku"].casefold())
+    return valid, errors
+
+
+def upsert_parts(garage, rows: list) -> list[dict]:
+    """
+    Create the parts of a garage with new SKUs and update the parts with existing ones,
+    in batched upserts on the unique_sku_per_garage constraint.
+
+    Return the result of each row, in order: {"index", "status", "id"} where status is
+    "created" or "updated", or {"index", "status": "invalid", "errors"}.
+    """
+    valid, errors = validate_part_rows(garage, rows)
+    results = [{"index": index, "status": "invalid", "errors": errors[index]} for index in errors]
+    if not valid:
+        return sorted(results, key=lambda result: result["index"])
+
+    with garage_context(garage):
+        # primary reads: existing SKUs and ids must not come from a lagging replica
+        using = router.db_for_write(Part)
+        queryset = Part.objects.using(using)
+        skus = [row["sku"] for row in valid.values()]
+        # SKUs are compared by the database (its collation may ignore case), so parts
+        # are told apart by id rather than by their SKU as given
+        existing = set(queryset.filter(sku__in=skus).values_list("pk", flat=True))
+        parts = [Part(garage=garage, **row) for row in valid.values()]
+
+        # MySQL upserts on any unique key, it can not be given the constraint
+        with_target = connections[using].features.supports_update_conflicts_with_target
+        unique_fields = ["garage", "sku"] if with_target else None
+        with transaction.atomic(using=using):
+            queryset.bulk_create(
+                parts,
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=UPSERT_FIELDS,
+            )
+            if any(part.pk is None for part in parts):
+                # the backend does not return the ids of upserted rows
+                ids = {
+                    sku.casefold(): pk
+                    for sku, pk in queryset.filter(sku__in=skus).values_list("sku", "pk")
+                }
+                for part in parts:
+                    part.pk = ids.get(part.sku.casefold())
+                    if part.pk is None:
+                        # equal to a stored SKU for the collation only (e.g. accents)
+                        part.pk = queryset.values_list("pk", flat=True).get(sku=part.sku)
+            bulk_changed.send(
+                sender=Part, garage_id=garage.pk, pks=[part.pk for part in parts], using=using
+            )
+
+    for index, part in zip(valid, parts):
+        status = "updated" if part.pk in existing else "created"
+        results.append({"index": index, "status": status, "id": part.pk})
+    return sorted(results, key=lambda result: result["index"])
+
+
+def delete_parts(garage, ids: list[int]) -> list[dict]:
+    """
+    Delete parts of a garage by id, return {"id", "status"} for each id, where status
+    is "deleted" or "not_found".
+    """
+    with garage_context(garage):
+        using = router.db_for_write(Part)
+        queryset = Part.objects.using(using).filter(pk__in=ids)
+        with transaction.atomic(using=using):
+            found = set(queryset.values_list("pk", flat=True))
+            # parts have no reverse relations: a raw DELETE, without the collector
+            # fetching them to send post_delete one part at a time
+            queryset._raw_delete(using)
+            bulk_changed.send(
+                sender=Part, garage_id=garage.pk, deleted_pks=list(found), using=using
+            )
+
+    return [{"id": pk, "status": "deleted" if pk in found else "not_found"} for pk in ids]
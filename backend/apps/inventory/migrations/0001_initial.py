@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+import django.core.validators
+import django.db.models.deletion
+import django.db.models.manager
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(db_index=True, max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage')),
+            ],
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Supplier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('phone_number', models.CharField(max_length=15, validators=[django.core.validators.RegexValidator(message='Enter a valid Nepali phone number.', regex='^(\\+?977)?9[78]\\d{8}$')])),
+                ('is_active', models.BooleanField(default=True)),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage')),
+            ],
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Part',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=200)),
+                ('sku', models.CharField(max_length=50)),
+                ('brand', models.CharField(blank=True, default='', max_length=100)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='parts/')),
+                ('purchase_price', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0'))])),
+                ('selling_price', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0'))])),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='parts', to='inventory.category')),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='supplied_parts', to='inventory.supplier')),
+            ],
+            managers=[
+                ('objects_all_garages', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('garage', 'name'), name='unique_category_name_per_garage'),
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(fields=('garage', 'name'), name='unique_supplier_name_per_garage'),
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(fields=('garage', 'phone_number'), name='unique_supplier_phone_number_per_garage'),
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(condition=models.Q(('email__isnull', False)), fields=('garage', 'email'), name='unique_supplier_email_per_garage'),
+        ),
+        migrations.AddConstraint(
+            model_name='part',
+            constraint=models.UniqueConstraint(fields=('garage', 'sku'), name='unique_sku_per_garage'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+        ('tenants', '0002_garageshard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['garage', 'name', 'id'], name='part_garage_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['garage', 'quantity', 'id'], name='part_garage_quantity_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_part_part_garage_name_id_idx_and_more'),
+        ('tenants', '0002_garageshard'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='supplier',
+            name='unique_supplier_phone_number_per_garage',
+        ),
+        migrations.AddField(
+            model_name='supplier',
+            name='phone_key',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(fields=('garage', 'phone_key'), name='unique_supplier_phone_number_per_garage'),
+        ),
+    ]
@@ -1,10 +1,10 @@
 from decimal import Decimal
 
-from django.db import models
 from django.core.validators import MinValueValidator
+from django.db import models
 
 # from garages.models import Job
-from shared.models import GarageMixin, TimeStampMixin, GarageAwareModel
+from shared.models import GarageAwareModel, GarageMixin, PhoneNumberMixin, TimeStampMixin
 from shared.validators import nepali_phone_validator
 
 
@@ -25,7 +25,7 @@ class Category(GarageMixin, TimeStampMixin, GarageAwareModel):
         return self.name
 
 
-class Supplier(GarageMixin, TimeStampMixin, GarageAwareModel):
+class Supplier(GarageMixin, TimeStampMixin, PhoneNumberMixin, GarageAwareModel):
     """Model representing supplier of a garage."""
 
     name = models.CharField(max_length=255)
@@ -38,8 +38,9 @@ class Supplier(GarageMixin, TimeStampMixin, GarageAwareModel):
             models.UniqueConstraint(
                 fields=["garage", "name"], name="unique_supplier_name_per_garage"
             ),
+            # canonical numbers, also the index of lookups by phone number
             models.UniqueConstraint(
-                fields=["garage", "phone_number"], name="unique_supplier_phone_number_per_garage"
+                fields=["garage", "phone_key"], name="unique_supplier_phone_number_per_garage"
             ),
             models.UniqueConstraint(
                 fields=["garage", "email"],
@@ -76,6 +77,11 @@ class Part(GarageMixin, TimeStampMixin, GarageAwareModel):
         constraints = [
             models.UniqueConstraint(fields=["garage", "sku"], name="unique_sku_per_garage"),
         ]
+        indexes = [
+            # keyset pagination (see KeysetPagination)
+            models.Index(fields=["garage", "name", "id"], name="part_garage_name_id_idx"),
+            models.Index(fields=["garage", "quantity", "id"], name="part_garage_quantity_id_idx"),
+        ]
 
     @property
     def in_stock(self):
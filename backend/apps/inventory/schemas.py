@@ -1,4 +1,4 @@
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 
 category_schema = extend_schema_view(
     list=extend_schema(description="List all categories of a garage."),
@@ -14,6 +14,23 @@ part_schema = extend_schema_view(
     retrieve=extend_schema(description="Retrieve a inventory part of a garage."),
     update=extend_schema(description="Update a inventory part of a garage."),
     destroy=extend_schema(description="Delete a inventory part of a garage."),
+    autocomplete=extend_schema(
+        description=(
+            "List the inventory parts of a garage with a name, SKU or brand word starting "
+            "with each word of the search terms, for autocompletion."
+        ),
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Search terms."),
+            OpenApiParameter("limit", int, default=10, description="Parts returned (max 50)."),
+        ],
+    ),
+    bulk=extend_schema(
+        description=(
+            "Create or update (matched by SKU) up to 1000 inventory parts of a garage. "
+            "Invalid rows are skipped and reported with their errors."
+        ),
+    ),
+    bulk_delete=extend_schema(description="Delete up to 1000 inventory parts of a garage."),
 )
 
 supplier_schema = extend_schema_view(
@@ -1,78 +1,40 @@
 from rest_framework import serializers
 
-from .models import Category, Supplier, Part
+from shared.serializers import (
+    CompiledSerializerMixin,
+    GarageUniqueFieldsMixin,
+    SparseFieldsMixin,
+)
+from shared.validators import get_phone_key, normalize_nepali_phone
 
+from .models import Category, Part, Supplier
 
-class CategorySerializer(serializers.ModelSerializer):
+
+class CategorySerializer(GarageUniqueFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "is_active", "created_at", "updated_at"]
+        garage_unique_fields = {"name": "Category with this name already exists."}
 
-    def validate_name(self, value):
-        """Check name is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        queryset = Category.objects.filter(garage=garage, name=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
 
-        if queryset.exists():
-            raise serializers.ValidationError("Category with this name already exists.")
-
-        return value
-
-
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(GarageUniqueFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Supplier
         fields = ["id", "name", "email", "phone_number", "is_active", "created_at", "updated_at"]
-
-    def validate_name(self, value):
-        """Check name is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        queryset = Supplier.objects.filter(garage=garage, name=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
-
-        if queryset.exists():
-            raise serializers.ValidationError("Supplier with this name already exists.")
-
-        return value
+        garage_unique_fields = {
+            "name": "Supplier with this name already exists.",
+            "phone_number": "Supplier with this phone number already exists.",
+            "email": "Supplier with this email already exists.",
+        }
+        # phone numbers are unique in any form
+        garage_unique_keys = {"phone_number": ("phone_key", get_phone_key)}
 
     def validate_phone_number(self, value):
-        """Check phone number is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        queryset = Supplier.objects.filter(garage=garage, phone_number=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
+        """Store phone numbers in their canonical form."""
+        return normalize_nepali_phone(value)
 
-        if queryset.exists():
-            raise serializers.ValidationError("Supplier with this phone number already exists.")
 
-        return value
-
-    def validate_email(self, value):
-        """Check email is unique per garage, if email is not None."""
-
-        garage = self.context.get("request").garage
-
-        if value:
-            queryset = Supplier.objects.filter(garage=garage, email=value)
-            if self.instance:
-                queryset = queryset.exclude(pk=self.instance.pk)
-
-            if queryset.exists():
-                raise serializers.ValidationError("Supplier with this email already exists.")
-
-        return value
-
-
-class PartSerializer(serializers.ModelSerializer):
+class PartSerializer(GarageUniqueFieldsMixin, CompiledSerializerMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.none(),
@@ -100,6 +62,12 @@ class PartSerializer(serializers.ModelSerializer):
             "created_at", "updated_at",
         ]
         # fmt: on
+        field_dependencies = {
+            "in_stock": ["quantity"],
+            "in_low_stock": ["quantity"],
+            "is_out_of_stock": ["quantity"],
+        }
+        garage_unique_fields = {"sku": "Part with this SKU already exists."}
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -108,16 +76,21 @@ class PartSerializer(serializers.ModelSerializer):
         self.fields["category_id"].queryset = Category.objects.filter(garage=garage, is_active=True)
         self.fields["supplier_id"].queryset = Supplier.objects.filter(garage=garage, is_active=True)
 
-    def validate_sku(self, value):
-        """Check sku is unique per garage."""
 
-        garage = self.context.get("request").garage
-
-        queryset = Part.objects.filter(garage=garage, sku=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
+class PartRowSerializer(serializers.ModelSerializer):
+    """
+    A part of a bulk write (see `apps.inventory.bulk`). Relations are plain ids, checked
+    for all the rows at once instead of with a query per row.
+    """
 
-        if queryset.exists():
-            raise serializers.ValidationError("Part with this SKU already exists.")
+    category_id = serializers.IntegerField(min_value=1)
+    supplier_id = serializers.IntegerField(min_value=1)
 
-        return value
+    class Meta:
+        model = Part
+        # fmt: off
+        fields = [
+            "name", "sku", "brand", "category_id", "supplier_id",
+            "purchase_price", "selling_price", "quantity",
+        ]
+        # fmt: on
@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# connect the version bumps of the tenant models first: receivers (and the on_commit
+# callbacks they register) run in connection order, and the autocomplete reads the
+# bumped version
+import apps.tenants.signals  # noqa: F401
+
+from .autocomplete import FIELDS, format_price, part_autocomplete
+from .models import Part
+
+
+@receiver(post_save, sender=Part)
+def update_part_autocomplete(sender, instance, raw=False, using=None, **kwargs):
+    """Apply saved parts to the autocomplete index of their garage once committed."""
+    if raw:
+        return
+    garage_id = instance.garage_id
+    if instance.get_deferred_fields().intersection(FIELDS):
+        # saved from a partial row (`.only()`), rebuilt instead of queried here
+        transaction.on_commit(lambda: part_autocomplete.discard(garage_id), using=using)
+        return
+
+    part = {field: getattr(instance, field) for field in FIELDS}
+    part["selling_price"] = format_price(part["selling_price"])
+    transaction.on_commit(lambda: part_autocomplete.add(garage_id, part), using=using)
+
+
+@receiver(post_delete, sender=Part)
+def remove_part_autocomplete(sender, instance, using=None, **kwargs):
+    garage_id, part_id = instance.garage_id, instance.pk
+    transaction.on_commit(lambda: part_autocomplete.remove(garage_id, part_id), using=using)
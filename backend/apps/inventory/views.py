@@ -1,13 +1,31 @@
 import logging
+from collections import Counter
 
-from rest_framework import viewsets
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.permissions import IsAuthenticated
-from django_filters.rest_framework import DjangoFilterBackend
-
-from apps.tenants.viewsets import GarageGenericViewSet
-from apps.users.permissions import IsGarageAdmin
-from .models import Category, Supplier, Part
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from apps.search.filters import IndexedSearchFilter
+from apps.search.index import get_query_terms, search_index
+from apps.tenants.viewsets import (
+    AsyncGarageGenericViewSet,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    GarageGenericViewSet,
+    StreamingListModelMixin,
+)
+from apps.users.pagination import KeysetPagination
+from apps.users.permissions import IsGarageAdminClaim, IsGarageMemberClaim
+
+from .autocomplete import FIELDS as AUTOCOMPLETE_FIELDS
+from .autocomplete import format_price, part_autocomplete, rank_parts
+from .bulk import delete_parts, upsert_parts
+from .models import Category, Part, Supplier
 from .schemas import category_schema, part_schema, supplier_schema
 from .serializers import CategorySerializer, PartSerializer, SupplierSerializer
 
@@ -15,26 +33,27 @@ logger = logging.getLogger(__name__)
 
 
 @category_schema
-class CategoryViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class CategoryViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["is_active"]
     search_fields = ["name"]
     ordering_fields = ["id", "name"]
     lookup_url_kwarg = "category_id"
+    response_cache_actions = ("list", "retrieve")
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
         if self.action in ["create", "update", "partial_update", "destroy"]:
-            permission_classes = [IsGarageAdmin]
+            permission_classes = [IsGarageAdminClaim]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        return Category.objects.filter(garage=self.garage).select_related("garage")
+        return Category.objects.all()
 
     def perform_create(self, serializer):
         serializer.save(garage=self.garage)
@@ -44,23 +63,24 @@ class CategoryViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
 
 
 @supplier_schema
-class SupplierViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class SupplierViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = SupplierSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["is_active"]
     search_fields = ["name"]
     ordering_fields = ["id", "name"]
     lookup_url_kwarg = "supplier_id"
+    response_cache_actions = ("list", "retrieve")
 
     def get_queryset(self):
-        return Supplier.objects.filter(garage=self.garage).select_related("garage")
+        return Supplier.objects.all()
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
         if self.action in ["create", "update", "partial_update", "destroy"]:
-            permission_classes = [IsGarageAdmin]
+            permission_classes = [IsGarageAdminClaim]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
@@ -76,27 +96,107 @@ from rest_framework.permissions import AllowAny
 
 
 @part_schema
-class PartViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class PartViewSet(
+    AsyncListModelMixin, AsyncRetrieveModelMixin, AsyncGarageGenericViewSet, viewsets.ModelViewSet
+):
     serializer_class = PartSerializer
-    filter_backends = [SearchFilter, OrderingFilter]
+    compiled_list = True
+    filter_backends = [IndexedSearchFilter, OrderingFilter]
     search_fields = ["name", "sku"]
     ordering_fields = ["id", "name", "purchase_price", "selling_price", "quantity"]
     lookup_url_kwarg = "part_id"
+    pagination_class = KeysetPagination
     permission_classes = [AllowAny]
+    # parts returned by `autocomplete`, default and maximum of `?limit=`, and matches read
+    # at most to rank them when the in-memory index is not available
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
+    autocomplete_max_matches = 5000
+    # rows of a bulk write
+    bulk_max_rows = 1000
 
     # def get_permissions(self):
     #     """
     #     Instantiates and returns the list of permissions that this view requires.
     #     """
     #     if self.action in ["create", "update", "partial_update", "destroy"]:
-    #         permission_classes = [IsGarageAdmin]
+    #         permission_classes = [IsGarageAdminClaim]
     #     else:
     #         permission_classes = [IsAuthenticated]
     #     return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        return Part.objects.filter(garage=self.garage).select_related(
-            "garage", "category", "supplier"
+        return Part.objects.all().select_related("category", "supplier")
+
+    @action(detail=False, methods=["get"], permission_classes=[IsGarageMemberClaim])
+    def autocomplete(self, request, *args, **kwargs):
+        """
+        List the parts with a name, SKU or brand word starting with each word of `?q=`
+        (POS part picker), from the in-memory index of the garage (see
+        `apps.inventory.autocomplete`), or from the search index while it is built.
+        Both list parts where the last word is a whole word first, then by name.
+        """
+        terms = get_query_terms([request.query_params.get(api_settings.SEARCH_PARAM, "")])
+        if not terms:
+            raise ValidationError({api_settings.SEARCH_PARAM: ["Enter a search term."]})
+        try:
+            limit = int(request.query_params.get("limit", self.autocomplete_limit))
+        except ValueError:
+            raise ValidationError({"limit": ["A valid integer is required."]})
+        limit = max(1, min(limit, self.autocomplete_max_limit))
+
+        parts = part_autocomplete.match(self.garage, " ".join(terms), limit)
+        if parts is None:
+            counts = search_index.get_term_counts(Part, self.garage.pk, terms)
+            queryset = search_index.search(
+                Part.objects.all(), self.garage.pk, terms, counts, "search_rank"
+            )
+            matches = queryset.order_by("name", "pk").values(*AUTOCOMPLETE_FIELDS)
+            parts = rank_parts(
+                matches[: self.autocomplete_max_matches].iterator(chunk_size=500), terms, limit
+            )
+            for part in parts:
+                part["selling_price"] = format_price(part["selling_price"])
+        return Response(parts)
+
+    @action(detail=False, methods=["post"], permission_classes=[IsGarageAdminClaim])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create or update (matched by SKU) a list of parts, e.g. a supplier shipment, in a
+        few queries: rows are validated together and written in batched upserts (see
+        `apps.inventory.bulk`). Invalid rows are skipped and reported in `results`.
+        """
+        rows = serializers.ListField(
+            child=serializers.DictField(), allow_empty=False, max_length=self.bulk_max_rows
+        ).run_validation(request.data)
+        results = upsert_parts(self.garage, rows)
+        counts = Counter(result["status"] for result in results)
+        return Response(
+            {
+                "created": counts["created"],
+                "updated": counts["updated"],
+                "invalid": counts["invalid"],
+                "results": results,
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-delete",
+        permission_classes=[IsGarageAdminClaim],
+    )
+    def bulk_delete(self, request, *args, **kwargs):
+        """Delete a list of parts (`{"ids": [...]}`) in one statement."""
+        ids = serializers.ListField(
+            child=serializers.IntegerField(min_value=1),
+            allow_empty=False,
+            max_length=self.bulk_max_rows,
+        ).run_validation(request.data.get("ids") if isinstance(request.data, dict) else None)
+        results = delete_parts(self.garage, list(dict.fromkeys(ids)))
+        counts = Counter(result["status"] for result in results)
+        return Response(
+            {"deleted": counts["deleted"], "not_found": counts["not_found"], "results": results}
         )
 
     def perform_create(self, serializer):
@@ -0,0 +1,185 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from contextvars import copy_context
+from string import Formatter
+
+from django.conf import settings
+from django.db import connections
+
+from .index import search_index
+
+logger = logging.getLogger(__name__)
+
+# statements limiting the run time of the next queries of a connection, by vendor
+STATEMENT_TIMEOUT_SQL = {
+    # SELECT statements only, which is all a search runs
+    "mysql": "SET SESSION max_execution_time = {milliseconds}",
+    "postgresql": "SET statement_timeout = {milliseconds}",
+}
+
+
+class StatementTimeout:
+    """
+    Execute wrapper setting a statement timeout on each connection it runs queries on,
+    before its first query, so the database cancels queries still running after
+    `timeout` seconds.
+    """
+
+    def __init__(self, timeout: float):
+        self.milliseconds = max(1, math.ceil(timeout * 1000))
+        self.connections = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        connection = context["connection"]
+        if connection.alias not in self.connections:
+            self.connections.add(connection.alias)
+            statement = STATEMENT_TIMEOUT_SQL.get(connection.vendor)
+            if statement is not None:
+                execute(statement.format(milliseconds=self.milliseconds), None, False, context)
+        return execute(sql, params, many, context)
+
+
+def _recycle_connections() -> None:
+    """
+    Close the connections of the current pool thread that broke in an earlier task.
+
+    Pool threads outlive requests and only run searches, so their connections are kept
+    open from one task to the next (each task sets its own statement timeout) instead
+    of being opened and closed per task.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None and connection.errors_occurred:
+            if not connection.is_usable():
+                connection.close()
+            connection.errors_occurred = False
+
+
+def _run_task(task, timeout: float, started: dict, name: str):
+    started[name] = time.monotonic()
+    _recycle_connections()
+    with ExitStack() as stack:
+        wrapper = StatementTimeout(timeout)
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        return task()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool running the search tasks, of SEARCH_FANOUT_WORKERS threads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SEARCH_FANOUT_WORKERS, thread_name_prefix="search"
+            )
+    return _executor
+
+
+def fan_out(tasks: dict, timeout: float) -> tuple[dict, list]:
+    """
+    Run tasks (name -> callable) concurrently, return the results of the tasks finished
+    within `timeout` seconds of their start (by name) and the names of the others, in
+    order. Tasks that fail (e.g. a query cancelled by the statement timeout) are logged
+    and reported with the late ones.
+
+    - Tasks run on a pool of SEARCH_FANOUT_WORKERS threads shared by the requests of the
+      process; tasks not started within `timeout` are cancelled.
+    - Tasks run in a copy of the context of the caller, so they see its tenant (see
+      `apps.tenants.context`) and replica state.
+    - Their queries get a statement timeout of `timeout` (MySQL and PostgreSQL), so the
+      queries of late tasks are cancelled instead of running to completion, and their
+      threads are soon free for the next tasks.
+    """
+    if not tasks:
+        return {}, []
+
+    executor = get_executor()
+    queued = time.monotonic()
+    started = {}
+    futures = {
+        name: executor.submit(copy_context().run, _run_task, task, timeout, started, name)
+        for name, task in tasks.items()
+    }
+    pending = set(futures.values())
+    while pending:
+        now = time.monotonic()
+        deadline = max(
+            started.get(name, queued) + timeout
+            for name, future in futures.items()
+            if future in pending
+        )
+        if deadline <= now:
+            break
+        _, pending = wait(pending, timeout=deadline - now, return_when=FIRST_COMPLETED)
+
+    results, late = {}, []
+    for name, future in futures.items():
+        if not future.done():
+            # late tasks finish in the background (or never start), their results are dropped
+            future.cancel()
+            late.append(name)
+        elif future.exception() is not None:
+            logger.warning("Search of %s failed", name, exc_info=future.exception())
+            late.append(name)
+        else:
+            results[name] = future.result()
+    return results, late
+
+
+class SearchSource:
+    """
+    An indexed model of the unified search, with the format of its results, e.g.
+    `SearchSource(Vehicle, label="{registration_number}", detail="{make} {model}")`.
+
+    Formats name fields of `.values()` rows (relations with "__"), so a search reads
+    only the columns it shows.
+    """
+
+    rank_annotation = "search_rank"
+
+    def __init__(self, model, label: str, detail: str = ""):
+        self.model = model
+        self.label = label
+        self.detail = detail
+
+    def get_fields(self) -> list[str]:
+        formats = (self.label, self.detail)
+        fields = (name for text in formats for _, name, _, _ in Formatter().parse(text))
+        return list(dict.fromkeys(name for name in fields if name))
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def search(self, garage_id, terms: list[str], limit: int) -> list[dict]:
+        """Return the `limit` best ranked rows of the garage matching all the terms."""
+        counts = search_index.get_term_counts(self.model, garage_id, terms)
+        queryset = search_index.search(
+            self.get_queryset(), garage_id, terms, counts, self.rank_annotation
+        )
+        fields = self.get_fields()
+        if self.rank_annotation in queryset.query.annotations:
+            queryset = queryset.order_by(f"-{self.rank_annotation}", "pk")
+            fields.append(self.rank_annotation)
+        else:
+            queryset = queryset.order_by("pk")
+
+        results = []
+        for row in queryset.values("pk", *fields)[:limit]:
+            values = {field: "" if value is None else value for field, value in row.items()}
+            results.append(
+                {
+                    "id": row["pk"],
+                    "label": self.label.format_map(values).strip(),
+                    "detail": self.detail.format_map(values).strip(),
+                    "rank": row.get(self.rank_annotation),
+                }
+            )
+        return results
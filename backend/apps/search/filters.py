@@ -0,0 +1,54 @@
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from apps.tenants.context import get_current_garage
+
+from .index import get_query_terms, search_index
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    SearchFilter answering searches of indexed models from the search index.
+
+    - Each word of `?q=` must match the start of a word of an indexed field
+      ("brak pad" finds "Brake pad 12"), instead of `LIKE '%q%'` scans of every row.
+    - Without a `?sort=` ordering, results are ranked: rows matching more, heavier
+      fields and whole words come first. Broad searches are not ranked, see
+      `SearchIndex.search`.
+    - Models that are not indexed are searched by `search_fields`, like SearchFilter.
+    - `afilter_queryset` is the version for async views (see `AsyncGarageGenericViewSet`).
+    """
+
+    rank_annotation = "search_rank"
+
+    def get_index_query(self, request, queryset, view):
+        """Return the garage id and the terms of an indexed search, or None."""
+        garage = getattr(view, "garage", None) or get_current_garage()
+        terms = get_query_terms(self.get_search_terms(request))
+        if garage is None or not terms or not search_index.is_registered(queryset.model):
+            return None
+        return garage.pk, terms
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_index_query(request, queryset, view)
+        if query is None:
+            return super().filter_queryset(request, queryset, view)
+        counts = search_index.get_term_counts(queryset.model, *query)
+        return self.search(request, queryset, *query, counts)
+
+    async def afilter_queryset(self, request, queryset, view):
+        query = self.get_index_query(request, queryset, view)
+        if query is None:
+            return super().filter_queryset(request, queryset, view)
+        counts = await search_index.aget_term_counts(queryset.model, *query)
+        return self.search(request, queryset, *query, counts)
+
+    def search(self, request, queryset, garage_id, terms, counts):
+        queryset = search_index.search(queryset, garage_id, terms, counts, self.rank_annotation)
+        if (
+            self.rank_annotation not in queryset.query.annotations
+            or api_settings.ORDERING_PARAM in request.query_params
+        ):
+            return queryset
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.order_by(f"-{self.rank_annotation}", *dict.fromkeys([*ordering, "pk"]))
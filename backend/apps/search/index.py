@@ -0,0 +1,235 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Exists, OuterRef, Subquery, Sum
+from django.db.models.signals import post_delete, post_save
+
+from shared.signals import bulk_changed
+
+from .models import MAX_TERM_LENGTH, SearchTerm
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# weight multiplier of terms that are whole words, so exact matches rank first
+WORD_BOOST = 2
+# rows of a term counted to find the rarest term of a search; searches matching more
+# rows are not ranked, ranks of such broad matches are not worth reading every row
+TERM_COUNT_LIMIT = 5000
+# columns of the terms written by `index_objects`, and terms per INSERT
+TERM_FIELDS = ("garage_id", "model", "object_id", "term", "weight")
+TERM_BATCH_SIZE = 1000
+
+
+def normalize(text) -> str:
+    """Return text in lowercase without accents, e.g. "Čaká" -> "caka"."""
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in text if not unicodedata.combining(char)).casefold()
+
+
+def get_words(text) -> list[str]:
+    """Return the normalized words of text, truncated to the longest indexed term."""
+    return [word[:MAX_TERM_LENGTH] for word in _WORD_RE.findall(normalize(text))]
+
+
+def get_terms(text, weight: int, terms: dict[str, int]) -> dict[str, int]:
+    """
+    Add the terms of text to `terms` (term -> weight): its words and their prefixes of
+    at least SEARCH_MIN_PREFIX_LENGTH characters. Separated words are also indexed
+    joined, so "ba 2 pa" and "SKU-0012" are found as "ba2pa" and "sku0012".
+    """
+    words = get_words(text)
+    if len(words) > 1:
+        words.append("".join(words)[:MAX_TERM_LENGTH])
+
+    min_length = settings.SEARCH_MIN_PREFIX_LENGTH
+    for word in words:
+        terms[word] = max(terms.get(word, 0), weight * WORD_BOOST)
+        for length in range(min_length, len(word)):
+            prefix = word[:length]
+            terms[prefix] = max(terms.get(prefix, 0), weight)
+    return terms
+
+
+def get_query_terms(search_terms) -> list[str]:
+    """Return the distinct normalized words of the search terms of a request."""
+    return list(dict.fromkeys(word for text in search_terms for word in get_words(text)))
+
+
+class SearchIndex:
+    """
+    Registry of the models in the search index, with the weight of their fields.
+
+    - Rows are indexed on save and removed on delete, or on `bulk_changed`; fields of
+      related rows (e.g. "customer__first_name") are reindexed when the related row is
+      saved.
+    - `search(queryset, garage_id, terms, ...)` returns the rows matching every term as
+      a prefix of a word, ranked by the weights of the matches.
+    """
+
+    def __init__(self):
+        self._registry = {}
+
+    def register(self, model, fields: dict[str, int]) -> None:
+        self._registry[model] = fields
+        post_save.connect(self._index_saved, sender=model, weak=False)
+        post_delete.connect(self._unindex_deleted, sender=model, weak=False)
+        bulk_changed.connect(self._reindex_bulk, sender=model, weak=False)
+
+        for path in fields:
+            relation, _, field = path.rpartition("__")
+            if not relation:
+                continue
+            related_model = model._meta.get_field(relation.split("__")[0]).related_model
+            for attr in relation.split("__")[1:]:
+                related_model = related_model._meta.get_field(attr).related_model
+            post_save.connect(
+                self._get_related_handler(model, relation, field),
+                sender=related_model,
+                weak=False,
+            )
+
+    def is_registered(self, model) -> bool:
+        return model in self._registry
+
+    def get_models(self) -> list:
+        return list(self._registry)
+
+    def get_related_paths(self, model) -> list[str]:
+        """Return the relations to load with rows of a model, for `index_objects`."""
+        paths = (path.rpartition("__")[0] for path in self._registry[model])
+        return list(dict.fromkeys(path for path in paths if path))
+
+    def get_object_terms(self, obj) -> dict[str, int]:
+        terms = {}
+        for path, weight in self._registry[type(obj)].items():
+            value = obj
+            for attr in path.split("__"):
+                value = getattr(value, attr, None)
+                if value is None:
+                    break
+            if value is not None and value != "":
+                get_terms(value, weight, terms)
+        return terms
+
+    def index_objects(self, model, objects, using: str) -> int:
+        """Replace the terms of rows of a model, return the number of terms written."""
+        objects = list(objects)
+        if not objects:
+            return 0
+        label = model._meta.label_lower
+        SearchTerm.objects.using(using).filter(
+            model=label, object_id__in=[obj.pk for obj in objects]
+        ).delete()
+        terms = [
+            (obj.garage_id, label, obj.pk, term, weight)
+            for obj in objects
+            for term, weight in self.get_object_terms(obj).items()
+        ]
+        self.insert_terms(terms, using)
+        return len(terms)
+
+    def insert_terms(self, terms: list[tuple], using: str) -> None:
+        """
+        Insert terms (values of TERM_FIELDS) with `executemany`: rows have dozens of terms,
+        and building a SearchTerm for each for `bulk_create` costs more than the inserts.
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(SearchTerm._meta.get_field(name).column) for name in TERM_FIELDS)
+        placeholders = ", ".join(["%s"] * len(TERM_FIELDS))
+        sql = f"INSERT INTO {quote(SearchTerm._meta.db_table)} ({columns}) VALUES ({placeholders})"
+        with connection.cursor() as cursor:
+            for start in range(0, len(terms), TERM_BATCH_SIZE):
+                cursor.executemany(sql, terms[start : start + TERM_BATCH_SIZE])
+
+    def get_index(self, model, garage_id):
+        """Return the terms of the rows of a model of a garage."""
+        return SearchTerm.objects.filter(garage_id=garage_id, model=model._meta.label_lower)
+
+    def get_term_counts(self, model, garage_id, terms: list[str]) -> dict[str, int]:
+        """Return the number of rows matching each term, up to TERM_COUNT_LIMIT."""
+        index = self.get_index(model, garage_id)
+        return {term: index.filter(term=term)[:TERM_COUNT_LIMIT].count() for term in terms}
+
+    async def aget_term_counts(self, model, garage_id, terms: list[str]) -> dict[str, int]:
+        """Async version of `get_term_counts`."""
+        index = self.get_index(model, garage_id)
+        return {term: await index.filter(term=term)[:TERM_COUNT_LIMIT].acount() for term in terms}
+
+    def search(self, queryset, garage_id, terms: list[str], counts: dict, rank_annotation: str):
+        """
+        Return the rows of a garage in queryset matching all the terms, annotated with
+        their rank (sum of the weights of the matched terms).
+
+        Rows are read from the index entries of the rarest term (see `get_term_counts`),
+        the other terms are checked with one index lookup per row, so common words
+        ("brake", "pad") are never read in full. Rows are not ranked (annotated) if the
+        rarest term matches TERM_COUNT_LIMIT rows or more.
+        """
+        rarest = min(terms, key=lambda term: (counts[term], -len(term)))
+        if counts[rarest] == 0:
+            return queryset.none()
+
+        index = self.get_index(queryset.model, garage_id)
+        queryset = queryset.filter(pk__in=index.filter(term=rarest).values("object_id"))
+        for term in terms:
+            if term != rarest:
+                matches = index.filter(term=term, object_id=OuterRef("pk"))
+                queryset = queryset.filter(Exists(matches))
+
+        if counts[rarest] >= TERM_COUNT_LIMIT:
+            return queryset
+        rank = (
+            index.filter(term__in=terms, object_id=OuterRef("pk"))
+            .values("object_id")
+            .annotate(rank=Sum("weight"))
+            .values("rank")
+        )
+        return queryset.annotate(**{rank_annotation: Subquery(rank[:1])})
+
+    def _index_saved(self, sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+        if raw:
+            return
+        fields = {path.split("__")[0] for path in self._registry[sender]}
+        if update_fields is not None and not fields.intersection(update_fields):
+            return
+        self.index_objects(sender, [instance], using)
+
+    def _unindex_deleted(self, sender, instance, using=None, **kwargs):
+        SearchTerm.objects.using(using).filter(
+            model=sender._meta.label_lower, object_id=instance.pk
+        ).delete()
+
+    def _reindex_bulk(self, sender, garage_id, pks=(), deleted_pks=(), using=None, **kwargs):
+        if deleted_pks:
+            SearchTerm.objects.using(using).filter(
+                garage_id=garage_id, model=sender._meta.label_lower, object_id__in=deleted_pks
+            ).delete()
+        if pks:
+            objects = (
+                sender._base_manager.using(using)
+                .filter(pk__in=pks)
+                .select_related(*self.get_related_paths(sender))
+            )
+            self.index_objects(sender, objects, using)
+
+    def _get_related_handler(self, model, relation: str, field: str):
+        def reindex_related(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+            if raw or kwargs.get("created"):
+                # new rows are not referenced yet
+                return
+            if update_fields is not None and field not in update_fields:
+                return
+            objects = (
+                model._base_manager.using(using)
+                .filter(**{relation: instance})
+                .select_related(*self.get_related_paths(model))
+            )
+            self.index_objects(model, objects, using)
+
+        return reindex_related
+
+
+search_index = SearchIndex()
@@ -0,0 +1,14 @@
+from apps.garages.models import Vehicle, WorkOrder
+from apps.inventory.models import Part
+from apps.users.models import Customer
+
+from .index import search_index
+
+# field weights: identifiers rank above names
+search_index.register(Part, {"name": 2, "sku": 3, "brand": 1})
+search_index.register(Customer, {"first_name": 2, "last_name": 2, "phone_number": 3, "email": 1})
+search_index.register(Vehicle, {"registration_number": 3})
+search_index.register(
+    WorkOrder,
+    {"customer__first_name": 2, "customer__last_name": 2, "vehicle__registration_number": 3},
+)
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.index import search_index
+from apps.tenants.sharding import get_shard_for_garage
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search index of a garage, e.g. after rows were written without "
+        "signals (bulk_create, update(), raw SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("garage", type=int, help="Id of the garage to reindex.")
+        parser.add_argument(
+            "models", nargs="*", help="Labels of the models to reindex (default: all indexed)."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows reindexed per batch."
+        )
+
+    def handle(self, *args, **options):
+        models = search_index.get_models()
+        if options["models"]:
+            labels = {label.lower() for label in options["models"]}
+            unknown = labels - {model._meta.label_lower for model in models}
+            if unknown:
+                raise CommandError(f"Models not indexed: {', '.join(sorted(unknown))}.")
+            models = [model for model in models if model._meta.label_lower in labels]
+
+        database = get_shard_for_garage(options["garage"])
+        for model in models:
+            queryset = (
+                model._base_manager.using(database)
+                .filter(garage_id=options["garage"])
+                .select_related(*search_index.get_related_paths(model))
+                .order_by("pk")
+            )
+            terms = rows = 0
+            batch = []
+            for obj in queryset.iterator(chunk_size=options["batch_size"]):
+                batch.append(obj)
+                if len(batch) == options["batch_size"]:
+                    terms += search_index.index_objects(model, batch, database)
+                    rows += len(batch)
+                    batch = []
+            terms += search_index.index_objects(model, batch, database)
+            rows += len(batch)
+            self.stdout.write(f"  {model._meta.label}: {rows} rows, {terms} terms")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tenants', '0002_garageshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Label of the indexed model.', max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('term', models.CharField(max_length=32)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='tenants.garage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['garage', 'model', 'term', 'object_id', 'weight'], name='searchterm_garage_term_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model', 'object_id', 'term'), name='searchterm_model_object_term_uniq')],
+            },
+        ),
+    ]
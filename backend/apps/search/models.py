@@ -0,0 +1,38 @@
+from django.db import models
+
+from shared.models import GarageMixin
+
+# longest indexed term, longer words and query terms are truncated
+MAX_TERM_LENGTH = 32
+
+
+class SearchTerm(GarageMixin):
+    """
+    Term of the search index of a garage row (see `apps.search.index`): a normalized
+    word of an indexed field, or a prefix of one.
+    """
+
+    # rebuilt on every save of the indexed row, not cached data
+    track_versions = False
+
+    model = models.CharField(max_length=100, help_text="Label of the indexed model.")
+    object_id = models.PositiveBigIntegerField()
+    term = models.CharField(max_length=MAX_TERM_LENGTH)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "object_id", "term"], name="searchterm_model_object_term_uniq"
+            ),
+        ]
+        indexes = [
+            # term lookups of a garage, covering the ranking
+            models.Index(
+                fields=["garage", "model", "term", "object_id", "weight"],
+                name="searchterm_garage_term_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model}:{self.object_id} {self.term}"
@@ -0,0 +1,20 @@
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+
+search_schema = extend_schema_view(
+    list=extend_schema(
+        description=(
+            "Search the customers, vehicles, parts and work orders of a garage at once. "
+            "Results are merged by rank; types that did not answer in time are listed in "
+            "`timed_out`."
+        ),
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Search terms."),
+            OpenApiParameter(
+                "types",
+                str,
+                description="Comma separated types: customer, vehicle, part, work_order.",
+            ),
+            OpenApiParameter("limit", int, default=5, description="Results per type (max 20)."),
+        ],
+    ),
+)
@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from apps.garages.models import Vehicle, WorkOrder
+from apps.inventory.models import Part
+from apps.tenants.viewsets import GarageGenericViewSet
+from apps.users.models import Customer
+
+from .fanout import SearchSource, fan_out
+from .index import get_query_terms
+from .schemas import search_schema
+
+
+@search_schema
+class SearchViewSet(GarageGenericViewSet):
+    """
+    One search box over the customers, vehicles, parts and work orders of a garage.
+
+    Each type is searched in the search index on its own thread (see `fan_out`), and
+    the results are merged by rank. Types not answered within SEARCH_FANOUT_BUDGET
+    seconds (or failing) are left out and listed in `timed_out`, so one slow query does
+    not hold, or fail, the whole response.
+    """
+
+    sources = {
+        "customer": SearchSource(
+            Customer, label="{first_name} {last_name}", detail="{phone_number}"
+        ),
+        "vehicle": SearchSource(Vehicle, label="{registration_number}", detail="{make} {model}"),
+        "part": SearchSource(Part, label="{name}", detail="{sku}"),
+        "work_order": SearchSource(
+            WorkOrder,
+            label="#{pk} {vehicle__registration_number}",
+            detail="{customer__first_name} {customer__last_name}",
+        ),
+    }
+    # results per type, default and maximum of `?limit=`
+    default_limit = 5
+    max_limit = 20
+    conditional_actions = ()
+
+    def get_types(self, request) -> list[str]:
+        types = request.query_params.get("types")
+        if not types:
+            return list(self.sources)
+        types = list(dict.fromkeys(name.strip() for name in types.split(",")))
+        unknown = [name for name in types if name not in self.sources]
+        if unknown:
+            choices = ", ".join(self.sources)
+            raise ValidationError({"types": [f"Unknown types {unknown}, choose from {choices}."]})
+        return types
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            raise ValidationError({"limit": ["A valid integer is required."]})
+        return max(1, min(limit, self.max_limit))
+
+    def list(self, request, *args, **kwargs):
+        started = time.monotonic()
+        terms = get_query_terms([request.query_params.get(api_settings.SEARCH_PARAM, "")])
+        if not terms:
+            raise ValidationError({api_settings.SEARCH_PARAM: ["Enter a search term."]})
+        types = self.get_types(request)
+        limit = self.get_limit(request)
+
+        tasks = {
+            name: (lambda source=self.sources[name]: source.search(self.garage.pk, terms, limit))
+            for name in types
+        }
+        results, timed_out = fan_out(tasks, timeout=settings.SEARCH_FANOUT_BUDGET)
+
+        merged = [
+            {"type": name, **result, "position": position}
+            for name in types
+            for position, result in enumerate(results.get(name, ()))
+        ]
+        # unranked (broad) matches last; ties keep the order of each type, interleaved
+        merged.sort(key=lambda result: (-(result["rank"] or 0), result["position"]))
+        for result in merged:
+            del result["position"]
+
+        return Response(
+            {
+                "results": merged,
+                "counts": {name: len(results[name]) for name in types if name in results},
+                "timed_out": timed_out,
+                "took_ms": round((time.monotonic() - started) * 1000),
+            }
+        )
@@ -0,0 +1,197 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Garage
+
+# shared cache keys, all read with `version=<garages version>`
+GARAGES_VERSION_KEY = "tenants:garages:version"
+GARAGE_KEY = "tenants:garage:{subdomain}"
+
+# stored in the shared cache for subdomains without an active garage
+MISSING = "__missing__"
+
+
+class GarageCache:
+    """
+    Per-process LRU cache of active garages keyed by canonical (lowercase) subdomain.
+
+    - Entries expire after `ttl` seconds, so other processes pick up changes
+      even when they miss the invalidation signal.
+    - `hits` and `misses` counters are kept for monitoring the hit rate.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.counters: dict[str, int] = {}
+        self._entries: OrderedDict[str, tuple[float, Garage]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subdomain: str) -> Garage | None:
+        subdomain = subdomain.lower()
+        with self._lock:
+            entry = self._entries.get(subdomain)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[subdomain]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(subdomain)
+            self.hits += 1
+            # copy, so per-request changes never leak into the cached instance
+            return copy.copy(entry[1])
+
+    def set(self, subdomain: str, garage: Garage) -> None:
+        subdomain = subdomain.lower()
+        with self._lock:
+            self._entries[subdomain] = (time.monotonic() + self.ttl, copy.copy(garage))
+            self._entries.move_to_end(subdomain)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *, subdomain: str | None = None, garage_id: int | None = None) -> None:
+        """Remove entries matching the subdomain or belonging to the garage."""
+        with self._lock:
+            if subdomain is not None:
+                self._entries.pop(subdomain.lower(), None)
+            if garage_id is not None:
+                stale = [
+                    key for key, (_, garage) in self._entries.items() if garage.pk == garage_id
+                ]
+                for key in stale:
+                    del self._entries[key]
+
+    def count(self, name: str) -> None:
+        """Increment a named counter of the lookups served past the local cache."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.counters = {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                **self.counters,
+            }
+
+
+garage_cache = GarageCache(
+    max_size=getattr(settings, "TENANT_CACHE_MAX_SIZE", 1024),
+    ttl=getattr(settings, "TENANT_CACHE_TTL", 300),
+)
+
+
+def get_shared_cache():
+    """Return the Django cache shared by all processes for tenant resolution."""
+    return caches[getattr(settings, "TENANT_SHARED_CACHE", "default")]
+
+
+def get_garages_version(cache=None) -> int:
+    """
+    Return the current version of the shared garage entries.
+
+    A missing version key is seeded from the clock, so entries written under an
+    evicted version can never become valid again.
+    """
+    cache = cache or get_shared_cache()
+    version = cache.get(GARAGES_VERSION_KEY)
+    if version is None:
+        cache.add(GARAGES_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(GARAGES_VERSION_KEY, 1)
+    return version
+
+
+def bump_garages_version() -> None:
+    """Invalidate every shared garage entry (positive and negative) at once."""
+    cache = get_shared_cache()
+    try:
+        cache.incr(GARAGES_VERSION_KEY)
+    except ValueError:
+        get_garages_version(cache)
+
+
+def get_active_garage(subdomain: str) -> Garage | None:
+    """
+    Return the active garage for the subdomain, or None if there is none.
+
+    Lookup order:
+    1. per-process LRU cache (positive entries only)
+    2. shared cache, which also remembers misses per subdomain for a short time, so
+       repeated requests for an unknown subdomain reach the database once per TTL
+    3. database, with an exact match on the unique (lowercase) subdomain index
+    """
+    subdomain = subdomain.lower()
+
+    garage = garage_cache.get(subdomain)
+    if garage is not None:
+        return garage
+
+    cache = get_shared_cache()
+    version = get_garages_version(cache)
+    key = GARAGE_KEY.format(subdomain=subdomain)
+
+    entry = cache.get(key, version=version)
+    if entry == MISSING:
+        garage_cache.count("negative_hits")
+        return None
+    if entry is not None:
+        garage_cache.count("shared_hits")
+        garage_cache.set(subdomain, entry)
+        return entry
+
+    garage_cache.count("db_lookups")
+    try:
+        garage = Garage.objects.get(subdomain=subdomain, is_active=True)
+    except Garage.DoesNotExist:
+        garage = None
+    if garage is None:
+        cache.set(
+            key,
+            MISSING,
+            timeout=getattr(settings, "TENANT_NEGATIVE_CACHE_TTL", 60),
+            version=version,
+        )
+        return None
+
+    cache.set(
+        key,
+        garage,
+        timeout=getattr(settings, "TENANT_SHARED_CACHE_TTL", 3600),
+        version=version,
+    )
+    garage_cache.set(subdomain, garage)
+    return garage
+
+
+async def aget_active_garage(subdomain: str) -> Garage | None:
+    """
+    Async version of `get_active_garage`.
+
+    Hits of the per-process cache are served on the event loop; only misses
+    pay for a thread hop to reach the shared cache and the database.
+    """
+    garage = garage_cache.get(subdomain)
+    if garage is not None:
+        return garage
+    return await sync_to_async(get_active_garage)(subdomain)
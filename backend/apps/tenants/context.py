@@ -0,0 +1,39 @@
+from contextvars import ContextVar
+
+# garage (tenant) of the request being served, if any
+_current_garage: ContextVar = ContextVar("current_garage", default=None)
+
+
+def get_current_garage():
+    """Return the garage of the current tenant context, or None outside of one."""
+    return _current_garage.get()
+
+
+def set_current_garage(garage):
+    """
+    Set the garage of the current tenant context and return the previous one,
+    which should be restored once the request is served.
+    """
+    previous = _current_garage.get()
+    _current_garage.set(garage)
+    return previous
+
+
+class garage_context:
+    """
+    Context manager that scopes garage aware querysets to `garage`.
+
+    Example:
+        with garage_context(garage):
+            Part.objects.all()  # only parts of `garage`
+    """
+
+    def __init__(self, garage):
+        self.garage = garage
+
+    def __enter__(self):
+        self.previous = set_current_garage(self.garage)
+        return self.garage
+
+    def __exit__(self, *exc_info):
+        set_current_garage(self.previous)
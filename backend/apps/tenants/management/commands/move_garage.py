@@ -0,0 +1,165 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.tenants.cache import get_shared_cache
+from apps.tenants.models import Garage, GarageShard
+from apps.tenants.sharding import (
+    get_control_database,
+    get_shard_for_garage,
+    get_tenant_lookup,
+    get_tenant_models,
+    mirror_garage,
+    shard_cache,
+)
+from shared.cache import is_shared_cache
+
+
+class Command(BaseCommand):
+    help = "Move all data of a single garage (tenant) to another shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument("garage", help="Id or subdomain of the garage to move.")
+        parser.add_argument("database", help="Database alias of the target shard.")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows copied per INSERT statement."
+        )
+        parser.add_argument(
+            "--drain",
+            type=int,
+            default=None,
+            help=(
+                "Seconds to wait after deactivating the garage before copying its rows, so "
+                "every process has dropped its cached garage and stopped writing to it. "
+                "Defaults to the garage cache TTLs."
+            ),
+        )
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=settings.TENANT_SHARD_CACHE_TTL,
+            help=(
+                "Seconds to wait after switching the shard before deleting the source rows "
+                "and reactivating the garage, so every process has dropped its cached shard "
+                "lookup."
+            ),
+        )
+        parser.add_argument(
+            "--keep-source", action="store_true", help="Do not delete the rows on the source shard."
+        )
+
+    def handle(self, *args, **options):
+        garage = self.get_garage(options["garage"])
+        source = get_shard_for_garage(garage.pk)
+        target = options["database"]
+
+        if target not in settings.DATABASES:
+            raise CommandError(f"Unknown database '{target}'.")
+        if source == target:
+            raise CommandError(f"Garage '{garage.subdomain}' is already on '{target}'.")
+
+        models = get_tenant_models()
+        self.check_conflicts(garage, models, source, target)
+
+        # the garage is unavailable (404) for the whole move, so no rows are written to
+        # the source after they were copied and then lost when the source rows are deleted
+        was_active = garage.is_active
+        if was_active:
+            self.set_active(garage, False)
+            drain = options["drain"]
+            if drain is None:
+                drain = self.get_drain_seconds()
+            self.stdout.write(f"Deactivated garage '{garage.subdomain}', waiting {drain}s.")
+            time.sleep(drain)
+
+        try:
+            self.move(garage, models, source, target, options)
+        finally:
+            if was_active:
+                self.set_active(garage, True)
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def move(self, garage, models, source, target, options):
+        self.stdout.write(f"Moving garage '{garage.subdomain}' from '{source}' to '{target}'.")
+        with transaction.atomic(using=target):
+            if target != get_control_database():
+                mirror_garage(garage, target)
+            for model in models:
+                copied = self.copy_rows(garage, model, source, target, options["batch_size"])
+                self.stdout.write(f"  {model._meta.label}: {copied} rows copied")
+
+        GarageShard.objects.update_or_create(garage=garage, defaults={"database": target})
+        shard_cache.invalidate(garage.pk)
+        time.sleep(options["grace"])
+
+        if options["keep_source"]:
+            self.stdout.write("Source rows were kept.")
+            return
+
+        with transaction.atomic(using=source):
+            for model in reversed(models):
+                model._base_manager.using(source).filter(
+                    **get_tenant_lookup(model, garage.pk)
+                ).delete()
+            if source != get_control_database():
+                Garage.objects.using(source).filter(pk=garage.pk).delete()
+
+    def set_active(self, garage, is_active):
+        """Save the garage on the control database, which also updates its shard mirror."""
+        garage.is_active = is_active
+        garage.save(using=get_control_database(), update_fields=["is_active", "updated_at"])
+
+    def get_drain_seconds(self):
+        """
+        Longest time another process may still serve the garage from a cache:
+        the per-process garage cache, and the "shared" cache when it is per process too.
+        """
+        seconds = settings.TENANT_CACHE_TTL
+        if not is_shared_cache(get_shared_cache()):
+            seconds = max(seconds, settings.TENANT_SHARED_CACHE_TTL)
+        return seconds
+
+    def get_garage(self, value):
+        lookup = {"pk": value} if value.isdigit() else {"subdomain": value.lower()}
+        try:
+            return Garage.objects.using(get_control_database()).get(**lookup)
+        except Garage.DoesNotExist:
+            raise CommandError(f"Garage '{value}' not found.")
+
+    def check_conflicts(self, garage, models, source, target):
+        """Refuse to move when primary keys of the garage rows are already used on the target."""
+        for model in models:
+            pks = model._base_manager.using(source).filter(**get_tenant_lookup(model, garage.pk))
+            pks = list(pks.values_list("pk", flat=True))
+            for start in range(0, len(pks), 1000):
+                conflicts = model._base_manager.using(target).filter(
+                    pk__in=pks[start : start + 1000]
+                )
+                if conflicts.exists():
+                    raise CommandError(
+                        f"{model._meta.label} rows of garage '{garage.subdomain}' conflict with "
+                        f"existing primary keys on '{target}'. Shards must use disjoint "
+                        "AUTO_INCREMENT ranges."
+                    )
+
+    def copy_rows(self, garage, model, source, target, batch_size):
+        queryset = (
+            model._base_manager.using(source)
+            .filter(**get_tenant_lookup(model, garage.pk))
+            .order_by("pk")
+        )
+        copied = 0
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) == batch_size:
+                model._base_manager.using(target).bulk_create(batch)
+                copied += len(batch)
+                batch = []
+        if batch:
+            model._base_manager.using(target).bulk_create(batch)
+            copied += len(batch)
+        return copied
@@ -1,6 +1,18 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.http import Http404
 
-from .models import Garage
+from .cache import aget_active_garage, get_active_garage
+from .context import set_current_garage
+from .replicas import (
+    SAFE_METHODS,
+    ais_pinned_to_primary,
+    apin_to_primary,
+    is_pinned_to_primary,
+    pin_to_primary,
+    restore_replica_reads,
+    set_replica_reads,
+)
 
 RESERVED_SUBDOMAINS = {"www", "api", "admin"}
 
@@ -41,12 +53,25 @@ class GarageMiddleware:
 
     - request.garage is always set (Garage instance or None)
     - Invalid subdomain => 404
+    - Supports both WSGI (sync) and ASGI (async) request paths, so ASGI requests
+      do not pay for a sync_to_async thread hop.
+    - The garage is set as the tenant context while the request is served, so database
+      routing (e.g. authentication queries) already knows the tenant.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
         host = request.get_host()
         subdomain = get_subdomain(host)
 
@@ -55,14 +80,85 @@ class GarageMiddleware:
             request.garage = None
             return self.get_response(request)
 
+        garage = get_active_garage(subdomain)
+        if garage is None:
+            raise Http404("Garage not found")
+
+        request.garage = garage
+        previous = set_current_garage(garage)
         try:
-            garage = Garage.objects.get(
-                subdomain__iexact=subdomain,
-                is_active=True,
-            )
+            return self.get_response(request)
+        finally:
+            set_current_garage(previous)
+
+    async def __acall__(self, request):
+        host = request.get_host()
+        subdomain = get_subdomain(host)
+
+        # No tenant context (e.g., marketing site)
+        if not subdomain:
+            request.garage = None
+            return await self.get_response(request)
 
-        except Garage.DoesNotExist:
+        garage = await aget_active_garage(subdomain)
+        if garage is None:
             raise Http404("Garage not found")
 
         request.garage = garage
-        return self.get_response(request)
+        previous = set_current_garage(garage)
+        try:
+            return await self.get_response(request)
+        finally:
+            set_current_garage(previous)
+
+
+class ReadReplicaMiddleware:
+    """
+    Allow reads from replicas for safe requests, with read-your-writes stickiness.
+
+    - Must come after GarageMiddleware, as stickiness is tracked per garage.
+    - Unsafe requests pin the garage to the primary for REPLICA_STICKY_SECONDS, so
+      every user of the garage reads their writes while the replicas catch up.
+    - Safe requests of a pinned garage read from the primary. Pins are kept in
+      REPLICA_STICKY_CACHE; unless it is shared by all processes every garage is pinned.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        garage = getattr(request, "garage", None)
+        safe = request.method in SAFE_METHODS
+        previous = set_replica_reads(safe and not is_pinned_to_primary(garage))
+        try:
+            return self.get_response(request)
+        finally:
+            restore_replica_reads(previous)
+            if not safe:
+                pin_to_primary(garage)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        garage = getattr(request, "garage", None)
+        safe = request.method in SAFE_METHODS
+        previous = set_replica_reads(safe and not await ais_pinned_to_primary(garage))
+        try:
+            return await self.get_response(request)
+        finally:
+            restore_replica_reads(previous)
+            if not safe:
+                await apin_to_primary(garage)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Garage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(db_index=True, max_length=255, unique=True)),
+                ('subdomain', models.CharField(db_index=True, max_length=255, unique=True)),
+                ('registration_number', models.CharField(help_text='Business registration number.', max_length=100, unique=True)),
+                ('tax_pan_number', models.CharField(max_length=50, unique=True)),
+                ('garage_type', models.CharField(choices=[('auto-repair', 'Auto Repair'), ('body-shop', 'Body Shop'), ('multi-service', 'Multi-Service')], max_length=20)),
+                ('street_address', models.CharField(max_length=255)),
+                ('city', models.CharField(max_length=100)),
+                ('postal_code', models.CharField(max_length=20)),
+                ('phone_number', models.CharField(max_length=20, unique=True)),
+                ('email_address', models.EmailField(max_length=254, unique=True)),
+                ('working_hours', models.JSONField(blank=True, help_text="Example: {'mon-fri': '9am-6pm', 'sat': '10am-4pm'}", null=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
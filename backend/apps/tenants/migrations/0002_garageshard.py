@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GarageShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('database', models.CharField(help_text='Database alias of the shard.', max_length=100)),
+                ('garage', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='shard', to='tenants.garage')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
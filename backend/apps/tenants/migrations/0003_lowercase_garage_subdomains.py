@@ -0,0 +1,41 @@
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_subdomains(apps, schema_editor):
+    """
+    Lowercase existing subdomains, which tenant resolution now matches exactly.
+
+    Refuses to run if two garages only differ by case, since merging them would
+    silently route one garage's requests to the other.
+    """
+    Garage = apps.get_model("tenants", "Garage")
+    db_alias = schema_editor.connection.alias
+    garages = Garage.objects.using(db_alias)
+
+    seen = {}
+    collisions = []
+    for pk, subdomain in garages.order_by("pk").values_list("pk", "subdomain"):
+        lowered = subdomain.lower()
+        if lowered in seen:
+            collisions.append(f"{subdomain!r} (garage {pk}) and garage {seen[lowered]}")
+        else:
+            seen[lowered] = pk
+    if collisions:
+        raise RuntimeError(
+            "Cannot lowercase garage subdomains, these only differ by case: "
+            + "; ".join(collisions)
+        )
+
+    garages.update(subdomain=Lower("subdomain"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenants", "0002_garageshard"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_subdomains, migrations.RunPython.noop),
+    ]
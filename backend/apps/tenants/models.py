@@ -38,3 +38,22 @@ class Garage(TimeStampMixin):
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        # subdomains are stored in lowercase, so tenant lookups are exact matches
+        self.subdomain = self.subdomain.lower()
+        super().save(*args, **kwargs)
+
+
+class GarageShard(TimeStampMixin):
+    """
+    Lookup table mapping a garage to the database (shard) holding its data.
+
+    Garages without an entry live on `settings.TENANT_DEFAULT_SHARD`.
+    """
+
+    garage = models.OneToOneField(Garage, on_delete=models.CASCADE, related_name="shard")
+    database = models.CharField(max_length=100, help_text="Database alias of the shard.")
+
+    def __str__(self):
+        return f"{self.garage} ({self.database})"
@@ -0,0 +1,106 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+from shared.cache import is_shared_cache
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_KEY = "tenants:primary-pin:{garage}"
+
+
+class ReplicaReads:
+    """Per-request flag allowing reads from replicas, cleared by the first write."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+
+
+_replica_reads: ContextVar = ContextVar("replica_reads", default=None)
+
+
+def get_replicas(database: str) -> list[str]:
+    """Return the aliases of the read replicas of a primary database."""
+    return getattr(settings, "DATABASE_REPLICAS", {}).get(database, [])
+
+
+def get_primary(database: str) -> str:
+    """Return the alias of the primary database of a replica (or the alias itself)."""
+    for primary, replicas in getattr(settings, "DATABASE_REPLICAS", {}).items():
+        if database in replicas:
+            return primary
+    return database
+
+
+def choose_database_for_read(primary: str) -> str:
+    """Return a replica of `primary` when the current request may read from one."""
+    state = _replica_reads.get()
+    if state is None or not state.enabled:
+        return primary
+
+    replicas = get_replicas(primary)
+    if not replicas:
+        return primary
+    return random.choice(replicas)
+
+
+def disable_replica_reads() -> None:
+    """Send the remaining reads of the current request to the primary (after a write)."""
+    state = _replica_reads.get()
+    if state is not None:
+        state.enabled = False
+
+
+def set_replica_reads(enabled: bool):
+    """Allow or forbid replica reads for the current request, returning the previous state."""
+    previous = _replica_reads.get()
+    _replica_reads.set(ReplicaReads(enabled))
+    return previous
+
+
+def restore_replica_reads(previous) -> None:
+    _replica_reads.set(previous)
+
+
+def _get_cache():
+    return caches[getattr(settings, "REPLICA_STICKY_CACHE", "default")]
+
+
+def _pin_key(garage) -> str:
+    return PIN_KEY.format(garage=garage.pk if garage is not None else "platform")
+
+
+def pin_to_primary(garage) -> None:
+    """
+    Send reads of the garage to the primary for `REPLICA_STICKY_SECONDS`, so staff
+    read their own writes while the replicas catch up.
+    """
+    cache = _get_cache()
+    if is_shared_cache(cache):
+        cache.set(_pin_key(garage), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+async def apin_to_primary(garage) -> None:
+    cache = _get_cache()
+    if is_shared_cache(cache):
+        await cache.aset(_pin_key(garage), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(garage) -> bool:
+    """
+    Check if reads of the garage must go to the primary. Without a shared sticky cache
+    a pin would only be seen by the process that wrote, and the next request of the
+    same user may be served by another one, so every garage is pinned.
+    """
+    cache = _get_cache()
+    if not is_shared_cache(cache):
+        return True
+    return bool(cache.get(_pin_key(garage)))
+
+
+async def ais_pinned_to_primary(garage) -> bool:
+    cache = _get_cache()
+    if not is_shared_cache(cache):
+        return True
+    return bool(await cache.aget(_pin_key(garage)))
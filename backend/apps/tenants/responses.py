@@ -0,0 +1,70 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+# shared cache keys of rendered responses of a garage, and of the lock of the request
+# computing one, by digest of the request and data versions
+RESPONSE_KEY = "tenants:response:{garage_id}:{digest}"
+RESPONSE_LOCK_KEY = "tenants:response-lock:{garage_id}:{digest}"
+
+
+def get_response_cache():
+    """Return the Django cache holding rendered responses."""
+    return caches[settings.RESPONSE_CACHE]
+
+
+def normalize_query(query_params) -> str:
+    """Return the query string with its parameters sorted, so equivalent URLs share entries."""
+    return urlencode(sorted(query_params.lists()), doseq=True)
+
+
+def get_response_digest(*parts) -> str:
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def fetch_response(garage_id, digest: str) -> tuple[HttpResponse | None, bool]:
+    """
+    Return the cached response of a digest, or None, and whether the caller holds the
+    lock of its computation.
+
+    Concurrent misses of a digest are collapsed: the first request computes the response
+    while the others wait for it, up to RESPONSE_CACHE_LOCK_TIMEOUT seconds, before
+    computing it themselves.
+    """
+    cache = get_response_cache()
+    key = RESPONSE_KEY.format(garage_id=garage_id, digest=digest)
+    lock_key = RESPONSE_LOCK_KEY.format(garage_id=garage_id, digest=digest)
+    timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+
+    entry = cache.get(key)
+    locked = False
+    if entry is None:
+        locked = cache.add(lock_key, True, timeout=timeout)
+        if not locked:
+            # another request is computing the same response, wait for it
+            deadline = time.monotonic() + timeout
+            while entry is None and time.monotonic() < deadline and cache.get(lock_key):
+                time.sleep(0.05)
+                entry = cache.get(key)
+
+    if entry is None:
+        return None, locked
+    status, content_type, content = entry
+    return HttpResponse(content, status=status, content_type=content_type), locked
+
+
+def store_response(garage_id, digest: str, response) -> None:
+    """Cache a rendered response for RESPONSE_CACHE_TTL seconds."""
+    get_response_cache().set(
+        RESPONSE_KEY.format(garage_id=garage_id, digest=digest),
+        (response.status_code, response["Content-Type"], response.content),
+        timeout=settings.RESPONSE_CACHE_TTL,
+    )
+
+
+def release_response_lock(garage_id, digest: str) -> None:
+    get_response_cache().delete(RESPONSE_LOCK_KEY.format(garage_id=garage_id, digest=digest))
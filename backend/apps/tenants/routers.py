@@ -0,0 +1,93 @@
+from .context import get_current_garage
+from .models import Garage
+from .replicas import choose_database_for_read, disable_replica_reads, get_primary
+from .sharding import (
+    get_control_database,
+    get_shard_for_garage,
+    is_sharding_enabled,
+    is_tenant_model,
+)
+
+
+class GarageShardRouter:
+    """
+    Route tenant data to the shard of its garage.
+
+    - Tenant models (garage models, garage users and their tokens) are routed to the
+      shard of the garage found in the hints (the instance itself, or the instance a
+      relation is accessed from), falling back to the garage of the tenant context.
+    - Platform tables (garages, shard lookup, users without a garage, ...) stay on the
+      control database.
+    - Each shard holds the full schema and a mirror of its garages rows.
+
+    Without configured shards every query goes to `default`, as if there was no router.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db == obj2._state.db:
+            return True
+        # garages are mirrored on every shard
+        if isinstance(obj1, Garage) or isinstance(obj2, Garage):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+    def _db_for_model(self, model, hints):
+        if not is_sharding_enabled():
+            return None
+        if not is_tenant_model(model):
+            return get_control_database()
+
+        garage_id = self._get_garage_id(hints)
+        if garage_id is None:
+            return get_control_database()
+        return get_shard_for_garage(garage_id)
+
+    def _get_garage_id(self, hints):
+        instance = hints.get("instance")
+        if isinstance(instance, Garage):
+            return instance.pk
+        if instance is not None and hasattr(instance, "garage_id"):
+            # users without a garage are platform users
+            return instance.garage_id
+
+        garage = get_current_garage()
+        return garage.pk if garage is not None else None
+
+
+class ReadReplicaRouter(GarageShardRouter):
+    """
+    GarageShardRouter that sends reads to read replicas of the chosen database.
+
+    - Replicas are only used when `ReadReplicaMiddleware` allows it: safe requests of a
+      garage that did not write recently (read-your-writes stickiness).
+    - The first write of a request sends its remaining reads to the primary.
+    - Commands, shells and background jobs always read from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        primary = super().db_for_read(model, **hints) or "default"
+        return choose_database_for_read(primary)
+
+    def db_for_write(self, model, **hints):
+        disable_replica_reads()
+        return super().db_for_write(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if get_primary(obj1._state.db) == get_primary(obj2._state.db):
+            return True
+        return super().allow_relation(obj1, obj2, **hints)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if get_primary(db) != db:
+            # replicas receive the schema through replication
+            return False
+        return super().allow_migrate(db, app_label, model_name, **hints)
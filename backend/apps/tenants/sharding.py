@@ -0,0 +1,151 @@
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from shared.models import GarageMixin
+
+from .models import Garage, GarageShard
+
+
+def get_control_database() -> str:
+    """Alias of the database holding platform tables (garages, shard lookup, platform users)."""
+    return getattr(settings, "TENANT_CONTROL_DATABASE", "default")
+
+
+def get_default_shard() -> str:
+    """Alias of the shard of garages without a `GarageShard` entry."""
+    return getattr(settings, "TENANT_DEFAULT_SHARD", get_control_database())
+
+
+def get_shards() -> list[str]:
+    """Aliases of the tenant shards besides the control database."""
+    return list(getattr(settings, "TENANT_SHARDS", []))
+
+
+def is_sharding_enabled() -> bool:
+    return bool(get_shards()) or get_default_shard() != get_control_database()
+
+
+def get_token_models() -> list:
+    if not apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+        return []
+    return [
+        apps.get_model("token_blacklist", "OutstandingToken"),
+        apps.get_model("token_blacklist", "BlacklistedToken"),
+    ]
+
+
+def is_tenant_model(model) -> bool:
+    """
+    Check if rows of the model belong to a garage and live on its shard:
+    garage models, garage users, their JWT tokens and the auto-created many-to-many
+    tables of those (e.g. the groups of a user).
+    """
+    owner = model._meta.auto_created
+    if owner:
+        return is_tenant_model(owner)
+    return (
+        issubclass(model, GarageMixin)
+        or issubclass(model, get_user_model())
+        or model in get_token_models()
+    )
+
+
+def get_tenant_models() -> list:
+    """
+    Return all tenant models, ordered so that a model comes after the models it
+    references (the order rows must be inserted in).
+    """
+    models = [
+        model for model in apps.get_models(include_auto_created=True) if is_tenant_model(model)
+    ]
+    ordered = []
+
+    def visit(model, seen):
+        if model in ordered or model in seen:
+            return
+        seen.add(model)
+        for field in model._meta.concrete_fields:
+            related = field.related_model
+            if related is not None and related in models and related is not model:
+                visit(related, seen)
+        ordered.append(model)
+
+    for model in models:
+        visit(model, set())
+    return ordered
+
+
+def get_tenant_lookup(model, garage_id: int) -> dict:
+    """Return the filter kwargs selecting the rows of a tenant model owned by a garage."""
+    if issubclass(model, GarageMixin) or issubclass(model, get_user_model()):
+        return {"garage_id": garage_id}
+    if model._meta.model_name == "outstandingtoken":
+        return {"user__garage_id": garage_id}
+    if model._meta.model_name == "blacklistedtoken":
+        return {"token__user__garage_id": garage_id}
+    owner = model._meta.auto_created
+    if owner:
+        # many-to-many table: select the rows of the owner's rows
+        field = next(f for f in owner._meta.many_to_many if f.remote_field.through is model)
+        return {
+            f"{field.m2m_field_name()}__{lookup}": value
+            for lookup, value in get_tenant_lookup(owner, garage_id).items()
+        }
+    raise ValueError(f"{model.__name__} is not a tenant model.")
+
+
+class ShardLookupCache:
+    """Per-process TTL cache of garage id -> shard alias, read on every routed query."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._entries: dict[int, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, garage_id: int) -> str:
+        entry = self._entries.get(garage_id)
+        if entry is not None and entry[0] >= time.monotonic():
+            return entry[1]
+
+        database = (
+            GarageShard.objects.using(get_control_database())
+            .filter(garage_id=garage_id)
+            .values_list("database", flat=True)
+            .first()
+        ) or get_default_shard()
+        with self._lock:
+            self._entries[garage_id] = (time.monotonic() + self.ttl, database)
+        return database
+
+    def invalidate(self, garage_id: int) -> None:
+        with self._lock:
+            self._entries.pop(garage_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+shard_cache = ShardLookupCache(ttl=getattr(settings, "TENANT_SHARD_CACHE_TTL", 60))
+
+
+def get_shard_for_garage(garage_id: int) -> str:
+    """Return the database alias of the shard holding the garage's data."""
+    return shard_cache.get(garage_id)
+
+
+def mirror_garage(garage: Garage, database: str) -> None:
+    """
+    Copy the garage row to a shard, so foreign keys and joins from tenant tables
+    to the garages table stay local to the shard.
+    """
+    values = {
+        field.attname: getattr(garage, field.attname)
+        for field in Garage._meta.concrete_fields
+        if not field.primary_key
+    }
+    Garage.objects.using(database).update_or_create(pk=garage.pk, defaults=values)
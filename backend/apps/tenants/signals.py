@@ -0,0 +1,76 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.models import GarageMixin
+from shared.signals import bulk_changed
+
+from .cache import bump_garages_version, garage_cache
+from .models import Garage, GarageShard
+from .sharding import get_control_database, get_shard_for_garage, mirror_garage, shard_cache
+from .versions import bump_model_version, versioned_models
+
+
+@receiver(post_save, sender=Garage)
+@receiver(post_delete, sender=Garage)
+def invalidate_garage_cache(sender, instance, **kwargs):
+    """
+    Drop cached entries of a garage when it is saved (created, renamed, deactivated, ...)
+    or deleted. Local entries are matched by primary key as well, so the old subdomain of a
+    renamed garage is evicted too. Bumping the shared version also clears negative entries,
+    so a newly created garage is reachable right away.
+    """
+    garage_cache.invalidate(subdomain=instance.subdomain, garage_id=instance.pk)
+    bump_garages_version()
+
+
+@receiver(post_save, sender=Garage)
+def mirror_garage_to_shard(sender, instance, raw=False, using=None, **kwargs):
+    """Keep the copy of the garage on its shard up to date."""
+    if raw or using != get_control_database():
+        return
+
+    database = get_shard_for_garage(instance.pk)
+    if database != get_control_database():
+        mirror_garage(instance, database)
+
+
+@receiver(post_save, sender=GarageShard)
+@receiver(post_delete, sender=GarageShard)
+def invalidate_shard_cache(sender, instance, **kwargs):
+    shard_cache.invalidate(instance.garage_id)
+
+
+def bump_garage_model_version(sender, instance, using=None, **kwargs):
+    """
+    Bump the version of the rows of a garage model once the change is committed, so
+    values cached under the previous version (counts, responses) are no longer used.
+    """
+    garage_id = instance.garage_id
+    if garage_id is not None:
+        transaction.on_commit(lambda: bump_model_version(sender, garage_id), using=using)
+
+
+@receiver(bulk_changed)
+def bump_garage_model_version_in_bulk(sender, garage_id, using=None, **kwargs):
+    """Bump the version of a model once for rows of a garage written in bulk."""
+    if sender in versioned_models:
+        transaction.on_commit(lambda: bump_model_version(sender, garage_id), using=using)
+
+
+def track_model_versions(model) -> None:
+    """
+    Bump the version of a model with a `garage_id` on save and delete.
+
+    Connected per model, so deletes of other models can still be fast deletes.
+    """
+    post_save.connect(bump_garage_model_version, sender=model)
+    post_delete.connect(bump_garage_model_version, sender=model)
+    versioned_models.add(model)
+
+
+for model in apps.get_models():
+    # models can opt out with `track_versions = False`, e.g. derived tables
+    if issubclass(model, GarageMixin) and getattr(model, "track_versions", True):
+        track_model_versions(model)
@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from shared.cache import is_shared_cache
+
+# shared cache keys of the version of the rows of a model within a garage, and of the
+# time (unix seconds) they last changed
+VERSION_KEY = "tenants:version:{garage_id}:{model}"
+MODIFIED_KEY = "tenants:modified:{garage_id}:{model}"
+
+# models whose saves and deletes bump their version (see apps.tenants.signals)
+versioned_models = set()
+
+
+def get_versions_cache():
+    """Return the Django cache holding the per-garage table versions."""
+    return caches[getattr(settings, "TENANT_VERSION_CACHE", "default")]
+
+
+def are_versions_shared() -> bool:
+    """
+    Check if the versions are shared by all processes. Bumps in a per-process cache are
+    not seen by the other workers, so nothing may be cached or validated by versions
+    read from it.
+    """
+    return is_shared_cache(get_versions_cache())
+
+
+def _version_key(model, garage_id) -> str:
+    return VERSION_KEY.format(garage_id=garage_id, model=model._meta.label_lower)
+
+
+def get_model_versions(models, garage_id) -> dict:
+    """
+    Return the versions of the rows of the models within the garage, by model.
+
+    Versions change whenever a row of the model is created, updated or deleted in the
+    garage, so they can key anything derived from those rows (counts, responses, ETags).
+    Missing versions are seeded from the clock, so values derived under an evicted
+    version can never become valid again.
+    """
+    cache = get_versions_cache()
+    keys = {model: _version_key(model, garage_id) for model in models}
+    versions = cache.get_many(keys.values())
+
+    result = {}
+    for model, key in keys.items():
+        version = versions.get(key)
+        if version is None:
+            cache.add(key, time.time_ns() // 1000, timeout=None)
+            version = cache.get(key, 0)
+        result[model] = version
+    return result
+
+
+def get_model_version(model, garage_id) -> int:
+    return get_model_versions([model], garage_id)[model]
+
+
+def get_last_modified(models, garage_id) -> int | None:
+    """
+    Return the last time (unix seconds) rows of the models changed within the garage,
+    or None if it is not known for one of them (evicted, never changed).
+    """
+    keys = [
+        MODIFIED_KEY.format(garage_id=garage_id, model=model._meta.label_lower) for model in models
+    ]
+    modified = get_versions_cache().get_many(keys)
+    if not keys or len(modified) != len(keys):
+        return None
+    return max(modified.values())
+
+
+def bump_model_version(model, garage_id) -> None:
+    """Invalidate everything derived from the rows of the model within the garage."""
+    cache = get_versions_cache()
+    try:
+        cache.incr(_version_key(model, garage_id))
+    except ValueError:
+        get_model_version(model, garage_id)
+    cache.set(
+        MODIFIED_KEY.format(garage_id=garage_id, model=model._meta.label_lower),
+        int(time.time()),
+        timeout=None,
+    )
@@ -1,12 +1,82 @@
+import hashlib
+import inspect
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import classonlymethod
+from django.utils.http import http_date
+from rest_framework import exceptions, serializers
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework import exceptions
+
+from shared.renderers import FastJSONRenderer
+from shared.response_wrappers import StreamingJSONResponse, iter_in_context
+from shared.serializers import (
+    SparseFieldsMixin,
+    compile_queryset,
+    get_serializer_models,
+    get_sparse_options,
+    narrow_queryset,
+)
+
+from .context import set_current_garage
+from .responses import (
+    fetch_response,
+    get_response_digest,
+    normalize_query,
+    release_response_lock,
+    store_response,
+)
+from .versions import (
+    are_versions_shared,
+    get_last_modified,
+    get_model_versions,
+    versioned_models,
+)
+
+
+class EarlyResponse(Exception):
+    """Raised to answer a request (304 Not Modified, cached response) without running the action."""
+
+    def __init__(self, response):
+        super().__init__(response)
+        self.response = response
 
 
 class GarageGenericViewSet(GenericViewSet):
     """
     Base GenericViewSet that sets self.garage automatically.
+
+    The garage is also set as the tenant context of the request, so garage aware
+    managers scope querysets to it (e.g. `Part.objects.all()`).
+
+    Serializers with `SparseFieldsMixin` get the `?fields=`/`?expand=` options of the
+    request on reads, and querysets are narrowed to the columns they render.
+
+    With `compiled_list = True`, lists of a `CompiledSerializerMixin` serializer are
+    read with `.values()` and rendered from rows instead of model instances.
+
+    Responses of `conditional_actions` get an ETag and a Last-Modified derived from the
+    versions of the models they render (see `apps.tenants.versions`), so revalidating
+    clients get a 304 before the action runs any query. The models are those of the
+    serializer, plus `version_models` (e.g. models counted in annotations).
+
+    Responses of `response_cache_actions` are cached per garage, data versions,
+    normalized query string and role, and concurrent misses are computed once (see
+    `apps.tenants.responses`). Writes bump the versions through the model signals, so
+    cached responses are never served stale. Both are disabled unless the versions are
+    shared by all processes.
     """
 
+    sparse_actions = ("list", "retrieve")
+    compiled_list = False
+    conditional_actions = ("list", "retrieve")
+    response_cache_actions = ()
+    version_models = ()
+
     def initial(self, request, *args, **kwargs):
         """
         Called before any action.
@@ -15,3 +85,316 @@ class GarageGenericViewSet(GenericViewSet):
         self.garage = getattr(request, "garage", None)
         if self.garage is None:
             raise exceptions.PermissionDenied("garage not found.")
+        self._previous_garage = set_current_garage(self.garage)
+        self.check_not_modified(request)
+        self.check_response_cache(request)
+
+    def get_version_models(self):
+        """Return the models the response is derived from, or None if one is not versioned."""
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, serializers.ModelSerializer):
+            return None
+        models = get_serializer_models(serializer_class) | set(self.version_models)
+        return models if models <= versioned_models else None
+
+    def get_data_versions(self) -> dict | None:
+        """
+        Return the versions of the models the response is derived from, by model (sorted
+        by label), or None if one is not versioned. Read once per request.
+        """
+        if not hasattr(self, "_data_versions"):
+            models = self.get_version_models()
+            self._data_versions = None
+            if models is not None:
+                models = sorted(models, key=lambda model: model._meta.label_lower)
+                versions = get_model_versions(models, self.garage.pk)
+                self._data_versions = {model: versions[model] for model in models}
+        return self._data_versions
+
+    def get_version_labels(self) -> list[str]:
+        return [f"{model._meta.label_lower}:{v}" for model, v in self.get_data_versions().items()]
+
+    def get_conditional_validators(self, request):
+        """
+        Return the (ETag, Last-Modified) of the response, or None if the action does not
+        support conditional requests. Versions are read before the action runs, so a
+        concurrent write can only make the validators older than the data.
+
+        Versions of a per-process cache are never bumped by writes of the other processes,
+        so no validators are emitted unless the versions are shared.
+        """
+        if request.method not in ("GET", "HEAD") or self.action not in self.conditional_actions:
+            return None
+        if not are_versions_shared():
+            return None
+        if self.get_data_versions() is None:
+            return None
+
+        key = "|".join(
+            [request.get_full_path(), request.accepted_media_type, *self.get_version_labels()]
+        )
+        etag = f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+        return etag, get_last_modified(self.get_data_versions(), self.garage.pk)
+
+    def check_not_modified(self, request):
+        self.conditional_validators = self.get_conditional_validators(request)
+        if self.conditional_validators is None:
+            return
+
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            raise EarlyResponse(response)
+
+    def check_response_cache(self, request):
+        """Answer the request from the response cache, or get ready to cache its response."""
+        self.response_cache_digest = None
+        self.response_cache_locked = False
+        if request.method not in ("GET", "HEAD") or self.action not in self.response_cache_actions:
+            return
+        if not isinstance(request.accepted_renderer, FastJSONRenderer):
+            return
+        if not are_versions_shared() or self.get_data_versions() is None:
+            return
+
+        claims = request.auth if request.auth is not None else {}
+        digest = get_response_digest(
+            request.path,
+            normalize_query(request.query_params),
+            request.accepted_media_type,
+            # permissions differ by role
+            claims.get("role"),
+            claims.get("is_staff"),
+            *self.get_version_labels(),
+        )
+        response, self.response_cache_locked = fetch_response(self.garage.pk, digest)
+        if response is not None:
+            raise EarlyResponse(response)
+        self.response_cache_digest = digest
+
+    def handle_exception(self, exc):
+        if isinstance(exc, EarlyResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def is_sparse_action(self) -> bool:
+        return self.action in self.sparse_actions and issubclass(
+            self.get_serializer_class(), SparseFieldsMixin
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if self.is_sparse_action():
+            for option, value in get_sparse_options(self.request).items():
+                kwargs.setdefault(option, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        return self.get_sparse_queryset(super().filter_queryset(queryset))
+
+    def get_sparse_queryset(self, queryset):
+        """Return the filtered queryset narrowed, or compiled, for sparse actions."""
+        if not self.is_sparse_action():
+            return queryset
+
+        serializer = self.get_serializer()
+        if self.action == "list" and self.compiled_list:
+            rows = compile_queryset(queryset, serializer)
+            if rows is not None:
+                return rows
+        return narrow_queryset(queryset, serializer)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if hasattr(self, "_previous_garage"):
+            set_current_garage(self._previous_garage)
+            del self._previous_garage
+
+        validators = getattr(self, "conditional_validators", None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            # authenticated data: browsers may keep it, but must revalidate it
+            patch_cache_control(response, private=True, no_cache=True)
+
+        response = super().finalize_response(request, response, *args, **kwargs)
+        digest = getattr(self, "response_cache_digest", None)
+        if digest is not None:
+            try:
+                if isinstance(response, Response) and response.status_code == 200:
+                    store_response(self.garage.pk, digest, response.render())
+            finally:
+                if self.response_cache_locked:
+                    release_response_lock(self.garage.pk, digest)
+        return response
+
+
+def is_async_handler(handler) -> bool:
+    """
+    Check if a (bound) view handler is a coroutine function, looking through
+    `functools.wraps` wrappers such as the ones added by `extend_schema_view`.
+    """
+    func = inspect.unwrap(getattr(handler, "__func__", handler))
+    return iscoroutinefunction(func)
+
+
+class AsyncGarageGenericViewSet(GarageGenericViewSet):
+    """
+    GarageGenericViewSet served as an async view.
+
+    - Coroutine handlers (e.g. `AsyncListModelMixin.list`) run on the event loop and
+      use Django's async ORM.
+    - Sync handlers (create, update, ...) run in a single sync_to_async thread hop.
+    - `initial` (authentication, permissions, throttling) may hit the database, so it
+      is run through sync_to_async as well.
+
+    Querysets of async actions must `select_related`/`prefetch_related` everything the
+    serializer reads, since lazy relation access is not allowed on the event loop.
+    """
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # mark the view as async, so Django awaits it instead of calling it in a thread
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Async version of `APIView.dispatch`.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if is_async_handler(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        # like APIView.dispatch: handle_exception re-raises what the handler does not handle
+        except Exception as exc:  # noqa: BLE001
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self, queryset):
+        """
+        Async version of `filter_queryset`: filter backends with an `afilter_queryset`
+        method (e.g. ones that run queries to build the filter) are awaited.
+        """
+        for backend in list(self.filter_backends):
+            backend = backend()
+            if hasattr(backend, "afilter_queryset"):
+                queryset = await backend.afilter_queryset(self.request, queryset, self)
+            else:
+                queryset = backend.filter_queryset(self.request, queryset, self)
+        return self.get_sparse_queryset(queryset)
+
+    async def aget_object(self):
+        """
+        Async version of `GenericAPIView.get_object`.
+        """
+        queryset = await self.afilter_queryset(self.get_queryset())
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """
+        Return a single page of results, or `None` if pagination is disabled.
+        Paginators without async support are run in a thread.
+        """
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, "apaginate_queryset"):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginate_queryset)(queryset)
+
+
+class StreamingListModelMixin:
+    """
+    List a queryset, writing large bodies in chunks with `StreamingJSONResponse`.
+
+    - Pages of at least `JSON_STREAMING_MIN_ROWS` rows and unpaginated lists are
+      streamed, and their rows are serialized as they are written.
+    - Other pages, and renderers other than `FastJSONRenderer` (e.g. the browsable
+      API), get a regular response.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is None and self.is_streamed(None):
+            # rows are read from the database as the body is written, once the request
+            # contexts are reset: read them from the database routed for the request
+            queryset = queryset.using(queryset.db).iterator(chunk_size=2000)
+        return self.get_list_response(queryset if page is None else page, page is not None)
+
+    def is_streamed(self, page) -> bool:
+        if not isinstance(getattr(self.request, "accepted_renderer", None), FastJSONRenderer):
+            return False
+        if getattr(self, "response_cache_digest", None) is not None:
+            # rendered whole to be cached
+            return False
+        return page is None or len(page) >= settings.JSON_STREAMING_MIN_ROWS
+
+    def get_list_response(self, rows, paginated: bool, is_async: bool = False):
+        if not self.is_streamed(rows if paginated else None):
+            serializer = self.get_serializer(rows, many=True)
+            if paginated:
+                return self.get_paginated_response(serializer.data)
+            return Response(serializer.data)
+
+        child = self.get_serializer(many=True).child
+        # serialized as the body is written, in the tenant context of the request
+        data = iter_in_context(child.to_representation(row) for row in rows)
+        if paginated:
+            data = self.get_paginated_response(data).data
+        return StreamingJSONResponse(data, is_async=is_async)
+
+
+class AsyncListModelMixin(StreamingListModelMixin):
+    """
+    List a queryset with Django's async ORM.
+    """
+
+    async def list(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_list_response(page, True, is_async=True)
+        return self.get_list_response([obj async for obj in queryset], False, is_async=True)
+
+
+class AsyncRetrieveModelMixin:
+    """
+    Retrieve a model instance with Django's async ORM.
+    """
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
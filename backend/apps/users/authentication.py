@@ -3,9 +3,82 @@ from rest_framework import exceptions
 from rest_framework.authentication import CSRFCheck
 from rest_framework.request import Request
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 
+from .cache import (
+    cache_principal,
+    get_cached_principal,
+    get_principal_version,
+    get_token_version,
+)
 
-class JWTCookieAuthentication(JWTAuthentication):
+
+class TokenClaimsMixin:
+    """
+    Check the authorization claims embedded by CustomTokenObtainPairSerializer.
+
+    - `ver` must match the current token version of the user (see `get_token_version`),
+      so role changes and deactivation revoke previously issued tokens. Tokens issued
+      before the claim existed are treated as version 0, the version of users whose
+      tokens were never revoked, so they stay valid until they expire.
+    - `garage_id` must match the garage of the request, unless the token belongs to a
+      platform user.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        version = get_token_version(user_id) if user_id is not None else None
+        if version is None or validated_token.get("ver", 0) != version:
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+        return validated_token
+
+    def check_garage_claim(self, request, validated_token):
+        garage = getattr(request, "garage", None)
+        garage_id = validated_token.get("garage_id")
+        if garage is not None and garage_id is not None and garage_id != garage.pk:
+            raise AuthenticationFailed(
+                "Token does not belong to this garage.", code="garage_mismatch"
+            )
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            self.check_garage_claim(request, result[1])
+        return result
+
+
+class CachedPrincipalMixin:
+    """
+    Serve the authenticated user from the principal cache (see apps.users.cache).
+
+    Principals are keyed by user id and token jti and expire after
+    AUTH_PRINCIPAL_CACHE_TTL seconds. They are invalidated when the user is saved
+    (deactivated, password changed) or its employee role changes, so only active users
+    with an up to date role are ever served from the cache.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if user_id is None or jti is None:
+            return super().get_user(validated_token)
+
+        # read before the user is loaded, so an invalidation racing the load wins
+        version = get_principal_version(user_id)
+        user = get_cached_principal(user_id, jti, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_principal(user, jti, version)
+        return user
+
+
+class JWTHeaderAuthentication(TokenClaimsMixin, CachedPrincipalMixin, JWTAuthentication):
+    """JWTAuthentication (Authorization header) with checked claims and a cached principal."""
+
+
+class JWTCookieAuthentication(TokenClaimsMixin, CachedPrincipalMixin, JWTAuthentication):
     """
     An custom authentication plugin that authenticates requests through
     a HttpOnly cookie JSON web token provided in a request header.
@@ -40,5 +113,6 @@ class JWTCookieAuthentication(JWTAuthentication):
             return None
 
         validated_token = self.get_validated_token(raw_token)
+        self.check_garage_claim(request, validated_token)
         # return validated user
         return self.get_user(validated_token), validated_token
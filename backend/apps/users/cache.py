@@ -0,0 +1,162 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import router, transaction
+from django.db.models import F
+from django.db.models.base import DEFERRED
+
+from shared.cache import is_shared_cache
+
+from .models import CustomUser, Employee
+
+# principal entries are read with `version=<principal version of the user>`
+PRINCIPAL_VERSION_KEY = "users:principal:version:{user_id}"
+PRINCIPAL_KEY = "users:principal:{user_id}:{jti}"
+
+# user fields kept in the cached principal, the others are loaded on first access
+PRINCIPAL_USER_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "garage_id",
+)
+PRINCIPAL_EMPLOYEE_FIELDS = ("id", "garage_id", "user_id", "role")
+
+
+def get_principal_cache():
+    """Return the Django cache holding authenticated principals."""
+    return caches[getattr(settings, "AUTH_PRINCIPAL_CACHE", "default")]
+
+
+def get_principal_version(user_id, cache=None) -> int:
+    """
+    Return the current version of the cached principals of a user.
+
+    A missing version key is seeded from the clock, so entries written under an
+    evicted version can never become valid again.
+    """
+    cache = cache or get_principal_cache()
+    key = PRINCIPAL_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def invalidate_principal(user_id) -> None:
+    """Invalidate the cached principals of every token of the user at once."""
+    cache = get_principal_cache()
+    try:
+        cache.incr(PRINCIPAL_VERSION_KEY.format(user_id=user_id))
+    except ValueError:
+        get_principal_version(user_id, cache)
+
+
+def _build_instance(model, database: str, field_names, values):
+    # fields missing from `field_names` are deferred, so they are loaded on access
+    # and left untouched when the instance is saved
+    fields = [field.attname for field in model._meta.concrete_fields]
+    by_name = dict(zip(field_names, values))
+    return model.from_db(database, fields, [by_name.get(name, DEFERRED) for name in fields])
+
+
+def get_cached_principal(user_id, jti, version: int) -> CustomUser | None:
+    """
+    Return the user authenticated by the token from the cache, or None on a miss.
+    `version` is the principal version of the user (see `get_principal_version`).
+
+    The user is rebuilt with its employee (or the lack of one) already attached, so
+    permission checks on the role do not query the database either.
+    """
+    cache = get_principal_cache()
+    entry = cache.get(PRINCIPAL_KEY.format(user_id=user_id, jti=jti), version=version)
+    if entry is None:
+        return None
+
+    database, user_values, employee_values = entry
+    user = _build_instance(CustomUser, database, PRINCIPAL_USER_FIELDS, user_values)
+    employee = None
+    if employee_values is not None:
+        employee = _build_instance(Employee, database, PRINCIPAL_EMPLOYEE_FIELDS, employee_values)
+        Employee.user.field.set_cached_value(employee, user)
+    CustomUser.employee.related.set_cached_value(user, employee)
+    return user
+
+
+def cache_principal(user: CustomUser, jti, version: int) -> None:
+    """
+    Cache the principal of an active user for `AUTH_PRINCIPAL_CACHE_TTL` seconds, under
+    the principal version read before the user was loaded: if the user is invalidated
+    in between, the entry is written under the old version and never served.
+    """
+    try:
+        employee = user.employee
+    except ObjectDoesNotExist:
+        employee = None
+
+    entry = (
+        user._state.db,
+        tuple(getattr(user, name) for name in PRINCIPAL_USER_FIELDS),
+        (
+            tuple(getattr(employee, name) for name in PRINCIPAL_EMPLOYEE_FIELDS)
+            if employee is not None
+            else None
+        ),
+    )
+    cache = get_principal_cache()
+    cache.set(
+        PRINCIPAL_KEY.format(user_id=user.pk, jti=jti),
+        entry,
+        timeout=getattr(settings, "AUTH_PRINCIPAL_CACHE_TTL", 60),
+        version=version,
+    )
+
+
+TOKEN_VERSION_KEY = "users:token-version:{user_id}"
+
+
+def get_token_version(user_id) -> int | None:
+    """
+    Return the token version of a user, or None if the user does not exist.
+
+    The version is read from the cache when it is shared by all processes, so checking
+    the `ver` claim of a token does not query the database. A per-process cache would
+    not see `revoke_tokens` in other workers, so the version is read from the database.
+    """
+    cache = get_principal_cache()
+    shared = is_shared_cache(cache)
+    key = TOKEN_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key) if shared else None
+    if version is None:
+        version = (
+            CustomUser.objects.filter(pk=user_id).values_list("token_version", flat=True).first()
+        )
+        if version is None:
+            return None
+        if shared:
+            timeout = getattr(settings, "AUTH_TOKEN_VERSION_CACHE_TTL", 3600)
+            cache.set(key, version, timeout=timeout)
+    return version
+
+
+def revoke_tokens(user_id, using=None) -> None:
+    """
+    Invalidate every token issued to the user so far, by bumping its token version.
+
+    The cached version is dropped again once the transaction commits, so a concurrent
+    request can not keep the old version cached.
+    """
+    using = using or router.db_for_write(CustomUser)
+    CustomUser.objects.using(using).filter(pk=user_id).update(token_version=F("token_version") + 1)
+    key = TOKEN_VERSION_KEY.format(user_id=user_id)
+    cache = get_principal_cache()
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key), using=using)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import DatabaseError, connections
+from django.db.models.sql import Query
+
+from apps.tenants.context import get_current_garage
+from apps.tenants.versions import (
+    are_versions_shared,
+    get_model_versions,
+    get_versions_cache,
+    versioned_models,
+)
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+
+# shared cache key of exact counts, read with `version=<table versions>`
+COUNT_KEY = "counts:{garage_id}:{model}:{digest}"
+# shared cache key marking queries last counted below the estimate threshold, so they are
+# counted without asking the planner first
+SMALL_COUNT_KEY = "{key}:small"
+
+
+def get_query_models(query) -> set | None:
+    """
+    Return the models of the tables a query reads (joins and subqueries included), or
+    None if one of the tables has no model.
+    """
+    models = {model._meta.db_table: model for model in apps.get_models()}
+    tables = {query.get_meta().db_table}
+    # joins trimmed by the filters are left in the alias map, unreferenced
+    tables.update(
+        join.table_name
+        for alias, join in query.alias_map.items()
+        if query.alias_refcount.get(alias)
+    )
+    result = set()
+    stack = [query.where, *query.annotations.values()]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Query):
+            nested = get_query_models(node)
+            if nested is None:
+                return None
+            result |= nested
+        elif hasattr(node, "get_source_expressions"):
+            stack.extend(node.get_source_expressions())
+
+    for table in tables:
+        if table not in models:
+            return None
+        result.add(models[table])
+    return result
+
+
+def get_count_key(queryset) -> tuple[str, str] | None:
+    """
+    Return the cache key and version of the count of a garage queryset, or None if its
+    count can not be cached (no garage context, versions not shared by the processes, a
+    model read by the query that is not versioned).
+
+    Keys cover the tenant, the model and the SQL of the query (filters, search, ...);
+    the version covers the versions of all the models the query reads in the garage, so
+    a write to a joined table invalidates the count as well.
+    """
+    garage = get_current_garage()
+    if garage is None or not are_versions_shared():
+        return None
+    models = get_query_models(queryset.query)
+    if models is None or not models <= versioned_models:
+        return None
+
+    # compiling adds the joins of select_related to the query, compile a copy
+    sql, params = queryset.query.clone().sql_with_params()
+    digest = hashlib.sha256(f"{sql}:{params!r}".encode()).hexdigest()
+    key = COUNT_KEY.format(
+        garage_id=garage.pk, model=queryset.model._meta.label_lower, digest=digest
+    )
+    models = sorted(models, key=lambda model: model._meta.label_lower)
+    versions = get_model_versions(models, garage.pk)
+    return key, ".".join(str(versions[model]) for model in models)
+
+
+def _find_plan_rows(plan) -> int | None:
+    # MySQL: rows of the table left after its conditions; PostgreSQL: rows of the top node
+    if isinstance(plan, list):
+        plan = plan[0] if plan else {}
+    if not isinstance(plan, dict):
+        return None
+    if "Plan Rows" in plan:
+        return int(plan["Plan Rows"])
+    if "rows_examined_per_scan" in plan:
+        if "filtered" not in plan:
+            return None
+        return int(float(plan["rows_examined_per_scan"]) * float(plan["filtered"]) / 100)
+    for value in plan.values():
+        if isinstance(value, (dict, list)):
+            rows = _find_plan_rows(value)
+            if rows is not None:
+                return rows
+    return None
+
+
+def estimate_count(queryset) -> int | None:
+    """
+    Return the number of rows of the queryset estimated by the query planner from the
+    table and index statistics, or None if the database has no usable estimate.
+
+    Only queries of a single table are estimated: for joins, MySQL reports the rows of
+    the first table regardless of the conditions on the others.
+    """
+    if connections[queryset.db].vendor not in ("mysql", "postgresql"):
+        return None
+    queryset = queryset.order_by().select_related(None)
+    query = queryset.query
+    if query.distinct or query.group_by is not None or query.is_sliced or query.combinator:
+        return None
+    if (
+        get_query_models(query) != {queryset.model}
+        or sum(map(bool, query.alias_refcount.values())) > 1
+    ):
+        return None
+    try:
+        return _find_plan_rows(json.loads(queryset.explain(format="json")))
+    except (DatabaseError, ValueError, TypeError):
+        return None
+
+
+def get_count_mode(view) -> str:
+    """Return the count mode of the view: "auto" (cached/estimated/exact) or "exact"."""
+    return getattr(view, "count_mode", None) or getattr(settings, "PAGINATION_COUNT_MODE", "auto")
+
+
+def _lookup_count(queryset, mode: str):
+    # (count, count mode, cache key); count is None when an exact count is needed
+    try:
+        cache_key = get_count_key(queryset) if mode != COUNT_EXACT else None
+    except EmptyResultSet:
+        return 0, COUNT_EXACT, None
+
+    if cache_key is not None:
+        count = get_versions_cache().get(cache_key[0], version=cache_key[1])
+        if count is not None:
+            return count, COUNT_CACHED, None
+
+    small = cache_key is not None and get_versions_cache().get(
+        SMALL_COUNT_KEY.format(key=cache_key[0]), False
+    )
+    if mode != COUNT_EXACT and not small:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            return estimate, COUNT_ESTIMATED, None
+
+    return None, COUNT_EXACT, cache_key
+
+
+def _store_count(cache_key, count: int) -> None:
+    if cache_key is not None:
+        timeout = getattr(settings, "PAGINATION_COUNT_CACHE_TTL", 300)
+        get_versions_cache().set(cache_key[0], count, timeout=timeout, version=cache_key[1])
+        if count < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            get_versions_cache().set(SMALL_COUNT_KEY.format(key=cache_key[0]), True, timeout)
+
+
+def get_count(queryset, mode: str = "auto") -> tuple[int, str]:
+    """
+    Return the number of rows of the queryset and how it was obtained.
+
+    - "cached": exact count cached per tenant, query and table version
+    - "estimated": planner estimate of single table queries, used when it exceeds
+      PAGINATION_COUNT_ESTIMATE_THRESHOLD (queries last counted below it are not estimated)
+    - "exact": COUNT(*), cached for the next requests
+    """
+    count, count_mode, cache_key = _lookup_count(queryset, mode)
+    if count is None:
+        count = queryset.count()
+        _store_count(cache_key, count)
+    return count, count_mode
+
+
+async def aget_count(queryset, mode: str = "auto") -> tuple[int, str]:
+    """Async version of `get_count`, counting exactly with the async ORM."""
+    count, count_mode, cache_key = await sync_to_async(_lookup_count)(queryset, mode)
+    if count is None:
+        count = await queryset.acount()
+        await sync_to_async(_store_count)(cache_key, count)
+    return count, count_mode
@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.inventory.models import Supplier
+from apps.tenants.sharding import get_control_database, get_default_shard, get_shards
+from apps.users.models import Customer
+from shared.validators import get_phone_key, normalize_nepali_phone
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the phone numbers of customers and suppliers saved before they were "
+        "normalized in their canonical form, with their `phone_key`, in small batches. "
+        "Rows whose number is a duplicate of another row of the garage are reported and "
+        "left unchanged."
+    )
+
+    models = [Customer, Supplier]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows updated per transaction."
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches, leaving room for concurrent writes.",
+        )
+
+    def handle(self, *args, **options):
+        databases = [get_control_database(), get_default_shard(), *get_shards()]
+        for database in dict.fromkeys(databases):
+            for model in self.models:
+                updated = self.backfill(model, database, options["batch_size"], options["pause"])
+                name = model._meta.verbose_name_plural
+                self.stdout.write(f"  {database}: {updated} {name} updated")
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def backfill(self, model, database: str, batch_size: int, pause: float) -> int:
+        rows = model.objects_all_garages.using(database)
+        updated = 0
+        last_pk = 0
+        while True:
+            # walk the primary key, so each batch is a short range scan
+            batch = list(
+                rows.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "garage_id", "phone_number", "phone_key")[:batch_size]
+            )
+            if not batch:
+                return updated
+            last_pk = batch[-1].pk
+
+            changed = []
+            for obj in batch:
+                phone_number = normalize_nepali_phone(obj.phone_number)
+                phone_key = get_phone_key(phone_number)
+                if (obj.phone_number, obj.phone_key) != (phone_number, phone_key):
+                    obj.phone_number, obj.phone_key = phone_number, phone_key
+                    changed.append(obj)
+            if not changed:
+                continue
+
+            with transaction.atomic(using=database):
+                changed = self.drop_duplicates(rows, changed)
+                rows.bulk_update(changed, ["phone_number", "phone_key"])
+            updated += len(changed)
+            time.sleep(pause)
+
+    def drop_duplicates(self, rows, changed: list) -> list:
+        """Return the rows whose key is not used by another row of their garage."""
+        taken = set(
+            rows.filter(phone_key__in={obj.phone_key for obj in changed if obj.phone_key})
+            .exclude(pk__in=[obj.pk for obj in changed])
+            .values_list("garage_id", "phone_key")
+        )
+        unique = []
+        for obj in changed:
+            key = (obj.garage_id, obj.phone_key)
+            if obj.phone_key is not None and key in taken:
+                self.stderr.write(
+                    f"  {obj._meta.verbose_name.capitalize()} {obj.pk} ({obj.phone_number!r}) "
+                    f"duplicates another row of garage {obj.garage_id}, skipped."
+                )
+                continue
+            taken.add(key)
+            unique.append(obj)
+        return unique
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.tenants.sharding import get_control_database, get_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding tokens (and their blacklist entries) in small batches, "
+        "so the token tables stay bounded without long table locks. Meant to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Tokens deleted per transaction."
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches, leaving room for concurrent writes.",
+        )
+
+    def handle(self, *args, **options):
+        now = aware_utcnow()
+        for database in dict.fromkeys([get_control_database(), *get_shards()]):
+            deleted = self.purge(database, now, options["batch_size"], options["pause"])
+            self.stdout.write(f"  {database}: {deleted} expired tokens deleted")
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def purge(self, database: str, now, batch_size: int, pause: float) -> int:
+        deleted = 0
+        last_pk = 0
+        while True:
+            # walk the primary key, so each batch is a short range scan
+            ids = list(
+                OutstandingToken.objects.using(database)
+                .filter(pk__gt=last_pk, expires_at__lte=now)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+
+            with transaction.atomic(using=database):
+                BlacklistedToken.objects.using(database).filter(token_id__in=ids).delete()
+                OutstandingToken.objects.using(database).filter(pk__in=ids).delete()
+
+            deleted += len(ids)
+            last_pk = ids[-1]
+            time.sleep(pause)
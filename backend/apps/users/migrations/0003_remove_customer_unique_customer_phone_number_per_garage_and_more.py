@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_garageshard'),
+        ('users', '0002_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='customer',
+            name='unique_customer_phone_number_per_garage',
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_key',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='customer',
+            constraint=models.UniqueConstraint(fields=('garage', 'phone_key'), name='unique_customer_phone_number_per_garage'),
+        ),
+    ]
@@ -3,7 +3,7 @@ from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 
-from shared.models import GarageMixin, TimeStampMixin, GarageAwareModel
+from shared.models import GarageAwareModel, GarageMixin, PhoneNumberMixin, TimeStampMixin
 from shared.validators import nepali_phone_validator
 
 
@@ -23,6 +23,8 @@ class CustomUser(AbstractUser):
     garage = models.ForeignKey(
         "tenants.Garage", on_delete=models.SET_NULL, null=True, blank=True, related_name="users"
     )
+    # bumped to revoke every token issued so far (role change, deactivation, ...)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     EMAIL_FIELD = "email"
@@ -53,7 +55,7 @@ class CustomUser(AbstractUser):
         return f"{self.email} ({scope})"
 
 
-class Customer(GarageMixin, TimeStampMixin, GarageAwareModel):
+class Customer(GarageMixin, TimeStampMixin, PhoneNumberMixin, GarageAwareModel):
     """Model representing customer of a garage."""
 
     first_name = models.CharField(max_length=100)
@@ -65,8 +67,9 @@ class Customer(GarageMixin, TimeStampMixin, GarageAwareModel):
 
     class Meta:
         constraints = [
+            # canonical numbers, also the index of lookups by phone number
             models.UniqueConstraint(
-                fields=["garage", "phone_number"], name="unique_customer_phone_number_per_garage"
+                fields=["garage", "phone_key"], name="unique_customer_phone_number_per_garage"
             ),
             models.UniqueConstraint(
                 fields=["garage", "email"],
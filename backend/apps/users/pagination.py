@@ -1,7 +1,296 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counts import (
+    COUNT_CACHED,
+    COUNT_ESTIMATED,
+    COUNT_EXACT,
+    aget_count,
+    get_count,
+    get_count_mode,
+)
 
 
 class CustomLimitOffsetPagination(LimitOffsetPagination):
-    """Custom limit/offset based pagination with max-limit."""
+    """
+    Custom limit/offset based pagination with max-limit.
+
+    Counts go through the count strategies of `apps.users.counts` (cached, estimated or
+    exact) and the response tells which one was used in `count_mode`, so clients can
+    show "~12,400 parts". `?count=exact` forces an exact count.
+    """
 
     max_limit = 100
+    count_query_param = "count"
+
+    count_mode = COUNT_EXACT
+    has_more = False
+
+    def get_requested_count_mode(self, request, view) -> str:
+        if request.query_params.get(self.count_query_param) == COUNT_EXACT:
+            return COUNT_EXACT
+        return get_count_mode(view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count, self.count_mode = get_count(
+            queryset, self.get_requested_count_mode(request, view)
+        )
+        self.offset = self.get_offset(request)
+        if not self.prepare_page():
+            return []
+        return self.finish_page(list(queryset[self.offset : self.offset + self.page_end()]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of `paginate_queryset`, using Django's async ORM."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count, self.count_mode = await aget_count(
+            queryset, self.get_requested_count_mode(request, view)
+        )
+        self.offset = self.get_offset(request)
+        if not self.prepare_page():
+            return []
+        page = queryset[self.offset : self.offset + self.page_end()]
+        return self.finish_page([obj async for obj in page])
+
+    def prepare_page(self) -> bool:
+        """Return False when the page is known to be empty without querying it."""
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count_mode == COUNT_ESTIMATED:
+            return True
+        return not (self.count == 0 or self.offset > self.count)
+
+    def page_end(self) -> int:
+        # estimated counts can not tell whether a next page exists: fetch one extra row
+        return self.limit + 1 if self.count_mode == COUNT_ESTIMATED else self.limit
+
+    def finish_page(self, rows: list) -> list:
+        self.has_more = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def get_next_link(self):
+        if self.count_mode != COUNT_ESTIMATED:
+            return super().get_next_link()
+        if not self.has_more:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_mode"] = self.count_mode
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_mode"] = {
+            "type": "string",
+            "enum": [COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED],
+            "example": COUNT_EXACT,
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `exact` to force an exact count.",
+                "schema": {"type": "string", "enum": [COUNT_EXACT]},
+            },
+        ]
+
+
+class KeysetPagination(CustomLimitOffsetPagination):
+    """
+    Limit/offset pagination that switches to keyset (cursor) pagination when the `cursor`
+    query parameter is sent, empty for the first page.
+
+    - Pages are read with `(garage_id, ordering field, id) > cursor` on an index,
+      instead of scanning and dropping every row before the offset, and without COUNT(*).
+    - The ordering field comes from the view's OrderingFilter (first term only), so
+      `?sort=-open_date&cursor=` works; `id` is the tie breaker.
+    - Cursors are opaque and only valid for the ordering they were issued for.
+    - Viewsets opt in with `pagination_class = KeysetPagination`; `limit`/`offset`
+      clients keep working unchanged.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = (
+        "Keyset pagination cursor, from the `next` or `previous` link (empty for the first page)."
+    )
+    invalid_cursor_message = "Invalid cursor."
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset = self.prepare_keyset(queryset, request, view)
+        return self.finish_keyset(list(queryset[: self.limit + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return await super().apaginate_queryset(queryset, request, view)
+
+        queryset = self.prepare_keyset(queryset, request, view)
+        return self.finish_keyset([obj async for obj in queryset[: self.limit + 1]])
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": self.next_cursor_link,
+                "previous": self.previous_cursor_link,
+                "results": data,
+            }
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+        ]
+
+    def get_keyset_ordering(self, queryset, request, view) -> tuple[str, object]:
+        """
+        Return the ordering term (e.g. "-open_date") and its model field, or None for `id`.
+        """
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+
+        term = ordering[0] if ordering else "id"
+        name = term.lstrip("-")
+        if name in ("id", "pk") or "__" in name:
+            return ("-id" if term.startswith("-") else "id"), None
+        try:
+            return term, queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return "id", None
+
+    def prepare_keyset(self, queryset, request, view):
+        self.keyset = True
+        self.request = request
+        self.limit = self.get_limit(request) or self.max_limit
+        self.term, self.field = self.get_keyset_ordering(queryset, request, view)
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor[2])
+
+        descending = self.term.startswith("-") != self.reverse
+        order_by = []
+        if any(field.name == "garage" for field in queryset.model._meta.concrete_fields):
+            # constant within a tenant, lets the (garage, field, id) index serve the ordering
+            order_by.append("garage_id")
+        if self.field is not None:
+            order_by.append(self.get_field_ordering(queryset, descending))
+        order_by.append("-pk" if descending else "pk")
+        queryset = queryset.order_by(*order_by)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_position_filter(*self.cursor[:2], descending))
+        return queryset
+
+    def get_field_ordering(self, queryset, descending: bool):
+        # NULLs come first in ascending order, like MySQL sorts them natively
+        features = connections[queryset.db].features
+        if not (self.field.null and features.supports_order_by_nulls_modifier):
+            return f"-{self.field.attname}" if descending else self.field.attname
+        if descending:
+            return F(self.field.attname).desc(nulls_last=True)
+        return F(self.field.attname).asc(nulls_first=True)
+
+    def get_position_filter(self, value, pk, descending: bool) -> Q:
+        """Return the filter of the rows after (value, pk) in the ordering."""
+        after = "lt" if descending else "gt"
+        if self.field is None:
+            return Q(**{f"pk__{after}": pk})
+
+        name = self.field.attname
+        if value is None:
+            if descending:
+                # NULLs come last: only NULL rows with a smaller id are left
+                return Q(**{f"{name}__isnull": True, f"pk__{after}": pk})
+            return Q(**{f"{name}__isnull": True, f"pk__{after}": pk}) | Q(
+                **{f"{name}__isnull": False}
+            )
+
+        position = Q(**{f"{name}__{after}": value}) | Q(**{name: value, f"pk__{after}": pk})
+        if descending and self.field.null:
+            position |= Q(**{f"{name}__isnull": True})
+        return position
+
+    def finish_keyset(self, rows: list) -> list:
+        has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if self.reverse:
+            rows.reverse()
+
+        self.next_cursor_link = None
+        self.previous_cursor_link = None
+        if rows:
+            if has_more or self.reverse:
+                self.next_cursor_link = self.encode_cursor(rows[-1], reverse=False)
+            if (has_more and self.reverse) or (self.cursor is not None and not self.reverse):
+                self.previous_cursor_link = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def get_row_value(self, row, name: str):
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        value = self.get_row_value(row, self.field.attname) if self.field is not None else None
+        # str() keeps the full precision of datetimes and decimals, unlike JSON encoders
+        value = str(value) if value is not None else None
+        position = [self.term, value, self.get_row_value(row, "id"), reverse]
+        encoded = urlsafe_b64encode(json.dumps(position).encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Return the (value, id, reverse) position of the cursor, or None on the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            term, value, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode()))
+            if term != self.term or not isinstance(pk, int):
+                raise ValueError
+            if value is not None and self.field is not None:
+                value = self.field.to_python(value)
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, bool(reverse)
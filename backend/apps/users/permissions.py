@@ -36,3 +36,50 @@ class IsGarageAdmin(permissions.BasePermission):
         if hasattr(user, "employee"):
             return user.employee.role == Employee.EmployeeRoleChoices.ADMIN
         return False
+
+
+class TokenClaimPermission(permissions.BasePermission):
+    """
+    Base class of permissions trusting the claims of the access token, so they never
+    query the database. Requests without claims (e.g. not authenticated) are denied.
+    """
+
+    def has_permission(self, request, view):
+        claims = request.auth
+        if claims is None or not hasattr(claims, "get"):
+            return False
+        return self.has_claims_permission(request, view, claims)
+
+    def has_claims_permission(self, request, view, claims) -> bool:
+        return True
+
+
+class IsGarageMemberClaim(TokenClaimPermission):
+    """
+    Allows access only to users of the garage of the request.
+    """
+
+    def has_claims_permission(self, request, view, claims):
+        garage = getattr(request, "garage", None)
+        return garage is not None and claims.get("garage_id") == garage.pk
+
+
+class IsGarageAdminClaim(IsGarageMemberClaim):
+    """
+    Allows access only to admin role users of the garage of the request.
+    """
+
+    def has_claims_permission(self, request, view, claims):
+        return (
+            super().has_claims_permission(request, view, claims)
+            and claims.get("role") == Employee.EmployeeRoleChoices.ADMIN
+        )
+
+
+class IsStaffClaim(TokenClaimPermission):
+    """
+    Allows access only to staff users.
+    """
+
+    def has_claims_permission(self, request, view, claims):
+        return bool(claims.get("is_staff"))
@@ -1,4 +1,4 @@
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 
 customer_schema = extend_schema_view(
     list=extend_schema(description="List all customers of a garage."),
@@ -6,6 +6,10 @@ customer_schema = extend_schema_view(
     retrieve=extend_schema(description="Retrieve a customer of a garage."),
     update=extend_schema(description="Update a customer of a garage."),
     destroy=extend_schema(description="Delete a customer of a garage."),
+    by_phone=extend_schema(
+        description="Retrieve a customer of a garage by phone number, in any form.",
+        parameters=[OpenApiParameter("phone", str, required=True, description="Phone number.")],
+    ),
 )
 
 employee_schema = extend_schema_view(
@@ -1,12 +1,20 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
-
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 
 from apps.garages.models import Vehicle
+from shared.serializers import (
+    CompiledSerializerMixin,
+    GarageUniqueFieldsMixin,
+    SparseFieldsMixin,
+)
+from shared.validators import get_phone_key, normalize_nepali_phone
+
 from .models import Customer, Employee
+from .tokens import RefreshToken
 
 User = get_user_model()
 
@@ -14,10 +22,36 @@ User = get_user_model()
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom TokenObtainPairSerializer with custom default error messages."""
 
+    token_class = RefreshToken
     default_error_messages = {
         "no_active_account": "Invalid email or password.",
     }
 
+    @classmethod
+    def get_token(cls, user):
+        """
+        Embed the authorization claims of the user, so permission checks can trust the
+        token instead of querying the database. Access tokens inherit them from the
+        refresh token.
+        """
+        token = super().get_token(user)
+        try:
+            role = user.employee.role
+        except ObjectDoesNotExist:
+            role = None
+
+        token["garage_id"] = user.garage_id
+        token["role"] = role
+        token["is_staff"] = user.is_staff
+        token["ver"] = user.token_version
+        return token
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """TokenRefreshSerializer checking the blacklist through the revoked token filter."""
+
+    token_class = RefreshToken
+
 
 class LoginSuccessSerializer(serializers.Serializer):
     success = serializers.BooleanField(default=True, read_only=True)
@@ -94,7 +128,7 @@ class ChangePasswordSerializer(serializers.ModelSerializer):
         return attrs
 
     def update(self, instance, validated_data):
-        instance.save_password(validated_data["new_password"])
+        instance.set_password(validated_data["new_password"])
         instance.save()
         return instance
 
@@ -151,7 +185,9 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["is_superuser", "date_joined", "last_login"]
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(
+    GarageUniqueFieldsMixin, CompiledSerializerMixin, serializers.ModelSerializer
+):
     vehicle_count = serializers.IntegerField(read_only=True)
 
     # TODO: Add total jobs and last_visit
@@ -169,34 +205,16 @@ class CustomerSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        garage_unique_fields = {
+            "phone_number": "Customer with this phone number already exists.",
+            "email": "Customer with this email already exists.",
+        }
+        # phone numbers are unique in any form
+        garage_unique_keys = {"phone_number": ("phone_key", get_phone_key)}
 
     def validate_phone_number(self, value):
-        """Check phone number is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        queryset = Customer.objects.filter(garage=garage, phone_number=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
-
-        if queryset.exists():
-            raise serializers.ValidationError("Customer with this phone number already exists.")
-
-        return value
-
-    def validate_email(self, value):
-        """Check email is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        queryset = Customer.objects.filter(garage=garage, email=value)
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
-
-        if queryset.exists():
-            raise serializers.ValidationError("Customer with this email already exists.")
-
-        return value
+        """Store phone numbers in their canonical form."""
+        return normalize_nepali_phone(value)
 
 
 class MinimalCustomerVehicleSerializer(serializers.ModelSerializer):
@@ -207,7 +225,7 @@ class MinimalCustomerVehicleSerializer(serializers.ModelSerializer):
         fields = ["id", "registration_number", "make", "model", "year"]
 
 
-class CustomerDetailSerializer(serializers.ModelSerializer):
+class CustomerDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     vehicle_count = serializers.IntegerField(read_only=True)
     vehicles = MinimalCustomerVehicleSerializer(many=True, read_only=True)
 
@@ -243,7 +261,7 @@ class MinimalCustomerSerializer(serializers.ModelSerializer):
         ]
 
 
-class EmployeeCreateSerializer(serializers.Serializer):
+class EmployeeCreateSerializer(GarageUniqueFieldsMixin, serializers.Serializer):
     # user fields
     username = serializers.CharField(max_length=150)
     email = serializers.EmailField(max_length=254)
@@ -274,32 +292,19 @@ class EmployeeCreateSerializer(serializers.Serializer):
             "role",
             "avatar",
         ]
+        garage_unique_fields = {
+            "username": "A user with this username already exists.",
+            "email": "A user with this email already exists.",
+        }
 
-    def validate_username(self, value):
-        """Check username is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        if User.objects.filter(username=value, garage=garage).exists():
-            raise serializers.ValidationError("A user with this username already exists.")
-
-        return value
-
-    def validate_email(self, value):
-        """Check email is unique per garage."""
-
-        garage = self.context.get("request").garage
-
-        if User.objects.filter(email=value, garage=garage).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-
-        return value
+    def get_unique_queryset(self):
+        return User.objects.filter(garage=self.context["request"].garage)
 
     def validate(self, attrs):
         if attrs["password"] != attrs["confirm_password"]:
             raise serializers.ValidationError({"confirm_password": "Password fields didn't match."})
 
-        return attrs
+        return super().validate(attrs)
 
     @transaction.atomic
     def create(self, validated_data):
@@ -327,7 +332,7 @@ class EmployeeCreateSerializer(serializers.Serializer):
         return employee
 
 
-class EmployeeUpdateSerializer(serializers.ModelSerializer):
+class EmployeeUpdateSerializer(GarageUniqueFieldsMixin, serializers.ModelSerializer):
     username = serializers.CharField(source="user.username")
     email = serializers.EmailField(source="user.email")
     first_name = serializers.CharField(source="user.first_name")
@@ -343,26 +348,16 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
             "role",
             "avatar",
         ]
+        garage_unique_fields = {
+            "username": "A user with this username already exists.",
+            "email": "A user with this email already exists.",
+        }
 
-    def validate_username(self, value):
-        """Ensure username is unique per garage (excluding self)."""
-        employee = self.instance
-        garage = employee.garage
-
-        if User.objects.filter(username=value, garage=garage).exclude(pk=employee.user.pk).exists():
-            raise serializers.ValidationError("A user with this username already exists.")
-
-        return value
-
-    def validate_email(self, value):
-        """Ensure email is unique per garage (excluding self)."""
-        employee = self.instance
-        garage = employee.garage
+    def get_unique_queryset(self):
+        return User.objects.filter(garage=self.instance.garage)
 
-        if User.objects.filter(email=value, garage=garage).exclude(pk=employee.user.pk).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-
-        return value
+    def get_unique_instance(self):
+        return self.instance.user
 
     def update(self, instance, validated_data):
         # Update user fields
@@ -379,7 +374,7 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class EmployeeReadSerializer(serializers.ModelSerializer):
+class EmployeeReadSerializer(CompiledSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(source="user.username")
     email = serializers.CharField(source="user.email")
     first_name = serializers.CharField(source="user.first_name")
@@ -402,11 +397,7 @@ class EmployeeReadSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["role"] = instance.get_role_display()
-        return data
+        display_fields = ["role"]
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.tenants.signals import track_model_versions
+
+from .cache import invalidate_principal, revoke_tokens
+from .models import CustomUser, Employee
+from .tokens import publish_revoked_token
+
+# changes to these fields revoke the tokens of the user, as they are embedded in the
+# token claims or end its access
+USER_REVOKING_FIELDS = ("is_active", "is_staff", "garage_id", "password")
+EMPLOYEE_REVOKING_FIELDS = ("role", "garage_id")
+
+
+def _changed_fields(sender, instance, fields, using, update_fields) -> bool:
+    if instance._state.adding or instance.pk is None:
+        return False
+    if update_fields is not None:
+        fields = [
+            name
+            for name in fields
+            if name in update_fields or name.removesuffix("_id") in update_fields
+        ]
+        if not fields:
+            return False
+
+    previous = sender._base_manager.using(using).filter(pk=instance.pk).values(*fields).first()
+    if previous is None:
+        return False
+    return any(previous[name] != getattr(instance, name) for name in fields)
+
+
+@receiver(pre_save, sender=CustomUser)
+def track_user_revocation(sender, instance, using=None, update_fields=None, raw=False, **kwargs):
+    if not raw:
+        instance._revoke_tokens = _changed_fields(
+            sender, instance, USER_REVOKING_FIELDS, using, update_fields
+        )
+
+
+@receiver(pre_save, sender=Employee)
+def track_employee_revocation(
+    sender, instance, using=None, update_fields=None, raw=False, **kwargs
+):
+    if not raw:
+        instance._revoke_tokens = _changed_fields(
+            sender, instance, EMPLOYEE_REVOKING_FIELDS, using, update_fields
+        )
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_principal(sender, instance, using=None, **kwargs):
+    """
+    Drop the cached principals of a user when it is saved (deactivated, password
+    changed, ...) or deleted, and revoke its tokens when their claims became stale.
+    """
+    invalidate_principal(instance.pk)
+    if getattr(instance, "_revoke_tokens", False):
+        instance._revoke_tokens = False
+        revoke_tokens(instance.pk, using=using)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_principal(sender, instance, using=None, **kwargs):
+    """
+    Drop the cached principals of the user of an employee when its role changes, and
+    revoke its tokens when the role claim became stale.
+    """
+    invalidate_principal(instance.user_id)
+    if kwargs.get("signal") is post_delete or getattr(instance, "_revoke_tokens", False):
+        instance._revoke_tokens = False
+        revoke_tokens(instance.user_id, using=using)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def share_revoked_token(sender, instance, created=False, using=None, raw=False, **kwargs):
+    """Add blacklisted JTIs to the revoked token filter of every process, once committed."""
+    if created and not raw:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: publish_revoked_token(jti), using=using)
+
+
+# users are rendered with the employees of their garage
+track_model_versions(CustomUser)
@@ -0,0 +1,193 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.tenants.sharding import get_control_database, get_shards
+from shared.cache import is_shared_cache
+
+# shared cache keys: a generation counter and the jti revoked at each generation
+REVOKED_GENERATION_KEY = "users:revoked:generation"
+REVOKED_JTI_KEY = "users:revoked:{generation}"
+
+# processes further behind than this rebuild their filter from the database
+REVOKED_LOG_SIZE = 1000
+
+# shared cache keys of coalesced refreshes, by sha256 of the refresh token
+REFRESHED_KEY = "users:refreshed:{digest}"
+REFRESH_LOCK_KEY = "users:refresh-lock:{digest}"
+
+
+class BloomFilter:
+    """
+    Set of strings with no false negatives and a bounded false positive rate,
+    stored in `size` bits whatever the length of the strings.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # double hashing: k positions from the two halves of a single digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+
+def get_revocation_cache():
+    """Return the Django cache used to share revoked JTIs between processes."""
+    return caches[getattr(settings, "TOKEN_BLACKLIST_CACHE", "default")]
+
+
+def get_revoked_generation(cache=None) -> int:
+    """
+    Return the current generation of the revoked JTI log.
+
+    A missing generation key is seeded from the clock, so every process notices the
+    gap and rebuilds its filter from the database.
+    """
+    cache = cache or get_revocation_cache()
+    generation = cache.get(REVOKED_GENERATION_KEY)
+    if generation is None:
+        cache.add(REVOKED_GENERATION_KEY, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(REVOKED_GENERATION_KEY, 0)
+    return generation
+
+
+class RevokedTokenFilter:
+    """
+    Per-process Bloom filter of the JTIs of blacklisted, not yet expired tokens.
+
+    - Built from the blacklist of every database on first use.
+    - Kept in sync through the shared cache: each revocation bumps a generation
+      counter and stores its JTI under the new generation, so a process only fetches
+      the JTIs it missed. Processes too far behind rebuild from the database.
+    - A negative answer is final; a positive one must be confirmed by the database.
+    - Without a cache shared by the processes, revocations in other processes can not
+      be seen: every JTI is reported as possibly revoked, so the database decides.
+    """
+
+    def __init__(self):
+        self._filter: BloomFilter | None = None
+        self._generation: int | None = None
+        self._lock = threading.Lock()
+
+    def might_be_revoked(self, jti: str) -> bool:
+        cache = get_revocation_cache()
+        if not is_shared_cache(cache):
+            return True
+        generation = get_revoked_generation(cache)
+        with self._lock:
+            if self._filter is None or not self._catch_up(cache, generation):
+                self._rebuild(generation)
+            return jti in self._filter
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = None
+            self._generation = None
+
+    def _catch_up(self, cache, generation: int) -> bool:
+        if generation == self._generation:
+            return True
+        if generation < self._generation or generation - self._generation > REVOKED_LOG_SIZE:
+            return False
+
+        keys = [
+            REVOKED_JTI_KEY.format(generation=number)
+            for number in range(self._generation + 1, generation + 1)
+        ]
+        entries = cache.get_many(keys)
+        if len(entries) != len(keys):
+            return False
+
+        for jti in entries.values():
+            self._filter.add(jti)
+        self._generation = generation
+        # a filter filled past its capacity no longer keeps its error rate
+        return self._filter.count <= self._filter.capacity
+
+    def _rebuild(self, generation: int) -> None:
+        jtis = []
+        for database in dict.fromkeys([get_control_database(), *get_shards()]):
+            jtis.extend(
+                BlacklistedToken.objects.using(database)
+                .filter(token__expires_at__gt=aware_utcnow())
+                .values_list("token__jti", flat=True)
+                .iterator()
+            )
+
+        capacity = max(getattr(settings, "TOKEN_BLACKLIST_FILTER_CAPACITY", 100_000), 2 * len(jtis))
+        bloom = BloomFilter(capacity, getattr(settings, "TOKEN_BLACKLIST_FILTER_ERROR_RATE", 0.001))
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+        self._generation = generation
+
+
+revoked_tokens = RevokedTokenFilter()
+
+
+def publish_revoked_token(jti: str) -> None:
+    """Add the JTI to the filter of this process and share it with the other processes."""
+    revoked_tokens.add(jti)
+    cache = get_revocation_cache()
+    try:
+        generation = cache.incr(REVOKED_GENERATION_KEY)
+    except ValueError:
+        # the generation was evicted: other processes will rebuild from the database
+        get_revoked_generation(cache)
+        return
+    cache.set(
+        REVOKED_JTI_KEY.format(generation=generation),
+        jti,
+        timeout=getattr(settings, "TOKEN_BLACKLIST_SYNC_TTL", 3600),
+    )
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    RefreshToken that only queries the blacklist for JTIs the revoked filter may contain
+    (every JTI, unless the revocation cache is shared).
+    """
+
+    def check_blacklist(self) -> None:
+        if revoked_tokens.might_be_revoked(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def get_refresh_digest(raw_token: str) -> str:
+    """Return the digest identifying a refresh token in the cache (never the token itself)."""
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+def forget_refreshed_token(raw_token: str) -> None:
+    """Drop the coalesced refresh result of a token, e.g. when it is blacklisted."""
+    get_revocation_cache().delete(REFRESHED_KEY.format(digest=get_refresh_digest(raw_token)))
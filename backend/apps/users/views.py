@@ -1,30 +1,42 @@
 import logging
+import time
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Count
+from django.http import Http404
 from django.views.decorators.csrf import ensure_csrf_cookie
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import extend_schema
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-
-from drf_spectacular.utils import extend_schema
-from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.settings import api_settings as jwt_settings
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 
-from apps.tenants.viewsets import GarageGenericViewSet
+from apps.garages.models import Vehicle
+from apps.search.filters import IndexedSearchFilter
+from apps.tenants.viewsets import (
+    AsyncGarageGenericViewSet,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    GarageGenericViewSet,
+    StreamingListModelMixin,
+)
+from shared.validators import get_phone_key
+
 from .models import Customer, CustomUser, Employee
+from .pagination import KeysetPagination
 from .permissions import IsGarageAdmin
 from .schemas import customer_schema, employee_schema
 from .serializers import (
@@ -32,19 +44,28 @@ from .serializers import (
     AdminChangePasswordSuccessSerializer,
     ChangePasswordSerializer,
     ChangePasswordSuccessSerializer,
-    CustomerSerializer,
     CustomerDetailSerializer,
+    CustomerSerializer,
     CustomTokenObtainPairSerializer,
     CustomTokenRefreshResponse,
+    CustomTokenRefreshSerializer,
+    EmployeeCreateSerializer,
+    EmployeeReadSerializer,
+    EmployeeUpdateSerializer,
     LoginSuccessSerializer,
     LogoutSuccessSerializer,
+    UserProfileSerializer,
     UserRegistrationSerializer,
     UserRegistrationSuccessSerializer,
     UserSerializer,
-    UserProfileSerializer,
-    EmployeeCreateSerializer,
-    EmployeeUpdateSerializer,
-    EmployeeReadSerializer,
+)
+from .tokens import (
+    REFRESH_LOCK_KEY,
+    REFRESHED_KEY,
+    RefreshToken,
+    forget_refreshed_token,
+    get_refresh_digest,
+    get_revocation_cache,
 )
 
 logger = logging.getLogger(__name__)
@@ -191,7 +212,8 @@ class LogoutView(APIView):
                 refresh = RefreshToken(refresh_token)
                 # blacklist the token after logout
                 refresh.blacklist()
-            except Exception as e:
+                forget_refreshed_token(refresh_token)
+            except TokenError as e:
                 return Response(
                     {"success": False, "error": f"Error invalidating token: {e}"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -238,7 +260,49 @@ class LogoutView(APIView):
 
 @extend_schema(responses={200: CustomTokenRefreshResponse})
 class CustomTokenRefreshView(TokenRefreshView):
+    """
+    Refresh the access token, coalescing concurrent refreshes of the same refresh token.
+
+    Clients with many open tabs refresh at the same time: the first request issues the
+    access token and shares it through the cache for TOKEN_REFRESH_COALESCE_WINDOW
+    seconds, while concurrent requests wait for it instead of issuing their own.
+    """
+
     permission_classes = [permissions.AllowAny]
+    serializer_class = CustomTokenRefreshSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        raw_token = request.data.get("refresh")
+        if not isinstance(raw_token, str) or not raw_token:
+            return super().post(request, *args, **kwargs)
+
+        cache = get_revocation_cache()
+        digest = get_refresh_digest(raw_token)
+        key = REFRESHED_KEY.format(digest=digest)
+        lock_key = REFRESH_LOCK_KEY.format(digest=digest)
+        window = settings.TOKEN_REFRESH_COALESCE_WINDOW
+
+        data = cache.get(key)
+        locked = False
+        if data is None:
+            locked = cache.add(lock_key, True, timeout=window)
+            if not locked:
+                # another request is refreshing the same token, wait for its result
+                deadline = time.monotonic() + window
+                while data is None and time.monotonic() < deadline and cache.get(lock_key):
+                    time.sleep(0.05)
+                    data = cache.get(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        try:
+            response = super().post(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout=window)
+            return response
+        finally:
+            if locked:
+                cache.delete(lock_key)
 
     # def post(self, request: Request, *args, **kwargs) -> Response:
     #     try:
@@ -349,20 +413,48 @@ class CurrentUserProfileView(RetrieveAPIView):
 
 
 @customer_schema
-class CustomerViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class CustomerViewSet(
+    AsyncListModelMixin, AsyncRetrieveModelMixin, AsyncGarageGenericViewSet, viewsets.ModelViewSet
+):
     serializer_class = CustomerSerializer
+    compiled_list = True
+    # vehicles are counted in `vehicle_count`
+    version_models = [Vehicle]
     lookup_url_kwarg = "customer_id"
+    pagination_class = KeysetPagination
+    filter_backends = [IndexedSearchFilter]
+    search_fields = ["first_name", "last_name", "phone_number", "email"]
     # permission_classes = [IsGarageAdmin]
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return Customer.objects.filter(garage=self.garage).annotate(vehicle_count=Count("vehicles"))
+        queryset = Customer.objects.all().annotate(vehicle_count=Count("vehicles"))
+        if self.action == "retrieve":
+            # vehicles are serialized on the event loop, so they must be loaded upfront
+            queryset = queryset.prefetch_related("vehicles")
+        return queryset
 
     def get_serializer_class(self):
         if self.action in "retrieve":
             return CustomerDetailSerializer
         return self.serializer_class
 
+    @action(detail=False, methods=["get"], url_path="by-phone")
+    async def by_phone(self, request, *args, **kwargs):
+        """
+        Retrieve the customer with a phone number, in any form ("+977 981-2345678",
+        "9812345678"), on the canonical `phone_key` index.
+        """
+        phone_key = get_phone_key(request.query_params.get("phone", ""))
+        if phone_key is None:
+            raise ValidationError({"phone": ["Enter a phone number."]})
+
+        try:
+            customer = await self.get_queryset().aget(phone_key=phone_key)
+        except Customer.DoesNotExist:
+            raise Http404
+        return Response(self.get_serializer(customer).data)
+
     def perform_create(self, serializer):
         serializer.save(garage=self.garage)
 
@@ -371,8 +463,9 @@ class CustomerViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
 
 
 @employee_schema
-class EmployeeViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
+class EmployeeViewSet(StreamingListModelMixin, GarageGenericViewSet, viewsets.ModelViewSet):
     serializer_class = EmployeeReadSerializer
+    compiled_list = True
     http_method_names = ["get", "post", "put", "delete", "head", "options"]
     lookup_url_kwarg = "employee_id"
     # permission_classes = [IsGarageAdmin]
@@ -383,7 +476,7 @@ class EmployeeViewSet(GarageGenericViewSet, viewsets.ModelViewSet):
     filterset_fields = ["role", "user__is_active"]
 
     def get_queryset(self):
-        return Employee.objects.filter(garage=self.garage).select_related("garage", "user")
+        return Employee.objects.all().select_related("user")
 
     def get_serializer_class(self):
         if self.action == "create":
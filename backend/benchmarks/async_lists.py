@@ -0,0 +1,127 @@
+"""
+Compare sync (WSGI) and async (ASGI) throughput of the parts and customers list
+endpoints under concurrent load.
+
+- WSGI: sync viewsets served by Django's WSGI handler, requests sent from a thread pool.
+- ASGI: the async viewsets (`AsyncGarageGenericViewSet`) served by Django's ASGI handler,
+  requests sent concurrently from the event loop.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.async_lists --requests 1000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test.utils import override_settings
+from django.urls import include, path
+from rest_framework import routers, viewsets
+
+from apps.inventory.views import PartViewSet
+from apps.tenants.viewsets import GarageGenericViewSet
+from apps.users.views import CustomerViewSet
+from benchmarks.utils import (
+    TenantAsyncClient,
+    TenantClient,
+    access_token_for,
+    seed_garage,
+    test_database,
+)
+
+
+class SyncPartViewSet(GarageGenericViewSet, viewsets.ReadOnlyModelViewSet):
+    serializer_class = PartViewSet.serializer_class
+    filter_backends = PartViewSet.filter_backends
+    search_fields = PartViewSet.search_fields
+    ordering_fields = PartViewSet.ordering_fields
+    lookup_url_kwarg = PartViewSet.lookup_url_kwarg
+    permission_classes = PartViewSet.permission_classes
+    get_queryset = PartViewSet.get_queryset
+
+
+class SyncCustomerViewSet(GarageGenericViewSet, viewsets.ReadOnlyModelViewSet):
+    serializer_class = CustomerViewSet.serializer_class
+    lookup_url_kwarg = CustomerViewSet.lookup_url_kwarg
+    permission_classes = CustomerViewSet.permission_classes
+    get_queryset = CustomerViewSet.get_queryset
+
+
+sync_router = routers.SimpleRouter()
+sync_router.register(r"parts", SyncPartViewSet, basename="sync-parts")
+sync_router.register(r"customers", SyncCustomerViewSet, basename="sync-customers")
+
+async_router = routers.SimpleRouter()
+async_router.register(r"parts", PartViewSet, basename="async-parts")
+async_router.register(r"customers", CustomerViewSet, basename="async-customers")
+
+urlpatterns = [
+    path("sync/", include(sync_router.urls)),
+    path("async/", include(async_router.urls)),
+]
+
+ENDPOINTS = ["parts/", "customers/"]
+
+
+def run_wsgi(url: str, *, headers: dict, requests: int, concurrency: int) -> float:
+    """Return requests per second of the sync endpoint served through WSGI."""
+    client = TenantClient()
+
+    def call(_):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.content
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        list(executor.map(call, range(requests)))
+        elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+async def run_asgi(url: str, *, headers: dict, requests: int, concurrency: int) -> float:
+    """Return requests per second of the async endpoint served through ASGI."""
+    client = TenantAsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.content
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=1000, help="parts and customers to seed")
+    parser.add_argument("--limit", type=int, default=50, help="page size of each request")
+    args = parser.parse_args()
+
+    with test_database(), override_settings(ROOT_URLCONF=__name__):
+        _, user = seed_garage(customers=args.rows, vehicles_per_customer=1, parts=args.rows)
+        headers = {"Authorization": f"Bearer {access_token_for(user)}"}
+        options = {"headers": headers, "requests": args.requests, "concurrency": args.concurrency}
+
+        print(
+            f"{args.requests} requests, concurrency {args.concurrency}, "
+            f"{args.rows} rows, limit {args.limit}"
+        )
+        for endpoint in ENDPOINTS:
+            query = f"?limit={args.limit}"
+            wsgi = run_wsgi(f"/sync/{endpoint}{query}", **options)
+            asgi = asyncio.run(run_asgi(f"/async/{endpoint}{query}", **options))
+            print(
+                f"{endpoint:<12} WSGI {wsgi:9.1f} req/s   ASGI {asgi:9.1f} req/s   "
+                f"({asgi / wsgi:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare autocompletion of parts from the database (the search index, as used while the
+in-memory index of the garage is built) and from the in-memory index.
+
+- database: `/api/inventory/parts/autocomplete/` with a cold in-memory index.
+- memory: the same requests once the index of the garage is built.
+- match: `part_autocomplete.match` alone, without the request overhead.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.autocomplete --rows 20000 --repeat 30
+"""
+
+import argparse
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+from apps.inventory.autocomplete import part_autocomplete
+from benchmarks.utils import (
+    TenantClient,
+    access_token_for,
+    seed_garage,
+    summarize,
+    test_database,
+    timed,
+)
+
+QUERIES = ["b", "bra", "brake pad 12", "sku-0004", "pad 1999"]
+
+
+def fetch(client, query: str) -> list:
+    response = client.get("/api/inventory/parts/autocomplete/", {"q": query})
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=20_000, help="parts to seed")
+    args = parser.parse_args()
+
+    with test_database():
+        garage, user = seed_garage(parts=args.rows)
+        # rows are bulk created, without the signals keeping the search index up to date
+        call_command("rebuild_search_index", str(garage.pk), stdout=StringIO())
+        client = TenantClient(HTTP_AUTHORIZATION=f"Bearer {access_token_for(user)}")
+
+        print(f"{args.repeat} requests per query, {args.rows} parts")
+        for query in QUERIES:
+            # never built: every request falls back to the database
+            with mock.patch.object(part_autocomplete._executor, "submit"):
+                part_autocomplete.clear()
+                timings = timed(lambda query=query: fetch(client, query), repeat=args.repeat)
+                part_autocomplete._building.clear()
+            print(f"{query!r:<16} database {summarize(timings)}")
+
+        part_autocomplete.clear()
+        fetch(client, QUERIES[0])
+        while part_autocomplete._building:
+            time.sleep(0.01)
+        print(f"index: {part_autocomplete.stats()}")
+
+        for query in QUERIES:
+            timings = timed(lambda query=query: fetch(client, query), repeat=args.repeat)
+            print(f"{query!r:<16} memory   {summarize(timings)}")
+            timings = timed(
+                lambda query=query: part_autocomplete.match(garage, query, 10), repeat=args.repeat
+            )
+            print(f"{query!r:<16} match    {summarize(timings)}")
+
+
+if __name__ == "__main__":
+    main()
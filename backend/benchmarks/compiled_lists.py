@@ -0,0 +1,88 @@
+"""
+Compare the instance and the compiled (`.values()`) read paths of list endpoints on
+100 row pages of vehicles, appointments and parts.
+
+- instance: rows are loaded as model instances and rendered field by field.
+- compiled: rows are read with one `.values()` projection and rendered by the
+  serializer compiled with `CompiledSerializerMixin` (`compiled_list = True`).
+
+Both paths must return the same bytes; the benchmark fails otherwise. Responses are
+not streamed, so whole bodies are compared.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.compiled_lists --repeat 50
+"""
+
+import argparse
+import sys
+from contextlib import ExitStack
+from unittest import mock
+
+from django.test.utils import override_settings
+
+from apps.garages.views import AppointmentViewSet, VehicleViewSet
+from apps.inventory.views import PartViewSet
+from benchmarks.utils import (
+    TenantClient,
+    access_token_for,
+    seed_garage,
+    summarize,
+    test_database,
+    timed,
+)
+
+ENDPOINTS = {
+    "/api/vehicles/": VehicleViewSet,
+    "/api/appointments/": AppointmentViewSet,
+    "/api/inventory/parts/": PartViewSet,
+}
+
+
+def fetch(client, url: str, *, headers: dict, compiled: bool, viewset) -> bytes:
+    with ExitStack() as stack:
+        if not compiled:
+            stack.enter_context(mock.patch.object(viewset, "compiled_list", False))
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.content
+    return response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=500, help="rows of each model to seed")
+    parser.add_argument("--limit", type=int, default=100, help="page size of each request")
+    args = parser.parse_args()
+
+    with test_database(), override_settings(JSON_STREAMING_MIN_ROWS=sys.maxsize):
+        _, user = seed_garage(
+            customers=args.rows,
+            vehicles_per_customer=1,
+            parts=args.rows,
+            appointments=args.rows,
+        )
+        client = TenantClient()
+        headers = {"Authorization": f"Bearer {access_token_for(user)}"}
+
+        print(f"{args.repeat} requests per path, {args.rows} rows, limit {args.limit}")
+        for endpoint, viewset in ENDPOINTS.items():
+            url = f"{endpoint}?limit={args.limit}"
+            options = {"headers": headers, "viewset": viewset}
+            assert fetch(client, url, compiled=True, **options) == fetch(
+                client, url, compiled=False, **options
+            ), f"{endpoint}: compiled output differs"
+
+            for compiled in (False, True):
+                timings = timed(
+                    lambda url=url, compiled=compiled, options=options: fetch(
+                        client, url, compiled=compiled, **options
+                    ),
+                    repeat=args.repeat,
+                )
+                label = "compiled" if compiled else "instance"
+                print(f"{endpoint:<24} {label:<9} {summarize(timings)}")
+
+
+if __name__ == "__main__":
+    main()
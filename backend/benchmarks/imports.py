@@ -0,0 +1,102 @@
+"""
+Import spreadsheets of customers, then of their vehicles, and report the throughput
+and the peak memory allocated by each import (traced with tracemalloc), for a file of
+a tenth of the rows and for the full file: the peak should not grow with the file.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.imports --rows 100000 --format csv
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.files import File
+from django.test import override_settings
+from openpyxl import Workbook
+
+from apps.imports.importers import run_import
+from apps.imports.models import ImportJob
+from benchmarks.utils import seed_garage, test_database
+
+COLUMNS = {
+    ImportJob.Kind.CUSTOMERS: ["first_name", "last_name", "phone_number", "email"],
+    ImportJob.Kind.VEHICLES: [
+        "owner_phone_number",
+        "registration_number",
+        "make",
+        "model",
+        "fuel_type",
+    ],
+}
+
+
+def get_rows(kind: str, start: int, count: int):
+    for i in range(start, start + count):
+        phone = f"+977 98{i:08d}"
+        if kind == ImportJob.Kind.CUSTOMERS:
+            yield [f"First{i}", f"Last{i}", phone, f"import{i}@example.com"]
+        else:
+            yield [phone, f"Ba {i % 99 + 1} Pa {i}", "Toyota", "Corolla", "petrol"]
+
+
+def write_file(path: Path, kind: str, start: int, count: int) -> None:
+    if path.suffix == ".csv":
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS[kind])
+            writer.writerows(get_rows(kind, start, count))
+        return
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(COLUMNS[kind])
+    for row in get_rows(kind, start, count):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def run(garage, directory: Path, kind: str, file_format: str, start: int, count: int) -> None:
+    path = directory / f"{kind.lower()}-{start}.{file_format}"
+    write_file(path, kind, start, count)
+    with open(path, "rb") as file:
+        job = ImportJob.objects.create(garage=garage, kind=kind, file=File(file, path.name))
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    run_import(job)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.COMPLETED, job.error
+    assert job.created_rows == count, (job.created_rows, job.error_rows)
+    print(
+        f"{kind.lower():<10} {count:>7} rows  {elapsed:6.1f}s  {count / elapsed:7.0f} rows/s  "
+        f"peak {peak / 1024 / 1024:5.1f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    args = parser.parse_args()
+
+    with test_database(), tempfile.TemporaryDirectory() as media:
+        garage, _ = seed_garage()
+        print("tracemalloc slows the imports down, compare the rates between sizes only")
+        with override_settings(MEDIA_ROOT=media):
+            start = 0
+            for count in (args.rows // 10, args.rows):
+                for kind in ImportJob.Kind:
+                    run(garage, Path(media), kind, args.format, start, count)
+                start += count
+
+
+if __name__ == "__main__":
+    main()
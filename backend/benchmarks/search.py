@@ -0,0 +1,88 @@
+"""
+Compare `?q=` searches of the parts and customers list endpoints with DRF's SearchFilter
+(`icontains` on every search field) and with the search index (`IndexedSearchFilter`).
+
+- icontains: every word becomes `LIKE '%word%'` on each search field, scanning all
+  rows of the garage.
+- indexed: words are looked up in the search index of the garage and matches are
+  ranked (see `apps.search.index`).
+
+The two filters do not match the same rows (substrings vs word prefixes), so the
+number of matches of each query is printed next to its timings.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.search --rows 20000 --repeat 30
+"""
+
+import argparse
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from rest_framework.filters import SearchFilter
+
+from apps.inventory.views import PartViewSet
+from apps.search.filters import IndexedSearchFilter
+from apps.users.views import CustomerViewSet
+from benchmarks.utils import (
+    TenantClient,
+    access_token_for,
+    seed_garage,
+    summarize,
+    test_database,
+    timed,
+)
+
+QUERIES = {
+    "/api/inventory/parts/": (PartViewSet, ["brake pad 12", "sku-0004", "pad 19999"]),
+    "/api/customers/": (CustomerViewSet, ["customer12", "9800001", "bench"]),
+}
+
+
+def fetch(client, url: str, *, headers: dict, viewset, indexed: bool) -> dict:
+    backends = [
+        SearchFilter if backend is IndexedSearchFilter and not indexed else backend
+        for backend in viewset.filter_backends
+    ]
+    with mock.patch.object(viewset, "filter_backends", backends):
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=20_000, help="parts and customers to seed")
+    parser.add_argument("--limit", type=int, default=20, help="page size of each request")
+    args = parser.parse_args()
+
+    with test_database():
+        garage, user = seed_garage(customers=args.rows, parts=args.rows)
+        # rows are bulk created, without the signals keeping the index up to date
+        call_command("rebuild_search_index", str(garage.pk), stdout=StringIO())
+        client = TenantClient()
+        headers = {"Authorization": f"Bearer {access_token_for(user)}"}
+
+        print(f"{args.repeat} requests per filter, {args.rows} rows, limit {args.limit}")
+        for endpoint, (viewset, queries) in QUERIES.items():
+            for query in queries:
+                # exact counts, so cached counts do not hide the cost of the filter
+                url = f"{endpoint}?q={query}&limit={args.limit}&count=exact"
+                for indexed in (False, True):
+                    options = {"headers": headers, "viewset": viewset, "indexed": indexed}
+                    matches = fetch(client, url, **options)["count"]
+                    timings = timed(
+                        lambda url=url, options=options: fetch(client, url, **options),
+                        repeat=args.repeat,
+                    )
+                    label = "indexed" if indexed else "icontains"
+                    print(
+                        f"{endpoint:<22} {query!r:<14} {label:<9} {matches:>6} matches  "
+                        f"{summarize(timings)}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
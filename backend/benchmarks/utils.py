@@ -0,0 +1,181 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throw-away test database (created from the configured
+`default` database, like `manage.py test` does), so they never touch real data.
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gadisewa.settings")
+django.setup()
+
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+BENCH_SUBDOMAIN = "bench"
+BENCH_HOST = f"{BENCH_SUBDOMAIN}.localhost"
+
+
+@contextmanager
+def test_database():
+    """Create a test database for the duration of the benchmark."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+class TenantClient(Client):
+    """Test client sending requests to the benchmark garage subdomain."""
+
+    def __init__(self, host=BENCH_HOST, **defaults):
+        super().__init__(HTTP_HOST=host, **defaults)
+
+
+class TenantAsyncClient(AsyncClient):
+    """Async test client sending requests to the benchmark garage subdomain."""
+
+    def __init__(self, host=BENCH_HOST, **defaults):
+        super().__init__(**defaults)
+        self.host = host
+
+    def request(self, **request):
+        # AsyncRequestFactory always sends `host: testserver`
+        request["headers"] = [(k, v) for k, v in request["headers"] if k != b"host"]
+        request["headers"].append((b"host", self.host.encode("ascii")))
+        return super().request(**request)
+
+
+def seed_garage(*, customers=0, vehicles_per_customer=0, parts=0, appointments=0):
+    """Create the benchmark garage with an admin employee and the requested rows."""
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from apps.garages.models import Appointment, Service, Vehicle
+    from apps.inventory.models import Category, Part, Supplier
+    from apps.tenants.models import Garage
+    from apps.users.models import Customer, CustomUser, Employee
+    from shared.validators import get_phone_key, normalize_vrn
+
+    garage = Garage.objects.create(
+        name="Bench Garage",
+        subdomain=BENCH_SUBDOMAIN,
+        registration_number="BENCH-1",
+        tax_pan_number="BENCH-1",
+        garage_type=Garage.GarageTypeChoices.AUTO_REPAIR,
+        street_address="Bench street",
+        city="Kathmandu",
+        postal_code="44600",
+        phone_number="9800000000",
+        email_address="bench@example.com",
+    )
+    user = CustomUser.objects.create_user(
+        username="bench", email="bench@example.com", password="bench-password", garage=garage
+    )
+    employee = Employee.objects.create(
+        user=user, garage=garage, role=Employee.EmployeeRoleChoices.ADMIN
+    )
+
+    customer_objs = Customer.objects.bulk_create(
+        Customer(
+            garage=garage,
+            first_name=f"Customer{i}",
+            last_name="Bench",
+            phone_number=f"98{i:08d}",
+            # set by `Customer.save()`, which bulk_create skips
+            phone_key=get_phone_key(f"98{i:08d}"),
+            email=f"customer{i}@example.com",
+        )
+        for i in range(customers)
+    )
+
+    def registration_number(i, j):
+        return f"Ba {i % 99 + 1} Pa {j}{i:04d}"[:20]
+
+    vehicle_objs = Vehicle.objects.bulk_create(
+        Vehicle(
+            garage=garage,
+            owner=customer,
+            registration_number=registration_number(i, j),
+            # set by `Vehicle.save()`, which bulk_create skips
+            vrn_key=normalize_vrn(registration_number(i, j)),
+            make="Toyota",
+            model="Corolla",
+            year=2015,
+            fuel_type=Vehicle.FuelType.PETROL,
+        )
+        for i, customer in enumerate(customer_objs)
+        for j in range(vehicles_per_customer)
+    )
+
+    category = Category.objects.create(garage=garage, name="Brakes")
+    supplier = Supplier.objects.create(
+        garage=garage, name="Bench Supplier", phone_number="9811111111"
+    )
+    Part.objects.bulk_create(
+        Part(
+            garage=garage,
+            name=f"Brake pad {i}",
+            sku=f"SKU-{i:06d}",
+            brand="Bosch",
+            category=category,
+            supplier=supplier,
+            purchase_price=Decimal("1200.50"),
+            selling_price=Decimal("1500.00"),
+            quantity=i % 25,
+        )
+        for i in range(parts)
+    )
+
+    service = Service.objects.create(garage=garage, name="General Service", labor_rate=Decimal(500))
+    now = timezone.now()
+    Appointment.objects.bulk_create(
+        Appointment(
+            garage=garage,
+            customer=vehicle.owner,
+            vehicle=vehicle,
+            mechanic=employee,
+            service=service,
+            appointment_date=now + timedelta(days=i % 30),
+            status=Appointment.AppointmentStatus.SCHEDULED,
+        )
+        for i, vehicle in zip(range(appointments), vehicle_objs)
+    )
+    return garage, user
+
+
+def access_token_for(user) -> str:
+    from apps.users.serializers import CustomTokenObtainPairSerializer
+
+    # carries the authorization claims (garage, role, token version) checked on requests
+    return str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+
+
+def timed(func, *, repeat: int) -> list[float]:
+    """Run `func` `repeat` times and return the wall time of each run in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: list[float]) -> str:
+    timings_ms = [t * 1000 for t in timings]
+    return (
+        f"median {statistics.median(timings_ms):8.2f} ms  "
+        f"min {min(timings_ms):8.2f} ms  max {max(timings_ms):8.2f} ms"
+    )
@@ -46,6 +46,8 @@ INSTALLED_APPS = [
     "apps.users.apps.UsersConfig",
     "apps.inventory.apps.InventoryConfig",
     "apps.tenants.apps.TenantsConfig",
+    "apps.search.apps.SearchConfig",
+    "apps.imports.apps.ImportsConfig",
     # third-party packages
     "rest_framework",
     "rest_framework_simplejwt",
@@ -63,6 +65,7 @@ if DEBUG:
 
 MIDDLEWARE = [
     "apps.tenants.middleware.GarageMiddleware",
+    "apps.tenants.middleware.ReadReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # cors headers
@@ -112,6 +115,47 @@ DATABASES = {
     }
 }
 
+# Tenant sharding: garage data is routed to the shard of the garage (see
+# apps.tenants.routers). Shards are listed in TENANT_SHARDS (e.g. "shard1,shard2"),
+# each configured through <ALIAS>_DATABASE_URL (e.g. SHARD1_DATABASE_URL=mysql://...).
+# Shards must use disjoint AUTO_INCREMENT ranges, so garages can be moved between them.
+TENANT_SHARDS = env.list("TENANT_SHARDS", default=[])
+for shard in TENANT_SHARDS:
+    DATABASES[shard] = env.db_url(f"{shard.upper()}_DATABASE_URL")
+
+TENANT_CONTROL_DATABASE: str = "default"
+TENANT_DEFAULT_SHARD: str = env("TENANT_DEFAULT_SHARD", default="default")
+TENANT_SHARD_CACHE_TTL: int = 60  # seconds
+
+# Read replicas: safe requests read from a replica of the database chosen above, unless
+# the garage wrote within REPLICA_STICKY_SECONDS (read-your-writes). Replicas are listed
+# as "<primary>:<replica>" pairs in DATABASE_REPLICAS (e.g. "default:replica1"), each
+# configured through <ALIAS>_DATABASE_URL. In tests a replica mirrors its primary, so a
+# second SQLite or MySQL alias can stand in for it.
+DATABASE_REPLICAS: dict[str, list[str]] = {}
+for pair in env.list("DATABASE_REPLICAS", default=[]):
+    primary, replica = pair.split(":")
+    DATABASES[replica] = {
+        **env.db_url(f"{replica.upper()}_DATABASE_URL"),
+        "TEST": {"MIRROR": primary},
+    }
+    DATABASE_REPLICAS.setdefault(primary, []).append(replica)
+
+REPLICA_STICKY_SECONDS: int = 10
+# must be shared by all processes (CACHE_URL), otherwise replicas are never read from
+REPLICA_STICKY_CACHE: str = "default"
+
+DATABASE_ROUTERS = ["apps.tenants.routers.ReadReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+# shared cache (e.g. redis://127.0.0.1:6379/1), falls back to local-memory when not configured
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -167,14 +211,15 @@ AUTHENTICATION_BACKENDS = [
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         # "apps.users.authentication.JWTCookieAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.JWTHeaderAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    # "DEFAULT_RENDERER_CLASSES": [
-    #     "rest_framework.renderers.JSONRenderer",
-    # ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "shared.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "apps.users.pagination.CustomLimitOffsetPagination",
     "PAGE_SIZE": 10,
@@ -191,6 +236,22 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Cache of authenticated principals (user + employee role), keyed by user id and token jti
+AUTH_PRINCIPAL_CACHE: str = "default"
+AUTH_PRINCIPAL_CACHE_TTL: int = 60  # seconds
+# token versions are only cached when the cache is shared, see apps.users.cache
+AUTH_TOKEN_VERSION_CACHE_TTL: int = 3600  # seconds
+
+# Per-process Bloom filter of revoked refresh token JTIs, kept in sync through the cache
+# (skipped unless the cache is shared by the processes: the blacklist is always queried).
+# Expired tokens are purged with `manage.py purge_expired_tokens`.
+TOKEN_BLACKLIST_CACHE: str = "default"
+TOKEN_BLACKLIST_FILTER_CAPACITY: int = 100_000
+TOKEN_BLACKLIST_FILTER_ERROR_RATE: float = 0.001
+TOKEN_BLACKLIST_SYNC_TTL: int = 3600  # seconds
+# Concurrent refreshes of the same refresh token share the access token issued first
+TOKEN_REFRESH_COALESCE_WINDOW: int = 10  # seconds
+
 JWT_ACCESS_TOKEN_KEY: str = "access_token"
 JWT_REFRESH_TOKEN_KEY: str = "refresh_token"
 HTTP_COOKIE_PATH: str = "/"
@@ -198,6 +259,55 @@ HTTP_COOKIE_SECURE: bool = True
 HTTP_COOKIE_HTTPONLY: bool = True
 HTTP_COOKIE_SAMESITE: str = "Lax"
 
+# Per-process cache of garages resolved from the request subdomain
+TENANT_CACHE_MAX_SIZE: int = 1024
+TENANT_CACHE_TTL: int = 300  # seconds
+# Shared (cross-process) cache of resolved garages and unknown subdomains
+TENANT_SHARED_CACHE: str = "default"
+TENANT_SHARED_CACHE_TTL: int = 3600  # seconds
+TENANT_NEGATIVE_CACHE_TTL: int = 60  # seconds
+# Cache of the per-garage table versions keying counts and responses (apps.tenants.versions);
+# unless it is shared by all processes (CACHE_URL) nothing is cached or validated by version
+TENANT_VERSION_CACHE: str = "default"
+
+# Paginated counts: "auto" serves cached exact counts, planner estimates above the
+# threshold and exact counts otherwise; "exact" always runs COUNT(*)
+PAGINATION_COUNT_MODE: str = "auto"
+PAGINATION_COUNT_CACHE_TTL: int = 300  # seconds
+PAGINATION_COUNT_ESTIMATE_THRESHOLD: int = 10_000
+
+# JSON responses (see shared.renderers.FastJSONRenderer): lists of at least this many rows
+# are streamed, in chunks of JSON_STREAMING_CHUNK_ROWS rows
+JSON_STREAMING_MIN_ROWS: int = 100
+JSON_STREAMING_CHUNK_ROWS: int = 50
+
+# Shared cache of rendered responses of the `response_cache_actions` of garage viewsets,
+# keyed by data versions; concurrent misses wait up to the lock timeout for one request
+RESPONSE_CACHE: str = "default"
+RESPONSE_CACHE_TTL: int = 300  # seconds
+RESPONSE_CACHE_LOCK_TIMEOUT: int = 5  # seconds
+
+# Search index (apps.search): shortest indexed word prefix; shorter query words only
+# match whole words
+SEARCH_MIN_PREFIX_LENGTH: int = 2
+# Unified search (/api/search/): types are searched on a pool of SEARCH_FANOUT_WORKERS
+# threads per process; types not answered within the budget of their start (or failing)
+# are left out of the response, and their queries cancelled (MySQL and PostgreSQL
+# statement timeout)
+SEARCH_FANOUT_WORKERS: int = 8
+SEARCH_FANOUT_BUDGET: float = 0.5  # seconds
+
+# Part autocomplete (apps.inventory.autocomplete): per-process prefix indexes of the parts
+# of the most recently used garages, evicted past this (approximate) memory budget; only
+# used when TENANT_VERSION_CACHE is shared by all processes
+PART_AUTOCOMPLETE_MEMORY_BUDGET: int = 64 * 1024 * 1024  # bytes
+
+# Spreadsheet imports (apps.imports): run on a pool of IMPORT_WORKERS threads, rows are
+# validated, inserted and committed IMPORT_CHUNK_SIZE at a time
+IMPORT_WORKERS: int = 2
+IMPORT_CHUNK_SIZE: int = 1000
+IMPORT_MAX_FILE_SIZE: int = 50 * 1024 * 1024  # bytes
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "GadiSewa API",
     "DESCRIPTION": "",
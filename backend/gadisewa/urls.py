@@ -13,6 +13,8 @@ urlpatterns = [
     path("api/", include("apps.users.urls")),
     path("api/", include("apps.garages.urls")),
     path("api/", include("apps.inventory.urls")),
+    path("api/", include("apps.search.urls")),
+    path("api/", include("apps.imports.urls")),
     # API Documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
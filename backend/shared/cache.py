@@ -0,0 +1,11 @@
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(cache) -> bool:
+    """
+    Return whether a cache is shared by every process of the deployment. Local-memory
+    (and dummy) caches are per process: a key deleted or bumped in one worker is still
+    read by the others, so they can not carry invalidations.
+    """
+    return not isinstance(cache, (LocMemCache, DummyCache))
@@ -1,6 +1,11 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.query import ModelIterable
+
+from apps.tenants.context import get_current_garage
+
 from .exceptions import MissingGarageException
+from .validators import get_phone_key, normalize_nepali_phone
 
 
 class GarageMixin(models.Model):
@@ -25,6 +30,27 @@ class TimeStampMixin(models.Model):
         abstract = True
 
 
+class PhoneNumberMixin(models.Model):
+    """
+    Model with a Nepali `phone_number`, stored in its canonical form on save (see
+    `normalize_nepali_phone`) along with `phone_key`, the number as an integer, for
+    compact unique indexes and lookups.
+    """
+
+    phone_key = models.PositiveBigIntegerField(null=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.phone_number = normalize_nepali_phone(self.phone_number)
+        self.phone_key = get_phone_key(self.phone_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phone_number" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "phone_key"}
+        super().save(*args, **kwargs)
+
+
 class UserAuditMixin(models.Model):
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -47,14 +73,68 @@ class UserAuditMixin(models.Model):
         abstract = True
 
 
-class GarageAwareManager(models.Manager):
+class GarageAwareModelIterable(ModelIterable):
+    """
+    Yield model instances with the in-memory garage of the queryset attached,
+    so `obj.garage` needs neither a join nor an extra query.
+    """
+
+    def __iter__(self):
+        garage = self.queryset._garage
+        if garage is None:
+            yield from super().__iter__()
+            return
+
+        garage_field = self.queryset.model._meta.get_field("garage")
+        for obj in super().__iter__():
+            # skip deferred garage_id, reading it would run a query
+            if obj.__dict__.get("garage_id") == garage.pk:
+                garage_field.set_cached_value(obj, garage)
+            yield obj
+
+
+class GarageAwareQuerySet(models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._garage = None
+        self._iterable_class = GarageAwareModelIterable
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._garage = self._garage
+        return clone
+
+    def for_garage(self, garage):
+        """Scope the queryset to `garage` by `garage_id` and attach it to the results."""
+        clone = self.filter(garage_id=garage.pk)
+        clone._garage = garage
+        return clone
+
+
+class GarageAwareManager(models.Manager.from_queryset(GarageAwareQuerySet)):
+    """
+    Manager of garage specific models.
+
+    Inside a tenant context (see `apps.tenants.context`) querysets are scoped to the
+    current garage automatically. Outside of one, `garage` must always be given.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        garage = get_current_garage()
+        if garage is not None:
+            queryset = queryset.for_garage(garage)
+        return queryset
+
     def all(self):
-        raise MissingGarageException(
-            "Cannot add 'all()' method directly in GarageAwareManager. Garage must always be present."
-        )
+        if get_current_garage() is None:
+            raise MissingGarageException(
+                "Cannot add 'all()' method directly in GarageAwareManager. Garage must always be present."
+            )
+        return super().all()
 
     def filter(self, *args, **kwargs):
-        if "garage_id" not in kwargs and "garage" not in kwargs:
+        if "garage_id" not in kwargs and "garage" not in kwargs and get_current_garage() is None:
             raise MissingGarageException(
                 "'garage_id' or 'garage' must be present as a keyboard argument in GarageAwareManager."
             )
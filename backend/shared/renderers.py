@@ -0,0 +1,88 @@
+from collections.abc import Iterable, Mapping
+from decimal import Decimal
+
+import orjson
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """DRF JSONEncoder rendering Decimals as strings, so their exact digits are kept."""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer encoding with orjson.
+
+    - Output matches `JSONRenderer` (compact, UTF-8, U+2028/U+2029 escaped, UTC as "Z"),
+      except Decimals, which are rendered as strings instead of floats.
+    - Indented output (browsable API, `; indent=` media types) uses the stdlib.
+    - `iter_render` yields the body in chunks, writing lists and iterators (e.g. the
+      `results` of a page) a few items at a time, see `StreamingJSONResponse`.
+    """
+
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not self.use_orjson(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.dumps(data)
+
+    def use_orjson(self, accepted_media_type, renderer_context) -> bool:
+        return (
+            api_settings.UNICODE_JSON
+            and api_settings.COMPACT_JSON
+            and not self.get_indent(accepted_media_type, renderer_context)
+        )
+
+    def dumps(self, data) -> bytes:
+        """Return the JSON of data, like `render` does."""
+        try:
+            content = orjson.dumps(
+                data, default=_encoder.default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits, NaN checks: let the stdlib render or reject them
+            return super().render(data)
+        # like JSONRenderer: JavaScript does not allow these separators in strings
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+    def iter_render(self, data, chunk_size: int | None = None):
+        """Yield the JSON of data in chunks of `chunk_size` list items."""
+        chunk_size = chunk_size or getattr(settings, "JSON_STREAMING_CHUNK_ROWS", 50)
+        if isinstance(data, Mapping):
+            yield b"{"
+            for index, (key, value) in enumerate(data.items()):
+                yield (b"," if index else b"") + self.dumps(str(key)) + b":"
+                yield from self.iter_value(value, chunk_size)
+            yield b"}"
+        else:
+            yield from self.iter_value(data, chunk_size)
+
+    def iter_value(self, value, chunk_size: int):
+        if isinstance(value, (str, bytes, Mapping)) or not isinstance(value, Iterable):
+            yield self.dumps(value)
+            return
+
+        yield b"["
+        chunk, separator = [], b""
+        for item in value:
+            chunk.append(self.dumps(item))
+            if len(chunk) == chunk_size:
+                yield separator + b",".join(chunk)
+                chunk, separator = [], b","
+        if chunk:
+            yield separator + b",".join(chunk)
+        yield b"]"
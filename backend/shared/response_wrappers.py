@@ -1,11 +1,15 @@
+import contextvars
 from typing import Type
 
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.pagination import BasePagination
-from rest_framework.response import Response
 from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
+from .renderers import FastJSONRenderer
+
 
 class SuccessResponse(Response):
     """
@@ -94,3 +98,52 @@ def get_pagination_response(
 
     serializer = serializer_class(queryset, many=True)
     return Response(serializer.data)
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    Response writing a JSON body in chunks, instead of rendering it as one string.
+
+    Lists and iterators in the data are written a few items at a time, so a generator
+    of serialized rows (e.g. `{"count": 10, "results": <generator>}`) is serialized
+    as it is written. With `is_async=True`, the body is written from the event loop.
+    """
+
+    def __init__(self, data, *, status=None, headers=None, renderer=None, is_async=False):
+        renderer = renderer or FastJSONRenderer()
+        chunks = renderer.iter_render(data)
+        super().__init__(
+            aiter_chunks(chunks) if is_async else chunks,
+            content_type=renderer.media_type,
+            status=status,
+            headers=headers,
+        )
+
+
+async def aiter_chunks(chunks):
+    """
+    Yield the chunks of a sync iterator from the event loop, like async lists serialize
+    their rows, so ASGI does not buffer the whole body in a thread first.
+    """
+    for chunk in chunks:
+        yield chunk
+
+
+def iter_in_context(iterable):
+    """
+    Return an iterator reading an iterable within a copy of the current context, e.g. rows
+    serialized while a streamed body is written, after the view has reset its tenant
+    and database contexts.
+    """
+    # copied now, not when the first item is requested
+    context = contextvars.copy_context()
+    return _iter_in_context(context, iter(iterable))
+
+
+def _iter_in_context(context, iterator):
+    while True:
+        try:
+            item = context.run(next, iterator)
+        except StopIteration:
+            return
+        yield item
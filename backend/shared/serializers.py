@@ -0,0 +1,496 @@
+import re
+from functools import cache, reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, router, transaction
+from django.db.models import FileField, Q, UniqueConstraint
+from django.utils.encoding import force_str
+from rest_framework import serializers
+
+# columns of the unique constraint named in SQLite's IntegrityError messages, e.g.
+# "UNIQUE constraint failed: inventory_part.garage_id, inventory_part.sku"
+_SQLITE_UNIQUE_RE = re.compile(r"UNIQUE constraint failed: (.+)$")
+
+# query parameters of sparse fieldsets, e.g. `?fields=id,name,sku&expand=category`
+FIELDS_QUERY_PARAM = "fields"
+EXPAND_QUERY_PARAM = "expand"
+
+
+def parse_field_names(value: str | None) -> set[str] | None:
+    """Return the names of a comma separated list, or None if it is missing or empty."""
+    names = {name.strip() for name in (value or "").split(",") if name.strip()}
+    return names or None
+
+
+def get_sparse_options(request) -> dict:
+    """Return the `fields`/`expand` options of a `SparseFieldsMixin` serializer for a request."""
+    return {
+        "fields": parse_field_names(request.query_params.get(FIELDS_QUERY_PARAM)),
+        "expand": parse_field_names(request.query_params.get(EXPAND_QUERY_PARAM)),
+    }
+
+
+def collapse_relation(name: str, field: serializers.BaseSerializer) -> serializers.Field:
+    """Return a read only field rendering a nested relation as its primary key(s)."""
+    kwargs = {"read_only": True}
+    if field.source and field.source != name:
+        kwargs["source"] = field.source
+    if isinstance(field, serializers.ListSerializer):
+        kwargs["many"] = True
+    return serializers.PrimaryKeyRelatedField(**kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    ModelSerializer rendering only the fields and nested relations a client asks for.
+
+    - `fields`: names of the fields to render, e.g. {"id", "name", "sku"}.
+    - `expand`: nested relations to render as objects, e.g. {"category"}; expanded
+      relations are rendered even if they are not listed in `fields`.
+
+    With either option, nested relations that are not expanded are rendered as their
+    primary key, so they need no join. Without both, the serializer is unchanged.
+    Write only fields are always kept, so writes are not affected.
+
+    Fields that are not model columns (properties, methods) list the columns they read
+    in `Meta.field_dependencies`, so querysets can be narrowed with `narrow_queryset`.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.requested_fields = fields
+        self.expanded_fields = expand
+        super().__init__(*args, **kwargs)
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.requested_fields is not None or self.expanded_fields is not None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_sparse:
+            return fields
+
+        expand = self.expanded_fields or set()
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if name not in expand and (
+                self.requested_fields is not None and name not in self.requested_fields
+            ):
+                del fields[name]
+            elif name not in expand and isinstance(field, serializers.BaseSerializer):
+                fields[name] = collapse_relation(name, field)
+        return fields
+
+
+def _collect_lookups(serializer, model, prefix: str, annotations, only: list, related: list):
+    # adds the only()/select_related() paths of the serializer, False if one is unknown
+    dependencies = getattr(getattr(serializer, "Meta", None), "field_dependencies", {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in dependencies:
+            only.extend(prefix + column for column in dependencies[name])
+            continue
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            # reverse and many to many relations are loaded by queries of their own
+            continue
+        if field.source == "*":
+            return False
+        if not prefix and field.source in annotations:
+            continue
+
+        current, path = model, prefix
+        try:
+            for attr in field.source_attrs[:-1]:
+                relation = current._meta.get_field(attr)
+                if not (relation.many_to_one or relation.one_to_one):
+                    return False
+                path = f"{path}{attr}"
+                related.append(path)
+                current, path = relation.related_model, f"{path}__"
+            model_field = current._meta.get_field(field.source_attrs[-1])
+        except FieldDoesNotExist:
+            return False
+
+        path = f"{path}{field.source_attrs[-1]}"
+        if not model_field.is_relation:
+            only.append(path)
+        elif not (model_field.many_to_one or model_field.one_to_one):
+            return False
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            # rendered from the foreign key column, without loading the related row
+            only.append(path)
+        else:
+            related.append(path)
+            only.append(path)
+            if isinstance(field, serializers.BaseSerializer) and not _collect_lookups(
+                field, model_field.related_model, f"{path}__", (), only, related
+            ):
+                return False
+    return True
+
+
+def narrow_queryset(queryset, serializer):
+    """
+    Return the queryset loading only the columns and relations rendered by a sparse
+    serializer, or the queryset unchanged if the serializer is not sparse or renders
+    fields it can not map to columns.
+
+    The columns the queryset is ordered by are kept, so cursors can be built from rows.
+    """
+    if not getattr(serializer, "is_sparse", False):
+        return queryset
+
+    only, related = [], []
+    annotations = set(queryset.query.annotations)
+    if not _collect_lookups(serializer, queryset.model, "", annotations, only, related):
+        return queryset
+
+    for term in queryset.query.order_by:
+        name = term.lstrip("-") if isinstance(term, str) else None
+        if name and "__" not in name and name not in ("pk", "?") and name not in annotations:
+            only.append(name)
+
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*dict.fromkeys(related))
+    return queryset.only(*dict.fromkeys(only))
+
+
+class RowAttributes:
+    """Attribute access to the columns of a `.values()` row, for model properties."""
+
+    __slots__ = ("_prefix", "_row")
+
+    def __init__(self, row: dict, prefix: str = ""):
+        self._row = row
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        try:
+            return self._row[self._prefix + name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+@cache
+def get_choice_labels(model_field) -> dict:
+    """Return the labels of the choices of a model field, as `get_FOO_display()` returns them."""
+    return {
+        value: force_str(label, strings_only=True)
+        for value, label in dict(model_field.flatchoices).items()
+    }
+
+
+class CompiledSerializer:
+    """
+    Renderer of `.values()` rows compiled from the fields of a serializer.
+
+    `columns` is the projection to read, and `render(row)` returns what the serializer
+    returns for the model instance of the row.
+    """
+
+    def __init__(self, columns: list[str], render):
+        self.columns = columns
+        self.render = render
+
+
+def _can_compile(serializer) -> bool:
+    to_representation = type(serializer).to_representation
+    return to_representation in (
+        serializers.Serializer.to_representation,
+        CompiledSerializerMixin.to_representation,
+    )
+
+
+def _compile_field(field, model_field, key: str, labels):
+    # getter of a column value, rendered by the field
+    convert = field.to_representation
+    if labels is not None:
+        return lambda row: labels.get(row[key], row[key])
+    if isinstance(model_field, FileField):
+        attr_class = model_field.attr_class
+
+        def get_file(row):
+            name = row[key]
+            return convert(attr_class(None, model_field, name)) if name else None
+
+        return get_file
+
+    def get_value(row):
+        value = row[key]
+        return None if value is None else convert(value)
+
+    return get_value
+
+
+def _compile(serializer, model, prefix: str, annotations, columns: list):
+    # returns the render function of the serializer, or None if a field can not be compiled
+    if not _can_compile(serializer):
+        return None
+
+    meta = getattr(serializer, "Meta", None)
+    dependencies = getattr(meta, "field_dependencies", {})
+    display_fields = getattr(meta, "display_fields", ())
+    getters = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            return None
+        if field.source == "*":
+            return None
+
+        if name in dependencies:
+            prop = getattr(model, field.source, None)
+            if len(field.source_attrs) != 1 or not isinstance(prop, property):
+                return None
+            columns.extend(prefix + column for column in dependencies[name])
+            convert, fget = field.to_representation, prop.fget
+
+            def get_property(row, convert=convert, fget=fget, prefix=prefix):
+                value = fget(RowAttributes(row, prefix))
+                return None if value is None else convert(value)
+
+            getters.append((name, get_property))
+            continue
+
+        current, path = model, prefix
+        try:
+            for attr in field.source_attrs[:-1]:
+                relation = current._meta.get_field(attr)
+                if not (relation.concrete and relation.is_relation) or relation.null:
+                    return None
+                current, path = relation.related_model, f"{path}{attr}__"
+            model_field = current._meta.get_field(field.source_attrs[-1])
+        except FieldDoesNotExist:
+            if prefix or field.source not in annotations:
+                return None
+            columns.append(field.source)
+            getters.append((name, _compile_field(field, None, field.source, None)))
+            continue
+        if not model_field.concrete:
+            return None
+
+        key = f"{path}{field.source_attrs[-1]}"
+        columns.append(key)
+        if not model_field.is_relation:
+            labels = get_choice_labels(model_field) if name in display_fields else None
+            getters.append((name, _compile_field(field, model_field, key, labels)))
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return None
+            getters.append((name, lambda row, key=key: row[key]))
+        elif isinstance(field, serializers.BaseSerializer):
+            render = _compile(field, model_field.related_model, f"{key}__", (), columns)
+            if render is None:
+                return None
+
+            def get_nested(row, key=key, render=render):
+                return None if row[key] is None else render(row)
+
+            getters.append((name, get_nested))
+        else:
+            return None
+
+    return lambda row: {name: get(row) for name, get in getters}
+
+
+class CompiledSerializerMixin(SparseFieldsMixin):
+    """
+    SparseFieldsMixin serializer that can also render `.values()` rows.
+
+    - `compile()` compiles the fields into the columns of one `.values()` projection
+      and a render function (choice labels are looked up in precomputed tables),
+      so list endpoints skip model instances and field by field rendering.
+    - Rows are rendered exactly like instances: same keys, order and values.
+    - `Meta.display_fields` lists choice fields rendered with their label, like
+      `get_FOO_display()`; serializers must not override `to_representation`.
+
+    Serializers with fields that can not be compiled (methods, many relations, ...)
+    are rendered from instances as usual.
+    """
+
+    def compile(self, annotations=()) -> CompiledSerializer | None:
+        """Return the compiled serializer, or None if a field can not be compiled."""
+        columns = []
+        render = _compile(self, self.Meta.model, "", set(annotations), columns)
+        if render is None:
+            return None
+        return CompiledSerializer(list(dict.fromkeys(columns)), render)
+
+    def to_representation(self, instance):
+        if isinstance(instance, dict):
+            if not hasattr(self, "_compiled"):
+                self._compiled = self.compile(annotations=instance)
+            return self._compiled.render(instance)
+
+        data = super().to_representation(instance)
+        for name in getattr(self.Meta, "display_fields", ()):
+            if name in data:
+                data[name] = getattr(instance, f"get_{self.fields[name].source}_display")()
+        return data
+
+
+def compile_queryset(queryset, serializer):
+    """
+    Return the `.values()` queryset of the rows rendered by a `CompiledSerializerMixin`
+    serializer, or None if the serializer can not be compiled.
+
+    The primary key and the columns the queryset is ordered by are read as well, so
+    cursors can be built from rows.
+    """
+    compile = getattr(serializer, "compile", None)
+    compiled = compile(queryset.query.annotations) if compile is not None else None
+    if compiled is None:
+        return None
+
+    columns = [queryset.model._meta.pk.attname, *compiled.columns]
+    for term in queryset.query.order_by:
+        name = term.lstrip("-") if isinstance(term, str) else None
+        if name and "__" not in name and name not in ("pk", "?"):
+            columns.append(name)
+    return queryset.values(*dict.fromkeys(columns))
+
+
+@cache
+def get_serializer_models(serializer_class) -> frozenset:
+    """
+    Return the models a ModelSerializer renders rows of: its model, the models of its
+    nested serializers and of the relations its dotted sources follow.
+    """
+    model = serializer_class.Meta.model
+    models = {model}
+    for name, field in serializer_class._declared_fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        if isinstance(field, serializers.ModelSerializer):
+            models |= get_serializer_models(type(field))
+            continue
+
+        current = model
+        for attr in (field.source or name).split(".")[:-1]:
+            try:
+                current = current._meta.get_field(attr).related_model
+            except FieldDoesNotExist:
+                break
+            if current is None:
+                break
+            models.add(current)
+    return frozenset(models)
+
+
+def get_violated_constraint(model, exc: IntegrityError) -> UniqueConstraint | None:
+    """Return the unique constraint of a model an IntegrityError reports, if any."""
+    message = str(exc)
+    columns = None
+    match = _SQLITE_UNIQUE_RE.search(message)
+    if match is not None:
+        columns = {column.strip().rpartition(".")[2] for column in match.group(1).split(",")}
+
+    for constraint in model._meta.constraints:
+        if not isinstance(constraint, UniqueConstraint) or not constraint.fields:
+            continue
+        # PostgreSQL and MySQL name the constraint, SQLite names partial unique indexes
+        if re.search(rf"\b{re.escape(constraint.name)}\b", message):
+            return constraint
+        fields = {model._meta.get_field(field).column for field in constraint.fields}
+        if fields == columns:
+            return constraint
+    return None
+
+
+class GarageUniqueFieldsMixin:
+    """
+    Serializer checking that the values of `Meta.garage_unique_fields` are not used by
+    another row of the garage of the request, in one query for all the fields:
+
+        garage_unique_fields = {
+            "name": "Supplier with this name already exists.",
+            "phone_number": "Supplier with this phone number already exists.",
+        }
+
+    - Fields are looked up by the model field of their source; `Meta.garage_unique_keys`
+      maps fields stored under a canonical key to the key field and the function
+      computing it, e.g. {"phone_number": ("phone_key", get_phone_key)}.
+    - Empty values are not checked, the constraints of optional fields skip NULLs.
+    - Rows created concurrently pass the check but fail the unique constraints: the
+      IntegrityError of `save()` is turned into the same field errors.
+
+    `get_unique_queryset()` and `get_unique_instance()` return the rows to check and the
+    row being updated, by default those of `Meta.model`.
+    """
+
+    def get_unique_queryset(self):
+        garage = self.context["request"].garage
+        return self.Meta.model._default_manager.filter(garage=garage)
+
+    def get_unique_instance(self):
+        return self.instance
+
+    def get_unique_lookup(self, name: str) -> tuple[str, callable]:
+        """Return the model field a serializer field is unique by, and its value function."""
+        keys = getattr(self.Meta, "garage_unique_keys", {})
+        if name in keys:
+            return keys[name]
+        return self.fields[name].source_attrs[-1], lambda value: value
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        lookups = {}
+        for name in self.Meta.garage_unique_fields:
+            value = attrs
+            for attr in self.fields[name].source_attrs:
+                value = value.get(attr) if isinstance(value, dict) else None
+            if value in (None, ""):
+                continue
+            field, get_key = self.get_unique_lookup(name)
+            lookups[name] = (field, get_key(value))
+        if not lookups:
+            return attrs
+
+        queryset = self.get_unique_queryset().filter(
+            reduce(or_, (Q(**{field: key}) for field, key in lookups.values()))
+        )
+        instance = self.get_unique_instance()
+        if instance is not None:
+            queryset = queryset.exclude(pk=instance.pk)
+        fields = list(dict.fromkeys(field for field, _ in lookups.values()))
+        # a value is used by at most one row
+        rows = list(queryset.values(*fields)[: len(lookups)])
+
+        errors = {
+            name: [self.Meta.garage_unique_fields[name]]
+            for name, (field, key) in lookups.items()
+            if any(row[field] == key for row in rows)
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def save(self, **kwargs):
+        model = self.get_unique_queryset().model
+        using = router.db_for_write(model)
+        try:
+            if transaction.get_connection(using).in_atomic_block:
+                # a savepoint, so the transaction of the caller survives the error
+                with transaction.atomic(using=using):
+                    return super().save(**kwargs)
+            return super().save(**kwargs)
+        except IntegrityError as exc:
+            errors = self.get_unique_errors(model, exc)
+            if errors is None:
+                raise
+            raise serializers.ValidationError(errors)
+
+    def get_unique_errors(self, model, exc: IntegrityError) -> dict | None:
+        """Return the field errors of an IntegrityError on a garage unique constraint."""
+        constraint = get_violated_constraint(model, exc)
+        if constraint is None:
+            return None
+        for name, message in self.Meta.garage_unique_fields.items():
+            if self.get_unique_lookup(name)[0] in constraint.fields:
+                return {name: [message]}
+        return None
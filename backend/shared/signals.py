@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent when rows of a garage model are written in bulk (`bulk_create`, `bulk_update`,
+# raw deletes), which send no post_save/post_delete for each row, so everything
+# derived from the rows (versions, search index) is updated once for all of them.
+#
+# Arguments: sender (the model), garage_id, pks (created or updated rows),
+# deleted_pks, using.
+bulk_changed = Signal()
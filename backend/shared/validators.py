@@ -1,3 +1,5 @@
+import re
+
 from django.core.validators import RegexValidator
 
 nepali_phone_validator = RegexValidator(
@@ -5,3 +7,41 @@ nepali_phone_validator = RegexValidator(
     message="Enter a valid Nepali phone number.",
     # code='invalid_phone_number'
 )
+
+# formatting characters of typed phone numbers, e.g. "+977 (981) 234-5678"
+_PHONE_SEPARATORS_RE = re.compile(r"[\s().-]")
+
+
+def normalize_nepali_phone(value: str) -> str:
+    """
+    Return the canonical (national) form of a Nepali phone number: without formatting
+    characters and the +977/977/00977 country code, e.g. "+977 981-2345678" -> "9812345678".
+    Values that are not phone numbers are only stripped of formatting characters.
+    """
+    value = _PHONE_SEPARATORS_RE.sub("", value)
+    for prefix in ("+977", "00977", "977"):
+        if value.startswith(prefix) and len(value) == len(prefix) + 10:
+            return value[len(prefix) :]
+    return value
+
+
+def get_phone_key(value: str) -> int | None:
+    """Return the canonical phone number as an integer, for compact indexes, or None."""
+    value = normalize_nepali_phone(value)
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+_VRN_PART_RE = re.compile(r"[A-Z]+|\d+")
+
+
+def normalize_vrn(value: str) -> str:
+    """
+    Return the canonical form of a vehicle registration number: its letter and digit
+    groups in uppercase, without leading zeros, joined by "-", so every spelling of a
+    number matches, e.g. "ba1pa1234", "BA 01 PA 1234" and "Ba 1 Pa 1234" -> "BA-1-PA-1234".
+
+    Groups stay separated so a prefix ending on a group ("BA-2") sorts the numbers of
+    that group ("BA-2-PA-1") before longer groups ("BA-20-PA-19").
+    """
+    parts = _VRN_PART_RE.findall(value.upper())
+    return "-".join(str(int(part)) if part.isdigit() else part for part in parts)
@@ -3,10 +3,10 @@ This view is not implemented in the application.
 """
 
 import logging
+
 from rest_framework import exceptions, viewsets
 
 from apps.tenants.models import Garage
-from apps.users.models import CustomUser
 
 logger = logging.getLogger(__name__)
 
@@ -23,18 +23,18 @@ class GarageNestedViewSet(viewsets.GenericViewSet):
         if garage_pk is None:
             raise exceptions.NotFound("Garage not found.")
 
-        try:
-            # Attempt to get the garage from the user's related garage
-            user = CustomUser.objects.get(id=request.user.id)
-            # User not assigned to garage (platform specific user) are not allowed to view garage specific data
-            if not user.garage:
-                raise exceptions.PermissionDenied("User is not assigned to a garage.")
+        # tenant membership is read from the token claims (see CustomTokenObtainPairSerializer)
+        garage_id = request.auth.get("garage_id") if request.auth is not None else None
+        # User not assigned to garage (platform specific user) are not allowed to view garage specific data
+        if garage_id is None:
+            raise exceptions.PermissionDenied("User is not assigned to a garage.")
 
-            if str(user.garage.id) != str(garage_pk):
-                raise exceptions.NotFound("Garage not found.")
+        if str(garage_id) != str(garage_pk):
+            raise exceptions.NotFound("Garage not found.")
 
-            self.garage = user.garage
-        except (Garage.DoesNotExist, CustomUser.DoesNotExist):
+        try:
+            self.garage = Garage.objects.get(pk=garage_id)
+        except Garage.DoesNotExist:
             raise exceptions.NotFound()
 
         super().initial(request, *args, **kwargs)